@@ -1,8 +1,15 @@
 import os
 from flask import Flask, render_template, request, jsonify # Add request/jsonify here
 from flask_login import LoginManager, current_user, login_required
-from models import db, User, UserProgress 
-from auth import auth_bp, bcrypt
+from models import db, User
+from auth import auth_bp, bcrypt, module_catalog, password_hasher
+from progress_cache import summary_cache
+from progress_writer import progress_writer
+from identity_cache import identity_cache
+from rate_limit import rate_limiter
+from metrics import metrics
+import db_config
+import migrations
 # Unit 1
 from unit1.U1DMA import dma_bp
 
@@ -40,17 +47,34 @@ from unit5.U5Spanning import Spanning_bp
 # --- Create the Main App ---
 app = Flask(__name__)
 app.config['SECRET_KEY'] = '5791628bb0b13ce0c676dfde280ba245' 
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///site.db'
+app.config.from_prefixed_env()   # FLASK_<KEY> environment variables override config, e.g. FLASK_PROGRESS_WRITE_MODE=sync
 
+db_config.configure(app)   # DATABASE_URL, WAL, busy timeout and pool size, from the environment
 db.init_app(app)
+db_config.install_pragmas(app, db)
 bcrypt.init_app(app)
+password_hasher.init_app(app)   # BCRYPT_LOG_ROUNDS, HASH_POOL_SIZE (0 = inline), HASH_QUEUE_DEPTH, HASH_QUEUE_TIMEOUT
+summary_cache.init_app(app)
+progress_writer.init_app(app)
+identity_cache.init_app(app)
+rate_limiter.init_app(app)   # RATE_LIMIT_<ROUTE>_<IP|USERNAME>, RATE_LIMIT_URL
+metrics.init_app(app)   # /metrics, login or METRICS_TOKEN bearer; METRICS_ENABLED=0 turns it off
+metrics.add_stats('progress_cache', summary_cache.stats,
+                  counters=('hits', 'misses', 'write_through_updates', 'invalidations', 'evictions'))
+metrics.add_stats('progress_writer', progress_writer.stats,
+                  counters=('flushes', 'events_flushed', 'rows_inserted', 'failed_flushes',
+                            'dropped_events', 'sync_writes'))
+metrics.add_stats('identity_cache', identity_cache.stats, counters=('hits', 'misses', 'evictions'))
+metrics.add_stats('rate_limit', rate_limiter.stats, counters=('allowed', 'rejected'))
+metrics.add_stats('password_hasher', password_hasher.stats, counters=('rejected',))
 login_manager = LoginManager(app)
 login_manager.login_view = 'auth.login' # Where to redirect if user isn't logged in
 login_manager.login_message_category = 'info'
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    # Served from the identity cache; the user table is only read on a miss
+    return identity_cache.load(int(user_id), lambda uid: db.session.get(User, uid))
 
 
 # --- Register Blueprints with URL Prefixes ---
@@ -94,26 +118,61 @@ app.register_blueprint(Spanning_bp, url_prefix='/unit5/U5Spanning')
 @app.route('/api/mark_complete', methods=['POST'])
 @login_required
 def mark_complete():
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     module_name = data.get('module')
-    
-    # Check if already completed
-    exists = UserProgress.query.filter_by(user_id=current_user.id, module_name=module_name).first()
-    if not exists:
-        progress = UserProgress(module_name=module_name, user_id=current_user.id)
-        db.session.add(progress)
-        db.session.commit()
+    if not isinstance(module_name, str) or module_name not in module_catalog(app):
+        return jsonify({'status': 'error', 'msg': 'Missing or unknown module name.'}), 400
+
+    # Buffered by default; the unique (user_id, module_name) index drops duplicates on insert
+    outcome = progress_writer.submit(current_user.id, module_name)
+    if outcome == 'created':
         return jsonify({'status': 'success', 'msg': 'Progress recorded!'})
+    if outcome == 'queued':
+        return jsonify({'status': 'queued', 'msg': 'Progress recorded!'})
     return jsonify({'status': 'exists', 'msg': 'Already completed!'})
 
+@app.route('/api/cache_stats')
+@login_required
+def cache_stats():
+    return jsonify(summary_cache.stats())
+
+@app.route('/api/writer_stats')
+@login_required
+def writer_stats():
+    return jsonify(progress_writer.stats())
+
+@app.route('/api/identity_cache_stats')
+@login_required
+def identity_cache_stats():
+    return jsonify(identity_cache.stats())
+
+@app.route('/api/rate_limit_stats')
+@login_required
+def rate_limit_stats():
+    return jsonify(rate_limiter.stats())
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
-# Create Database Tables
+# Schema changes are versioned migrations, applied once per deploy with
+#     flask --app app upgrade-db
+# rather than by every worker at import. AUTO_MIGRATE=1 applies them at
+# startup instead, for single-process deployments.
+@app.cli.command('upgrade-db')
+def upgrade_db():
+    """Apply pending database migrations."""
+    applied = migrations.upgrade(db.engine)
+    print(f"Applied migrations: {applied}" if applied else "Database is up to date.")
+
 with app.app_context():
-    db.create_all()
+    if os.environ.get('AUTO_MIGRATE') == '1':
+        migrations.upgrade(db.engine)
+    elif migrations.pending(db.engine):
+        app.logger.warning("Database has pending migrations; run 'flask --app app upgrade-db'.")
 
 if __name__ == '__main__':
+    with app.app_context():
+        migrations.upgrade(db.engine)
     port = int(os.environ.get('PORT', 5000))
     app.run(debug=True, host='0.0.0.0', port=port)
\ No newline at end of file
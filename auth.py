@@ -1,10 +1,74 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+import re
+
+from flask import Blueprint, current_app, render_template, redirect, url_for, flash, request
 from flask_login import login_user, current_user, logout_user, login_required
-from models import db, User, UserProgress # Import from your models.py
+from models import db, User, progress_summary # Import from your models.py
 from flask_bcrypt import Bcrypt
+from progress_cache import summary_cache
+from progress_writer import progress_writer
+from identity_cache import identity_cache
+from password_hashing import HashingBusy, PasswordHasher
+from rate_limit import RateLimited, rate_limiter, retry_after_header
 
 auth_bp = Blueprint('auth', __name__)
 bcrypt = Bcrypt()
+password_hasher = PasswordHasher(bcrypt)
+
+# A visualizer is any blueprint mounted under /unitN/<name>/
+MODULE_PREFIX_RE = re.compile(r'^/unit\d+/[^/]+/')
+
+# Blueprint -> the module name index.html posts to /api/mark_complete
+MODULE_TITLES = {
+    'dma_bp': 'Dynamic Memory Allocation',
+    'cirsingle_bp': 'Singly Circular Linked List',
+    'dblcir_bp': 'Doubly Circular Linked List',
+    'doublelinked_bp': 'Doubly Linked List',
+    'linkedlist_bp': 'Singly Linked List',
+    'sparesematrix_bp': 'Sparse Matrix',
+    'balancingsymbol_bp': 'Balancing Symbols',
+    'infixtopost_bp': 'Infix to Postfix',
+    'postfixevaluation_bp': 'Postfix Evaluation',
+    'Queue_bp': 'Queue Linked',
+    'queuearray_bp': 'Queue Array',
+    'stack_bp': 'Stack Linked',
+    'stackarray_bp': 'Stack Array',
+    'towerofhanoi_bp': 'Tower of Hanoi',
+    'AVL_bp': 'AVL Tree',
+    'BST_bp': 'Binary Search Tree',
+    'Btree_bp': 'B-Tree',
+    'TreeRotation_bp': 'Tree Rotations',
+    'TreeTravel_bp': 'Tree Traversals',
+    'dijkstra_bp': 'Dijkstra Shortest Path',
+    'kruskal_bp': 'Kruskal MST',
+    'prims_bp': 'Prim MST',
+    'Spanning_bp': 'Spanning Trees',
+}
+
+
+def module_catalog(app):
+    """Module names of every registered visualizer, computed once per app.
+
+    These are the only names mark_complete accepts and the dashboard
+    counts; a blueprint missing from MODULE_TITLES is listed by its name.
+    """
+    if 'module_catalog' not in app.extensions:
+        app.extensions['module_catalog'] = sorted({
+            MODULE_TITLES.get(blueprint, blueprint)
+            for blueprint in (rule.endpoint.partition('.')[0] for rule in app.url_map.iter_rules()
+                              if MODULE_PREFIX_RE.match(rule.rule))
+        })
+    return app.extensions['module_catalog']
+
+
+def check_rate_limit(route, username):
+    """Charge this attempt to the client's IP and username buckets before any hashing."""
+    rate_limiter.check(route, ip=request.remote_addr,
+                       username=(username or '').strip().lower()[:64])
+
+
+def too_many_attempts(template, exc):
+    flash(f'Too many attempts. Please wait {retry_after_header(exc.retry_after)} seconds and try again.', 'danger')
+    return render_template(template), 429, {'Retry-After': retry_after_header(exc.retry_after)}
 
 @auth_bp.route("/register", methods=['GET', 'POST'])
 def register():
@@ -14,6 +78,13 @@ def register():
     if request.method == 'POST':
         username = request.form.get('username')
         password = request.form.get('password')
+        try:
+            check_rate_limit('register', username)
+        except RateLimited as e:
+            return too_many_attempts('register.html', e)
+        if not username or not password:
+            flash('Please enter a username and a password.', 'danger')
+            return redirect(url_for('auth.register'))
         
         # Check if user exists
         user = User.query.filter_by(username=username).first()
@@ -21,7 +92,11 @@ def register():
             flash('Username already exists. Please choose a different one.', 'danger')
             return redirect(url_for('auth.register'))
             
-        hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
+        try:
+            hashed_password = password_hasher.hash(password)
+        except HashingBusy:
+            flash('The server is busy. Please try again in a moment.', 'danger')
+            return render_template('register.html'), 503
         user = User(username=username, password=hashed_password)
         db.session.add(user)
         db.session.commit()
@@ -38,9 +113,28 @@ def login():
     if request.method == 'POST':
         username = request.form.get('username')
         password = request.form.get('password')
+        try:
+            check_rate_limit('login', username)
+        except RateLimited as e:
+            return too_many_attempts('login.html', e)
         user = User.query.filter_by(username=username).first()
         
-        if user and bcrypt.check_password_hash(user.password, password):
+        try:
+            valid = bool(user and password) and password_hasher.verify(user.password, password)
+        except HashingBusy:
+            flash('The server is busy. Please try again in a moment.', 'danger')
+            return render_template('login.html'), 503
+
+        if valid and password_hasher.needs_rehash(user.password):
+            # The configured cost changed since this hash was made; upgrade it now
+            try:
+                user.password = password_hasher.hash(password)
+                db.session.commit()
+                identity_cache.invalidate(user.id)
+            except HashingBusy:
+                pass  # keep the old hash; a later login will upgrade it
+
+        if valid:
             login_user(user)
             next_page = request.args.get('next')
             return redirect(next_page) if next_page else redirect(url_for('index'))
@@ -51,6 +145,8 @@ def login():
 
 @auth_bp.route("/logout")
 def logout():
+    if current_user.is_authenticated:
+        identity_cache.invalidate(current_user.id)
     logout_user()
     flash('You have been logged out successfully.', 'info') 
     return redirect(url_for('auth.login'))
@@ -58,14 +154,15 @@ def logout():
 @auth_bp.route("/dashboard")
 @login_required
 def dashboard():
-    # Calculate progress
-    total_modules = 23 # You have 23 visualizers
-    completed = UserProgress.query.filter_by(user_id=current_user.id).count()
-    # Get distinct modules completed to avoid double counting
-    distinct_completed = db.session.query(UserProgress.module_name).filter_by(user_id=current_user.id).distinct().count()
-    
-    progress_percent = int((distinct_completed / total_modules) * 100)
+    # Calculate progress: served from the summary cache, or one query on a miss
+    catalog = module_catalog(current_app)
+    total_modules = len(catalog)
+    user_id = current_user.id
+    if progress_writer.has_pending(user_id):
+        progress_writer.flush_user(user_id)   # show the user's own buffered clicks
+    completed, history = summary_cache.get(user_id, lambda: progress_summary(user_id, summary_cache.history, catalog))
     
-    history = UserProgress.query.filter_by(user_id=current_user.id).order_by(UserProgress.timestamp.desc()).limit(10).all()
+    progress_percent = min(100, int((completed / total_modules) * 100)) if total_modules else 0
     
-    return render_template('dashboard.html', percent=progress_percent, count=distinct_completed, history=history)
\ No newline at end of file
+    return render_template('dashboard.html', percent=progress_percent, count=completed,
+                           total=total_modules, history=history)
\ No newline at end of file
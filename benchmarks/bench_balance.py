@@ -0,0 +1,72 @@
+"""
+Balanced-symbol checking: traced is_balanced vs the find_imbalance fast path.
+
+Run from the project root:
+    python -m benchmarks.bench_balance [--size 4000000] [--traced-max 200000]
+"""
+import argparse
+import random
+import time
+
+from unit3.U3balancingsymbol import check_lines, find_imbalance, is_balanced
+
+PAIRS = ['()', '[]', '{}']
+FILLER = 'abcdefghij +-*/=;,'
+
+
+def make_text(size, symbol_ratio, seed=0):
+    """Build a balanced string of roughly size characters with nested brackets."""
+    rng = random.Random(seed)
+    out, stack = [], []
+    while len(out) < size:
+        r = rng.random()
+        if r < symbol_ratio / 2 or (r < symbol_ratio and not stack):
+            pair = rng.choice(PAIRS)
+            out.append(pair[0])
+            stack.append(pair[1])
+        elif r < symbol_ratio:
+            out.append(stack.pop())
+        elif r < symbol_ratio + 0.02:
+            out.append('\n')
+        else:
+            out.append(rng.choice(FILLER))
+    out.extend(reversed(stack))
+    return ''.join(out)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=int, default=4 * 10**6, help='characters of input')
+    parser.add_argument('--symbols', type=float, default=0.3, help='fraction of characters that are brackets')
+    parser.add_argument('--traced-max', type=int, default=200000,
+                        help='largest input given to the traced checker (it keeps a stack copy per character)')
+    args = parser.parse_args()
+
+    text = make_text(args.size, args.symbols)
+    traced_text = text[:args.traced_max]
+    print(f"{len(text):,} characters, {args.symbols:.0%} brackets\n")
+    print(f"{'checker':<28}{'chars':>12}{'ms':>10}{'ns/char':>10}")
+
+    elapsed, (ok, steps) = timed(is_balanced, traced_text)
+    print(f"{'is_balanced (traced)':<28}{len(traced_text):>12,}{elapsed * 1e3:>10.1f}"
+          f"{elapsed / len(traced_text) * 1e9:>10.1f}   {len(steps):,} steps")
+
+    elapsed, error = timed(find_imbalance, text)
+    print(f"{'find_imbalance':<28}{len(text):>12,}{elapsed * 1e3:>10.1f}"
+          f"{elapsed / len(text) * 1e9:>10.1f}   balanced={error is None}")
+
+    lines = text.splitlines()
+    elapsed, results = timed(check_lines, lines)
+    bad = sum(not r["balanced"] for r in results)
+    print(f"{'check_lines (per line)':<28}{len(text):>12,}{elapsed * 1e3:>10.1f}"
+          f"{elapsed / len(text) * 1e9:>10.1f}   {len(lines):,} lines, {bad:,} unbalanced")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Progress-table load test: dashboard query and upsert latency as user_progress grows.
+
+Builds a throwaway SQLite database, fills it with users x modules rows in
+stages, and after each stage times the dashboard query (progress_summary) and
+record_progress for random users.
+
+Run from the project root:
+    python -m benchmarks.bench_progress [--rows 2000000] [--no-index]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask
+from sqlalchemy import text
+
+import migrations
+from models import User, UserProgress, db, progress_summary, record_progress
+
+MODULES = 23
+
+
+def make_app(path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    db.init_app(app)
+    return app
+
+
+def fill(start_user, end_user):
+    """Insert users [start_user, end_user) with every module completed."""
+    base = datetime(2024, 1, 1)
+    users, rows = [], []
+    for uid in range(start_user, end_user):
+        users.append({"id": uid, "username": f"u{uid}", "password": "x"})
+        for m in range(MODULES):
+            rows.append({"user_id": uid, "module_name": f"module-{m}",
+                         "timestamp": base + timedelta(minutes=uid * MODULES + m)})
+    db.session.execute(User.__table__.insert(), users)
+    db.session.execute(UserProgress.__table__.insert(), rows)
+    db.session.commit()
+
+
+def time_queries(n_users, samples, rng, upsert=True):
+    uids = [rng.randrange(n_users) for _ in range(samples)]
+    start = time.perf_counter()
+    for uid in uids:
+        progress_summary(uid, 10)
+    summary_us = (time.perf_counter() - start) / samples * 1e6
+    upsert_us = None
+    if upsert:
+        # ON CONFLICT needs the unique index, so this is skipped with --no-index
+        start = time.perf_counter()
+        for uid in uids:
+            record_progress(uid, "module-0")     # already present: conflict path
+        upsert_us = (time.perf_counter() - start) / samples * 1e6
+    db.session.remove()
+    return summary_us, upsert_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2 * 10**6, help='final size of user_progress')
+    parser.add_argument('--samples', type=int, default=200, help='users queried per stage')
+    parser.add_argument('--no-index', action='store_true', help='drop the progress indexes to compare')
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench_progress.db')
+    app = make_app(path)
+    rng = random.Random(0)
+    with app.app_context():
+        migrations.upgrade(db.engine)
+        if args.no_index:
+            db.session.execute(text("DROP INDEX ix_user_progress_user_module"))
+            db.session.execute(text("DROP INDEX ix_user_progress_user_time"))
+            db.session.commit()
+
+        stages = []
+        size = 10**4
+        while size < args.rows:
+            stages.append(size)
+            size *= 10
+        stages.append(args.rows)
+
+        print(f"SQLite at {path}, indexes {'dropped' if args.no_index else 'on'}\n")
+        print(f"{'rows':>12}{'summary us':>12}{'upsert us':>12}")
+        users = 0
+        for target in stages:
+            goal = max(target // MODULES, 1)
+            for lo in range(users, goal, 20000):
+                fill(lo, min(lo + 20000, goal))
+            users = goal
+            summary_us, upsert_us = time_queries(users, args.samples, rng, not args.no_index)
+            upsert = f"{upsert_us:>12.1f}" if upsert_us is not None else f"{'n/a':>12}"
+            print(f"{users * MODULES:>12,}{summary_us:>12.1f}{upsert}")
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
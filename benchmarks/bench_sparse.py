@@ -0,0 +1,61 @@
+"""
+Sparse (COO/CSR) vs dense list-of-lists matrix multiplication at several densities.
+
+Run from the project root:
+    python -m benchmarks.bench_sparse [--n 200] [--densities 0.001 0.01 0.05 0.2]
+"""
+import argparse
+import random
+import time
+
+from unit2 import sparse_engine
+from unit2.sparse_engine import COOMatrix
+
+
+def random_matrix(n, density, rng):
+    nnz = max(1, int(n * n * density))
+    triplets = [(rng.randrange(n), rng.randrange(n), rng.randint(1, 9)) for _ in range(nnz)]
+    return COOMatrix.from_triplets(n, n, triplets)
+
+
+def to_dense(m):
+    dense = [[0] * m.cols for _ in range(m.rows)]
+    for r, c, v in m.entries:
+        dense[r][c] = v
+    return dense
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--n', type=int, default=200, help='square matrix size')
+    parser.add_argument('--densities', type=float, nargs='+', default=[0.001, 0.01, 0.05, 0.2])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    print(f"{args.n}x{args.n} multiply, best of {args.repeat} (ms); NumPy available: {sparse_engine.np is not None}\n")
+    print(f"{'density':>8}{'nnz':>9}{'COO':>10}{'CSR':>10}{'dense':>10}{'x vs dense':>12}")
+    for density in args.densities:
+        a, b = random_matrix(args.n, density, rng), random_matrix(args.n, density, rng)
+        a_csr, b_csr = a.to_csr(), b.to_csr()
+        a_dense, b_dense = to_dense(a), to_dense(b)
+
+        coo = best_of(lambda: sparse_engine.multiply(a, b), args.repeat)
+        csr = best_of(lambda: sparse_engine.multiply(a_csr, b_csr), args.repeat)
+        dense = best_of(lambda: sparse_engine.dense_multiply(a_dense, b_dense), args.repeat)
+        print(f"{density:>8}{a.nnz():>9}{coo * 1e3:>10.1f}{csr * 1e3:>10.1f}{dense * 1e3:>10.1f}"
+              f"{dense / csr:>11.1f}x")
+
+
+if __name__ == '__main__':
+    main()
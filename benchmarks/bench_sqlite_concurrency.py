@@ -0,0 +1,98 @@
+"""
+Concurrent write throughput on SQLite: rollback journal vs WAL.
+
+Starts --workers processes (like gunicorn workers), each with its own
+engine configured through db_config, and has each commit --writes
+progress rows one transaction at a time, the way mark_complete does.
+Every configuration runs against a fresh database file.
+
+Run from the project root:
+    python -m benchmarks.bench_sqlite_concurrency [--workers 8] [--writes 300]
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+import db_config
+
+CONFIGS = {
+    # SQLite's own defaults, with pysqlite's 5 s lock wait
+    'delete/full': {'SQLITE_JOURNAL_MODE': 'DELETE', 'SQLITE_SYNCHRONOUS': 'FULL', 'SQLITE_BUSY_TIMEOUT_MS': '5000'},
+    'delete/full, no wait': {'SQLITE_JOURNAL_MODE': 'DELETE', 'SQLITE_SYNCHRONOUS': 'FULL', 'SQLITE_BUSY_TIMEOUT_MS': '0'},
+    'wal/normal': {},
+}
+
+
+def make_engine(path, env):
+    uri = f'sqlite:///{path}'
+    settings = db_config.settings_from_env(env)
+    engine = create_engine(uri, **db_config.engine_options(uri, settings))
+    db_config.sqlite_pragmas(engine, settings)
+    return engine
+
+
+def worker(path, env, worker_id, writes, start_at, results):
+    engine = make_engine(path, env)
+    while time.time() < start_at:
+        time.sleep(0.001)
+    ok = locked = 0
+    begin = time.perf_counter()
+    for i in range(writes):
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("INSERT OR IGNORE INTO user_progress (user_id, module_name, timestamp) "
+                                  "VALUES (:u, :m, CURRENT_TIMESTAMP)"), {"u": worker_id * writes + i, "m": "bench"})
+            ok += 1
+        except OperationalError as e:
+            if 'locked' not in str(e):
+                raise
+            locked += 1
+    results.put((ok, locked, time.perf_counter() - begin))
+    engine.dispose()
+
+
+def run(name, env, workers, writes):
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    engine = make_engine(path, env)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE user_progress (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, "
+                          "module_name VARCHAR(100) NOT NULL, timestamp DATETIME NOT NULL)"))
+        conn.execute(text("CREATE UNIQUE INDEX ix_user_progress_user_module ON user_progress (user_id, module_name)"))
+    engine.dispose()
+
+    results = multiprocessing.Queue()
+    start_at = time.time() + 0.5
+    procs = [multiprocessing.Process(target=worker, args=(path, env, w, writes, start_at, results))
+             for w in range(workers)]
+    for p in procs:
+        p.start()
+    stats = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    ok = sum(s[0] for s in stats)
+    locked = sum(s[1] for s in stats)
+    wall = max(s[2] for s in stats)
+    print(f"{name:<24}{ok:>10,}{locked:>10,}{wall:>10.2f}{ok / wall:>12,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--writes', type=int, default=300, help='commits per worker')
+    parser.add_argument('--config', choices=list(CONFIGS), action='append',
+                        help='configuration to run (repeatable; default all)')
+    args = parser.parse_args()
+
+    print(f"{args.workers} workers x {args.writes} commits\n")
+    print(f"{'config':<24}{'commits':>10}{'locked':>10}{'wall s':>10}{'commits/s':>12}")
+    for name in args.config or CONFIGS:
+        run(name, CONFIGS[name], args.workers, args.writes)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Amortized push cost: dynamic array stack (U3stackarray) vs linked stack (U3stack).
+
+Run from the project root:
+    python -m benchmarks.bench_stack [--ops 1000000]
+"""
+import argparse
+import time
+
+from unit3.U3stack import Stack as LinkedStack
+from unit3.U3stackarray import Stack as ArrayStack
+
+
+def time_pushes(stack, ops):
+    start = time.perf_counter()
+    for i in range(ops):
+        stack.push(i)
+    return time.perf_counter() - start
+
+
+def time_pops(stack, ops):
+    start = time.perf_counter()
+    for _ in range(ops):
+        stack.pop()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--ops', type=int, default=10**6, help='pushes (then pops) per stack')
+    args = parser.parse_args()
+    ops = args.ops
+
+    array_stack = ArrayStack(size=1, dynamic=True)
+    linked_stack = LinkedStack()
+
+    array_push = time_pushes(array_stack, ops)
+    grows = len(array_stack.take_events())
+    grow_copies = array_stack.copies
+    linked_push = time_pushes(linked_stack, ops)
+
+    array_pop = time_pops(array_stack, ops)
+    shrinks = len(array_stack.take_events())
+    linked_pop = time_pops(linked_stack, ops)
+
+    print(f"{ops:,} operations per stack\n")
+    print(f"{'':<22}{'push ns/op':>12}{'pop ns/op':>12}")
+    print(f"{'array (dynamic)':<22}{array_push / ops * 1e9:>12.1f}{array_pop / ops * 1e9:>12.1f}")
+    print(f"{'linked':<22}{linked_push / ops * 1e9:>12.1f}{linked_pop / ops * 1e9:>12.1f}")
+    print()
+    print(f"array reallocations: {grows} grow, {shrinks} shrink")
+    print(f"elements copied while growing: {grow_copies:,} ({grow_copies / ops:.2f} per push)")
+
+
+if __name__ == '__main__':
+    main()
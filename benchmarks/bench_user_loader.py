@@ -0,0 +1,65 @@
+"""
+Authenticated page requests/sec with and without the identity cache.
+
+Logs a user in through the test client and requests a visualizer page
+(which renders current_user through Flask-Login's context processor)
+repeatedly, once with the user_loader cache on and once with it off,
+counting the SQL statements issued per request.
+
+Run from the project root:
+    python -m benchmarks.bench_user_loader [--requests 3000] [--url /unit3/U3stack/]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+# Point the app at a throwaway database before it is imported
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_users.db')}")
+os.environ.setdefault('AUTO_MIGRATE', '1')
+
+from sqlalchemy import event  # noqa: E402
+
+from app import app  # noqa: E402
+from auth import bcrypt  # noqa: E402
+from identity_cache import identity_cache  # noqa: E402
+from models import User, db  # noqa: E402
+
+
+def run(client, url, requests, counter):
+    client.get(url)   # warm up (and fill the cache when it is on)
+    counter[0] = 0
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get(url)
+    elapsed = time.perf_counter() - start
+    return requests / elapsed, counter[0] / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=3000)
+    parser.add_argument('--url', default='/unit3/U3stack/')
+    args = parser.parse_args()
+
+    counter = [0]
+    with app.app_context():
+        if db.session.get(User, 1) is None:
+            db.session.add(User(id=1, username='bench', password=bcrypt.generate_password_hash('pw').decode()))
+            db.session.commit()
+        event.listen(db.engine, 'before_cursor_execute', lambda *a: counter.__setitem__(0, counter[0] + 1))
+
+    client = app.test_client()
+    client.post('/login', data={'username': 'bench', 'password': 'pw'})
+
+    print(f"{args.requests:,} GET {args.url} as a logged-in user\n")
+    print(f"{'user_loader':<14}{'req/s':>10}{'SQL/req':>10}")
+    for label, enabled in (('uncached', False), ('cached', True)):
+        identity_cache.enabled = enabled
+        identity_cache.backend.clear()
+        rps, queries = run(client, args.url, args.requests, counter)
+        print(f"{label:<14}{rps:>10,.0f}{queries:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
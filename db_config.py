@@ -0,0 +1,116 @@
+"""
+Database engine configuration, read from environment variables.
+
+    DATABASE_URL            sqlite:///site.db
+                            any SQLAlchemy URL, e.g. postgresql://user:pw@host/dsa;
+                            the legacy postgres:// scheme is accepted too
+
+SQLite settings are applied to every new connection through an engine
+"connect" event:
+
+    SQLITE_JOURNAL_MODE     WAL       readers no longer block the writer
+    SQLITE_SYNCHRONOUS      NORMAL    fsync at checkpoints, not every commit
+    SQLITE_BUSY_TIMEOUT_MS  5000      wait this long for a lock before failing
+
+Pool sizing (ignored for in-memory SQLite, which uses a single connection):
+
+    DB_POOL_SIZE            5
+    DB_MAX_OVERFLOW         10
+    DB_POOL_TIMEOUT         30        seconds to wait for a free connection
+    DB_POOL_RECYCLE         -1        seconds before a connection is replaced
+
+Connections to server databases are pinged before use, so ones dropped by
+the server are replaced instead of failing a request.
+
+Usage in app.py:
+
+    db_config.configure(app)
+    db.init_app(app)
+    db_config.install_pragmas(app, db)
+"""
+import os
+
+from sqlalchemy import event
+
+JOURNAL_MODES = ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF')
+SYNCHRONOUS_LEVELS = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+DEFAULT_DATABASE_URL = 'sqlite:///site.db'
+
+
+def database_uri(environ=None):
+    env = os.environ if environ is None else environ
+    uri = env.get('DATABASE_URL') or DEFAULT_DATABASE_URL
+    if uri.startswith('postgres://'):
+        uri = 'postgresql://' + uri[len('postgres://'):]
+    return uri
+
+
+def settings_from_env(environ=None):
+    env = os.environ if environ is None else environ
+    settings = {
+        'journal_mode': env.get('SQLITE_JOURNAL_MODE', 'WAL').upper(),
+        'synchronous': env.get('SQLITE_SYNCHRONOUS', 'NORMAL').upper(),
+        'busy_timeout_ms': int(env.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        'pool_size': int(env.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(env.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': float(env.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(env.get('DB_POOL_RECYCLE', -1)),
+    }
+    if settings['journal_mode'] not in JOURNAL_MODES:
+        raise ValueError(f"SQLITE_JOURNAL_MODE must be one of {', '.join(JOURNAL_MODES)}.")
+    if settings['synchronous'] not in SYNCHRONOUS_LEVELS:
+        raise ValueError(f"SQLITE_SYNCHRONOUS must be one of {', '.join(SYNCHRONOUS_LEVELS)}.")
+    return settings
+
+
+def is_memory_sqlite(uri):
+    return uri in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in uri
+
+
+def engine_options(uri, settings):
+    """Keyword arguments for create_engine / SQLALCHEMY_ENGINE_OPTIONS."""
+    if is_memory_sqlite(uri):
+        return {}
+    options = {
+        'pool_size': settings['pool_size'],
+        'max_overflow': settings['max_overflow'],
+        'pool_timeout': settings['pool_timeout'],
+        'pool_recycle': settings['pool_recycle'],
+    }
+    if not uri.startswith('sqlite'):
+        options['pool_pre_ping'] = True
+    return options
+
+
+def sqlite_pragmas(engine, settings):
+    """Run the PRAGMA settings on every connection the engine opens."""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        cursor.execute(f"PRAGMA busy_timeout = {settings['busy_timeout_ms']}")
+        if not is_memory_sqlite(str(engine.url)):
+            cursor.execute(f"PRAGMA journal_mode = {settings['journal_mode']}")
+        cursor.execute(f"PRAGMA synchronous = {settings['synchronous']}")
+        cursor.close()
+
+
+def configure(app, environ=None):
+    """Set the database URI (unless already set) and SQLALCHEMY_ENGINE_OPTIONS.
+
+    Call before db.init_app(app).
+    """
+    app.config.setdefault('SQLALCHEMY_DATABASE_URI', database_uri(environ))
+    settings = settings_from_env(environ)
+    app.config['DB_SETTINGS'] = settings
+    options = engine_options(app.config['SQLALCHEMY_DATABASE_URI'], settings)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {}).update(options)
+    return settings
+
+
+def install_pragmas(app, db):
+    """Attach the connect-time PRAGMAs to the app's engine; call after db.init_app(app)."""
+    with app.app_context():
+        sqlite_pragmas(db.engine, app.config['DB_SETTINGS'])
@@ -0,0 +1,77 @@
+"""
+Short-lived cache of logged-in identities for Flask-Login's user_loader.
+
+Flask-Login loads the user on every request that renders a template
+(its context processor injects current_user), so each visualizer page
+cost a SELECT on the user table. The loader now keeps a small
+SessionUser per id in the same TTL'd LRU the progress cache uses.
+
+SessionUser carries only what requests use (id and username). It is not
+an ORM object, so it never needs a database session and cannot go stale
+in a way that matters for longer than USER_CACHE_TTL. Code that needs
+the full row (e.g. the password hash) loads it explicitly.
+
+Config keys: USER_CACHE_SIZE (entries, 0 disables), USER_CACHE_TTL
+(seconds). Call invalidate(user_id) on logout and whenever a user's
+row changes.
+"""
+from flask_login import UserMixin
+
+from progress_cache import LocalBackend
+
+
+class SessionUser(UserMixin):
+    __slots__ = ('id', 'username')
+
+    def __init__(self, id, username):
+        self.id = id
+        self.username = username
+
+    def __repr__(self):
+        return f"SessionUser('{self.username}')"
+
+
+class IdentityCache:
+    def __init__(self, size=10000, ttl=30):
+        self.backend = LocalBackend(size, ttl)
+        self.enabled = size > 0
+        self.hits = self.misses = 0
+
+    def init_app(self, app):
+        size = int(app.config.get('USER_CACHE_SIZE', 10000))
+        ttl = int(app.config.get('USER_CACHE_TTL', 30))
+        self.backend = LocalBackend(size, ttl)
+        self.enabled = size > 0
+
+    def load(self, user_id, loader):
+        """Return the SessionUser for user_id, calling loader(user_id) on a miss."""
+        if self.enabled:
+            user = self.backend.get(user_id)
+            if user is not None:
+                self.hits += 1
+                return user
+        self.misses += 1
+        row = loader(user_id)
+        if row is None:
+            return None
+        user = SessionUser(row.id, row.username)
+        if self.enabled:
+            self.backend.set(user_id, user)
+        return user
+
+    def invalidate(self, user_id):
+        self.backend.delete(user_id)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.backend.evictions,
+        }
+
+
+identity_cache = IdentityCache()
@@ -0,0 +1,224 @@
+"""
+Request instrumentation for every blueprint, exported at /metrics.
+
+For each request, by endpoint (e.g. "prims.generate"):
+
+    dsa_request_duration_seconds   histogram, by endpoint and method
+    dsa_response_size_bytes        histogram; streamed responses are skipped
+    dsa_trace_steps                histogram of the length of the step list
+                                   ("steps", "trace", "moves" or "explanation")
+                                   in JSON responses
+    dsa_requests_total             counter, by endpoint, method and status
+
+Step lists are counted as the JSON body is built (the app's JSON provider
+is wrapped), so responses are never parsed again to measure them.
+
+Stats from the caches, progress writer and rate limiter are added with
+add_stats(): running totals as dsa_<prefix>_<key>_total counters, the
+rest as gauges. The output is the Prometheus text format, so any
+Prometheus-compatible scraper can read it.
+
+/metrics shows the same stats as the /api/*_stats routes, so it is
+protected like them: with METRICS_TOKEN set, a scraper must send
+"Authorization: Bearer <token>" (401 otherwise); without it, /metrics
+needs a logged-in user.
+
+METRICS_ENABLED=0 (FLASK_METRICS_ENABLED=0) turns instrumentation off and
+/metrics then answers 404. Numbers are per process: under gunicorn with
+several workers, each scrape sees the worker that served it.
+"""
+import hmac
+import threading
+import time
+
+from flask import Response, abort, g, request
+from flask_login import login_required
+from flask.json.provider import DefaultJSONProvider
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+STEP_BUCKETS = (1, 10, 50, 100, 500, 1000, 5000, 10000, 50000)
+TRACE_KEYS = ('steps', 'trace', 'moves', 'explanation')
+# Anything else is labelled "other", so made-up verbs cannot create new series
+METHODS = frozenset(('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'))
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _number(value):
+    # Integers stay exact; floats use repr, which round-trips
+    return str(int(value)) if isinstance(value, (bool, int)) else repr(float(value))
+
+
+def _bound(value):
+    # Bucket bounds are exact too: 1048576 stays 1048576, not 1.04858e+06
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return _number(value)
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+class Histogram:
+    def __init__(self, name, help, buckets, label_names):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.label_names = label_names
+        self.series = {}   # label values -> [count per bucket..., +Inf count, sum]
+
+    def observe(self, label_values, value):
+        row = self.series.get(label_values)
+        if row is None:
+            row = self.series[label_values] = [0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                row[i] += 1
+                break
+        else:
+            row[-2] += 1
+        row[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_values, row in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), row[:-1]):
+                cumulative += count
+                le = bound if bound == '+Inf' else _bound(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, label_values, [('le', le)])} {cumulative}")
+            labels = _labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {_number(row[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help, label_names):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.series = {}
+
+    def inc(self, label_values):
+        self.series[label_values] = self.series.get(label_values, 0) + 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self.series.items()):
+            lines.append(f"{self.name}{_labels(self.label_names, label_values)} {value}")
+        return lines
+
+
+class TraceCountingJSONProvider(DefaultJSONProvider):
+    """Notes the length of a response's step list while jsonify builds it."""
+
+    def response(self, *args, **kwargs):
+        if len(args) == 1 and isinstance(args[0], dict):
+            for key in TRACE_KEYS:
+                value = args[0].get(key)
+                if isinstance(value, list):
+                    g.trace_steps = len(value)
+                    break
+        return super().response(*args, **kwargs)
+
+
+class Metrics:
+    def __init__(self):
+        self.enabled = False
+        self.token = None
+        self.lock = threading.Lock()
+        self.stats_sources = []
+        self.latency = Histogram('dsa_request_duration_seconds', 'Time spent handling the request.',
+                                 LATENCY_BUCKETS, ('endpoint', 'method'))
+        self.size = Histogram('dsa_response_size_bytes', 'Response body size.',
+                              SIZE_BUCKETS, ('endpoint',))
+        self.steps = Histogram('dsa_trace_steps', 'Length of the step trace returned.',
+                               STEP_BUCKETS, ('endpoint',))
+        self.requests = Counter('dsa_requests_total', 'Requests handled.',
+                                ('endpoint', 'method', 'status'))
+
+    def init_app(self, app):
+        self.enabled = str(app.config.get('METRICS_ENABLED', '1')).lower() not in ('0', 'false', 'no', 'off')
+        self.token = app.config.get('METRICS_TOKEN') or None
+        app.add_url_rule('/metrics', 'metrics', self.export if self.token else login_required(self.export))
+        if not self.enabled:
+            return
+        app.json = TraceCountingJSONProvider(app)
+        app.before_request(self._start)
+        app.after_request(self._record)
+
+    def add_stats(self, prefix, stats, counters=()):
+        """Export the numbers in stats() (a dict) as dsa_<prefix>_<key> metrics.
+
+        Keys named in counters only ever grow and are exported as
+        dsa_<prefix>_<key>_total counters; the others are gauges. Nested
+        dicts become one metric labelled by their keys; strings and
+        None are skipped.
+        """
+        self.stats_sources.append((prefix, stats, frozenset(counters)))
+
+    def _start(self):
+        g.request_started = time.perf_counter()
+
+    def _record(self, response):
+        started = g.pop('request_started', None)
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        endpoint = request.endpoint or 'unmatched'   # 404s share one series
+        method = request.method if request.method in METHODS else 'other'
+        size = None if response.is_streamed else response.calculate_content_length()
+        steps = g.pop('trace_steps', None)
+        with self.lock:
+            self.latency.observe((endpoint, method), elapsed)
+            self.requests.inc((endpoint, method, str(response.status_code)))
+            if size is not None:
+                self.size.observe((endpoint,), size)
+            if steps is not None:
+                self.steps.observe((endpoint,), steps)
+        return response
+
+    def _stats_lines(self):
+        lines = []
+        for prefix, stats, counters in self.stats_sources:
+            for key, value in stats().items():
+                kind = 'counter' if key in counters else 'gauge'
+                name = f"dsa_{prefix}_{key}" + ('_total' if kind == 'counter' else '')
+                if isinstance(value, dict):
+                    samples = [(_labels(('key',), (k,)), v) for k, v in sorted(value.items())
+                               if isinstance(v, (int, float))]
+                elif isinstance(value, (int, float)):
+                    samples = [('', value)]
+                else:
+                    continue
+                if samples:
+                    lines.append(f"# TYPE {name} {kind}")
+                    lines.extend(f"{name}{labels} {_number(v)}" for labels, v in samples)
+        return lines
+
+    def render(self):
+        with self.lock:
+            lines = [*self.latency.render(), *self.size.render(), *self.steps.render(),
+                     *self.requests.render()]
+        lines.extend(self._stats_lines())
+        return '\n'.join(lines) + '\n'
+
+    def export(self):
+        if not self.enabled:
+            abort(404)
+        if self.token:
+            scheme, _, given = request.headers.get('Authorization', '').partition(' ')
+            if scheme.lower() != 'bearer' or not hmac.compare_digest(given.encode(), self.token.encode()):
+                return Response('Unauthorized\n', 401, {'WWW-Authenticate': 'Bearer'}, mimetype='text/plain')
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+
+metrics = Metrics()
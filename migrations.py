@@ -0,0 +1,111 @@
+"""
+Versioned schema migrations.
+
+Each migration is (version, description, function) and runs once, inside
+one transaction with the schema_version row that records it. Run them
+once per deploy, not at every worker boot:
+
+    flask --app app upgrade-db
+
+Migrations are written against their own frozen table definitions (not
+the live models) so replaying them on an empty database always builds
+the same schema, on SQLite or PostgreSQL. Databases created by
+db.create_all() before versioning existed are adopted: version 1 only
+creates tables that are missing.
+"""
+import logging
+from datetime import datetime
+
+from sqlalchemy import (Column, DateTime, ForeignKey, Integer, MetaData, String, Table, inspect,
+                        select, text)
+from sqlalchemy.exc import DBAPIError, IntegrityError
+
+log = logging.getLogger(__name__)
+
+version_table = Table(
+    'schema_version', MetaData(),
+    Column('version', Integer, primary_key=True, autoincrement=False),
+    Column('description', String(200), nullable=False),
+    Column('applied_at', DateTime, nullable=False),
+)
+
+
+def initial_schema(conn):
+    """The user and user_progress tables as they were first shipped."""
+    meta = MetaData()
+    Table('user', meta,
+          Column('id', Integer, primary_key=True),
+          Column('username', String(20), unique=True, nullable=False),
+          Column('password', String(60), nullable=False))
+    Table('user_progress', meta,
+          Column('id', Integer, primary_key=True),
+          Column('module_name', String(100), nullable=False),
+          Column('timestamp', DateTime, nullable=False),
+          Column('user_id', Integer, ForeignKey('user.id'), nullable=False))
+    meta.create_all(conn, checkfirst=True)
+
+
+def progress_unique_index(conn):
+    """Keep the earliest row per (user_id, module_name), then index the pair."""
+    conn.execute(text(
+        "DELETE FROM user_progress WHERE id NOT IN "
+        "(SELECT MIN(id) FROM user_progress GROUP BY user_id, module_name)"
+    ))
+    # Names match UserProgress.__table_args__
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_user_progress_user_module "
+        "ON user_progress (user_id, module_name)"
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_user_progress_user_time "
+        "ON user_progress (user_id, timestamp)"
+    ))
+
+
+MIGRATIONS = [
+    (1, 'initial user and user_progress tables', initial_schema),
+    (2, 'unique (user_id, module_name) and (user_id, timestamp) indexes on user_progress', progress_unique_index),
+]
+
+
+def current_version(engine):
+    if not inspect(engine).has_table('schema_version'):
+        return 0
+    with engine.connect() as conn:
+        return conn.execute(select(version_table.c.version).order_by(
+            version_table.c.version.desc()).limit(1)).scalar() or 0
+
+
+def pending(engine):
+    version = current_version(engine)
+    return [m for m in MIGRATIONS if m[0] > version]
+
+
+def upgrade(engine):
+    """Apply every pending migration; return the versions applied.
+
+    If another process applies the same version first, inserting its
+    schema_version row fails, this migration's transaction rolls back,
+    and the upgrade continues from the new current version.
+    """
+    try:
+        version_table.create(engine, checkfirst=True)
+    except DBAPIError:
+        # Lost the race to create it; anything else is a real error
+        if not inspect(engine).has_table('schema_version'):
+            raise
+    applied = []
+    for version, description, func in MIGRATIONS:
+        if version <= current_version(engine):
+            continue
+        try:
+            with engine.begin() as conn:
+                conn.execute(version_table.insert().values(
+                    version=version, description=description, applied_at=datetime.utcnow()))
+                func(conn)
+        except IntegrityError:
+            log.info("Migration %d was applied by another process", version)
+            continue
+        log.info("Applied migration %d: %s", version, description)
+        applied.append(version)
+    return applied
@@ -1,6 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from datetime import datetime
+from sqlalchemy.dialects import postgresql, sqlite
 
 # Initialize database
 db = SQLAlchemy()
@@ -18,10 +19,59 @@ class User(db.Model, UserMixin):
 
 # Progress Model
 class UserProgress(db.Model):
+    # One row per (user, module): the unique index makes completion idempotent
+    # and serves per-user counts; the second index serves the recent-history query
+    __table_args__ = (
+        db.Index('ix_user_progress_user_module', 'user_id', 'module_name', unique=True),
+        db.Index('ix_user_progress_user_time', 'user_id', 'timestamp'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     module_name = db.Column(db.String(100), nullable=False)
     timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
 
     def __repr__(self):
-        return f"Progress('{self.module_name}')"
\ No newline at end of file
+        return f"Progress('{self.module_name}')"
+
+
+_UPSERT_DIALECTS = {'sqlite': sqlite, 'postgresql': postgresql}
+
+
+def insert_progress(rows):
+    """Insert progress rows (dicts of user_id, module_name, timestamp) in one
+    multi-row INSERT ... ON CONFLICT DO NOTHING; return how many were new.
+    """
+    dialect = _UPSERT_DIALECTS[db.engine.dialect.name]
+    stmt = dialect.insert(UserProgress.__table__).values(rows).on_conflict_do_nothing(
+        index_elements=['user_id', 'module_name'])
+    result = db.session.execute(stmt)
+    db.session.commit()
+    return result.rowcount
+
+
+def record_progress(user_id, module_name):
+    """Mark a module complete; return True if this call created the row.
+
+    The unique index decides, so concurrent clicks cannot create
+    duplicates or race between a check and an insert.
+    """
+    return insert_progress([{"user_id": user_id, "module_name": module_name,
+                             "timestamp": datetime.utcnow()}]) == 1
+
+
+def progress_summary(user_id, history=10, modules=None):
+    """Return (completed, recent rows) for a user in one round-trip.
+
+    COUNT(*) OVER () is evaluated before LIMIT, so every returned row
+    carries the user's total alongside the newest history rows. When
+    modules is given, rows for other module names are left out of both.
+    """
+    completed = db.func.count().over().label('completed')
+    query = db.session.query(UserProgress, completed).filter(UserProgress.user_id == user_id)
+    if modules is not None:
+        query = query.filter(UserProgress.module_name.in_(modules))
+    rows = (query
+            .order_by(UserProgress.timestamp.desc())
+            .limit(history).all())
+    return (rows[0].completed if rows else 0), [row.UserProgress for row in rows]
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""
+Bounded password hashing, with a configurable bcrypt cost.
+
+Hashes are computed on a small shared thread pool (bcrypt releases the
+GIL while it works). At most HASH_POOL_SIZE hashes run at once and at
+most HASH_QUEUE_DEPTH more may wait. A request that cannot get a slot
+within HASH_QUEUE_TIMEOUT seconds raises HashingBusy, so a login burst
+gets fast "try again" answers instead of every worker thread stacking up
+behind bcrypt.
+
+The request thread still waits for its own hash, so this only bounds
+work when one process serves several requests at once (threaded dev
+server, gunicorn --threads or gthread/gevent workers). Under gunicorn's
+default sync workers each process handles one request at a time: the
+pool adds no concurrency and the limits never fill. Set HASH_POOL_SIZE=0
+there to hash on the request thread without the pool; the number of
+workers is then what bounds concurrent hashes.
+
+BCRYPT_LOG_ROUNDS sets the cost for new hashes (Flask-Bcrypt's key,
+default 12). needs_rehash() tells login when a stored hash was made at a
+different cost, so it can be upgraded while the plain password is at
+hand.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing pool and its queue are full."""
+
+
+class PasswordHasher:
+    def __init__(self, bcrypt):
+        self.bcrypt = bcrypt
+        self.rounds = 12
+        self.pool = None
+        self.slots = None
+        self.queue_timeout = 2.0
+        self.rejected = 0
+
+    def init_app(self, app):
+        self.rounds = int(app.config.get('BCRYPT_LOG_ROUNDS', 12))
+        workers = int(app.config.get('HASH_POOL_SIZE', 4))
+        depth = int(app.config.get('HASH_QUEUE_DEPTH', 16))
+        self.queue_timeout = float(app.config.get('HASH_QUEUE_TIMEOUT', 2.0))
+        if workers <= 0:
+            self.pool = self.slots = None
+            return
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self.slots = threading.BoundedSemaphore(workers + depth)
+
+    def _run(self, func, *args):
+        if self.pool is None:
+            return func(*args)
+        if not self.slots.acquire(timeout=self.queue_timeout):
+            self.rejected += 1
+            raise HashingBusy("Too many password checks in progress.")
+        try:
+            return self.pool.submit(func, *args).result()
+        finally:
+            self.slots.release()
+
+    def hash(self, password):
+        return self._run(self.bcrypt.generate_password_hash, password, self.rounds).decode('utf-8')
+
+    def verify(self, pw_hash, password):
+        return self._run(self.bcrypt.check_password_hash, pw_hash, password)
+
+    def stats(self):
+        return {"rounds": self.rounds, "pooled": self.pool is not None, "rejected": self.rejected}
+
+    def needs_rehash(self, pw_hash):
+        # "$2b$12$<salt+hash>": the cost is the third field
+        try:
+            return int(pw_hash.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
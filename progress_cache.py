@@ -0,0 +1,183 @@
+"""
+Per-user dashboard summary cache.
+
+A summary is (completed count, newest history entries). Reads go through
+summary_cache.get(user_id, loader); mark_complete calls
+summary_cache.completed(...) so a cached summary is updated in place
+instead of being reloaded.
+
+The default backend is an in-process LRU with a TTL. The TTL bounds how
+stale another worker's copy can get when several processes serve the
+app. Setting PROGRESS_CACHE_URL to a redis:// URL (with the redis
+package installed) switches to a shared backend; there, writes delete
+the key so every worker reloads it.
+
+Config keys: PROGRESS_CACHE_SIZE (entries, 0 disables caching),
+PROGRESS_CACHE_TTL (seconds), PROGRESS_CACHE_URL.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import datetime
+
+try:
+    import redis
+except ImportError:  # the shared backend is optional
+    redis = None
+
+# Same attribute names as UserProgress, so templates render either one
+ProgressEntry = namedtuple('ProgressEntry', 'module_name timestamp')
+
+
+class LocalBackend:
+    """Thread-safe LRU of user_id -> (expires_at, summary)."""
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, user_id):
+        with self.lock:
+            item = self.entries.get(user_id)
+            if item is None:
+                return None
+            if item[0] < time.monotonic():
+                del self.entries[user_id]
+                return None
+            self.entries.move_to_end(user_id)
+            return item[1]
+
+    def set(self, user_id, summary):
+        with self.lock:
+            self.entries[user_id] = (time.monotonic() + self.ttl, summary)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def update(self, user_id, func):
+        """Replace a cached summary with func(summary); return False if absent."""
+        with self.lock:
+            item = self.entries.get(user_id)
+            if item is not None:
+                self.entries[user_id] = (item[0], func(item[1]))
+                return True
+            return False
+
+    def delete(self, user_id):
+        with self.lock:
+            return self.entries.pop(user_id, None) is not None
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class RedisBackend:
+    """Summaries as JSON under progress:<user_id>, shared by every worker."""
+
+    def __init__(self, url, ttl):
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.evictions = 0   # redis evicts on its own; not tracked here
+
+    def get(self, user_id):
+        raw = self.client.get(f"progress:{user_id}")
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        return data["completed"], [ProgressEntry(name, datetime.fromisoformat(ts))
+                                   for name, ts in data["history"]]
+
+    def set(self, user_id, summary):
+        completed, history = summary
+        data = {"completed": completed,
+                "history": [[e.module_name, e.timestamp.isoformat()] for e in history]}
+        self.client.set(f"progress:{user_id}", json.dumps(data), ex=self.ttl)
+
+    def update(self, user_id, func):
+        # A read-modify-write here could race with other workers; dropping
+        # the key and letting the next read reload it is always correct
+        self.delete(user_id)
+        return None
+
+    def delete(self, user_id):
+        return bool(self.client.delete(f"progress:{user_id}"))
+
+    def clear(self):
+        for key in self.client.scan_iter("progress:*"):
+            self.client.delete(key)
+
+
+class SummaryCache:
+    def __init__(self, size=10000, ttl=60, history=10):
+        self.history = history
+        self.backend = LocalBackend(size, ttl)
+        self.enabled = size > 0
+        self.hits = self.misses = self.updates = self.invalidations = 0
+
+    def init_app(self, app):
+        size = int(app.config.get('PROGRESS_CACHE_SIZE', 10000))
+        ttl = int(app.config.get('PROGRESS_CACHE_TTL', 60))
+        url = app.config.get('PROGRESS_CACHE_URL')
+        if url:
+            if redis is None:
+                raise RuntimeError("PROGRESS_CACHE_URL is set but the redis package is not installed.")
+            self.backend = RedisBackend(url, ttl)
+        else:
+            self.backend = LocalBackend(size, ttl)
+        self.enabled = bool(url) or size > 0
+
+    def get(self, user_id, loader):
+        """Return the user's summary, calling loader() on a miss."""
+        if not self.enabled:
+            return loader()
+        summary = self.backend.get(user_id)
+        if summary is not None:
+            self.hits += 1
+            return summary
+        self.misses += 1
+        completed, rows = loader()
+        summary = (completed, [ProgressEntry(r.module_name, r.timestamp) for r in rows])
+        self.backend.set(user_id, summary)
+        return summary
+
+    def completed(self, user_id, module_name, timestamp=None):
+        """Write-through after a new completion was recorded."""
+        if not self.enabled:
+            return
+        entry = ProgressEntry(module_name, timestamp or datetime.utcnow())
+        updated = self.backend.update(user_id, lambda s: (s[0] + 1, [entry, *s[1]][:self.history]))
+        if updated:
+            self.updates += 1
+        elif updated is None:
+            self.invalidations += 1
+
+    def invalidate(self, user_id):
+        if self.enabled and self.backend.delete(user_id):
+            self.invalidations += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "enabled": self.enabled,
+            # Counting redis keys means scanning the keyspace; not done on a stats call
+            "entries": len(self.backend) if isinstance(self.backend, LocalBackend) else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "write_through_updates": self.updates,
+            "invalidations": self.invalidations,
+            "evictions": self.backend.evictions,
+        }
+
+
+summary_cache = SummaryCache()
@@ -0,0 +1,317 @@
+"""
+Buffered writer for progress events.
+
+In "buffered" mode mark_complete only appends the event to an in-process
+buffer. A background thread writes the buffer with one multi-row
+INSERT ... ON CONFLICT DO NOTHING when it holds PROGRESS_BATCH_SIZE
+events or PROGRESS_FLUSH_INTERVAL seconds have passed, whichever comes
+first. Each lab-session burst becomes a few short transactions instead
+of one commit per click.
+
+Durability:
+  - the buffer is flushed at interpreter exit (atexit), which covers a
+    normal shutdown and gunicorn's graceful worker restarts; events that
+    still cannot be written then are counted in the log;
+  - a hard kill loses at most the events of the last interval;
+  - a failed batch is split and its events are inserted one by one, so
+    one bad event cannot hold up the others;
+  - events that fail with a connection or locking error go back to the
+    front of the buffer and are retried, with the wait between flushes
+    doubling up to PROGRESS_RETRY_MAX_DELAY seconds; after
+    PROGRESS_MAX_RETRIES failed attempts they are given up on;
+  - events that fail for any other reason (e.g. a foreign key violation
+    for a deleted user) cannot succeed on retry and are given up on at
+    once. Given-up events are logged, counted in dropped_events (never in
+    events_flushed) and kept in a bounded dead_letters list for inspection;
+  - when PROGRESS_MAX_PENDING events are already waiting, new events are
+    written synchronously instead, so memory stays bounded while the
+    database is slow.
+
+The dashboard calls flush_user() to write just the viewing user's events,
+so it never waits on a full flush of everyone else's.
+
+In "sync" mode (PROGRESS_WRITE_MODE=sync) every event is committed
+before the request returns, as before.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+
+from sqlalchemy.exc import InterfaceError, OperationalError, TimeoutError as PoolTimeout
+
+from models import insert_progress, record_progress
+from progress_cache import summary_cache
+
+log = logging.getLogger(__name__)
+
+WRITE_MODES = ('buffered', 'sync')
+
+# Errors that may clear up on their own: lost connections, locks, a full pool
+TRANSIENT_ERRORS = (OperationalError, InterfaceError, PoolTimeout)
+
+
+class ProgressWriter:
+    def __init__(self):
+        self.app = None
+        self.mode = 'sync'
+        self.batch_size = 200
+        self.interval = 0.5
+        self.max_pending = 10000
+        self.max_retries = 8
+        self.max_delay = 60.0
+        self.delay = self.interval    # current wait between flushes; grows while retrying
+        self.retry_at = 0.0           # monotonic time before which flushes are skipped
+        self.attempts = Counter()     # (user_id, module_name) -> failed attempts so far
+        self.dead_letters = deque(maxlen=1000)
+        self.pending = []
+        self.pending_keys = set()      # (user_id, module_name) already buffered
+        self.pending_users = Counter()
+        self.cond = threading.Condition()
+        self.flush_lock = threading.Lock()   # one flush at a time
+        self.thread = None
+        self.pid = None
+        self.stopping = False
+        self.flushes = self.flushed = self.inserted = self.failures = self.sync_writes = 0
+        self.dropped = 0
+
+    def init_app(self, app):
+        self.app = app
+        self.mode = app.config.get('PROGRESS_WRITE_MODE', 'buffered')
+        if self.mode not in WRITE_MODES:
+            raise ValueError(f"PROGRESS_WRITE_MODE must be one of {', '.join(WRITE_MODES)}.")
+        self.batch_size = int(app.config.get('PROGRESS_BATCH_SIZE', 200))
+        self.interval = float(app.config.get('PROGRESS_FLUSH_INTERVAL', 0.5))
+        self.max_pending = int(app.config.get('PROGRESS_MAX_PENDING', 10000))
+        self.max_retries = int(app.config.get('PROGRESS_MAX_RETRIES', 8))
+        self.max_delay = float(app.config.get('PROGRESS_RETRY_MAX_DELAY', 60))
+        self.dead_letters = deque(maxlen=int(app.config.get('PROGRESS_DEAD_LETTER_SIZE', 1000)))
+        self.delay = self.interval
+        atexit.register(self.close)
+
+    # ---------- Producer side (request threads) ----------
+
+    def submit(self, user_id, module_name):
+        """Record a completion; return "created", "exists" or "queued"."""
+        if self.mode == 'sync':
+            return self._write_now(user_id, module_name)
+        with self.cond:
+            if (user_id, module_name) in self.pending_keys:
+                return "queued"
+            full = len(self.pending) >= self.max_pending
+            if not full:
+                self._add([{"user_id": user_id, "module_name": module_name,
+                            "timestamp": datetime.utcnow()}])
+                self._ensure_thread()
+                if len(self.pending) >= self.batch_size:
+                    self.cond.notify()
+        if full:
+            return self._write_now(user_id, module_name)
+        return "queued"
+
+    def _write_now(self, user_id, module_name):
+        self.sync_writes += 1
+        if record_progress(user_id, module_name):
+            summary_cache.completed(user_id, module_name)
+            return "created"
+        return "exists"
+
+    def has_pending(self, user_id):
+        with self.cond:
+            return self.pending_users[user_id] > 0
+
+    def _add(self, events, front=False):
+        # Callers hold self.cond
+        if front:
+            self.pending[:0] = events
+        else:
+            self.pending.extend(events)
+        for event in events:
+            self.pending_keys.add((event["user_id"], event["module_name"]))
+            self.pending_users[event["user_id"]] += 1
+
+    def _take_user(self, user_id):
+        # Callers hold self.cond
+        batch = [event for event in self.pending if event["user_id"] == user_id]
+        if batch:
+            self.pending = [event for event in self.pending if event["user_id"] != user_id]
+            for event in batch:
+                self.pending_keys.discard((user_id, event["module_name"]))
+            del self.pending_users[user_id]
+        return batch
+
+    def _take(self, n):
+        # Callers hold self.cond
+        batch = self.pending[:n]
+        del self.pending[:n]
+        for event in batch:
+            self.pending_keys.discard((event["user_id"], event["module_name"]))
+            self.pending_users[event["user_id"]] -= 1
+            if not self.pending_users[event["user_id"]]:
+                del self.pending_users[event["user_id"]]
+        return batch
+
+    # ---------- Writer side ----------
+
+    def _ensure_thread(self):
+        # Started lazily, and again after a fork (e.g. gunicorn --preload)
+        if self.thread is None or self.pid != os.getpid() or not self.thread.is_alive():
+            self.pid = os.getpid()
+            self.stopping = False
+            self.thread = threading.Thread(target=self._run, name='progress-writer', daemon=True)
+            self.thread.start()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                deadline = time.monotonic() + self.delay
+                while not self.stopping and (len(self.pending) < self.batch_size
+                                             or time.monotonic() < self.retry_at):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.cond.wait(remaining)
+                stopping = self.stopping
+            self.flush(force=stopping)
+            if stopping:
+                return
+
+    def flush(self, force=False):
+        """Write everything buffered so far; safe to call from any thread.
+
+        While failed events are waiting to be retried, calls before the
+        retry time do nothing unless force is set.
+        """
+        if not force and time.monotonic() < self.retry_at:
+            return
+        with self.flush_lock:
+            while True:
+                with self.cond:
+                    batch = self._take(self.batch_size)
+                if not batch:
+                    self._retry_later(False)
+                    return
+                try:
+                    with self.app.app_context():
+                        inserted = insert_progress(batch)
+                except Exception:
+                    self.failures += 1
+                    log.exception("Progress flush of %d events failed; inserting them one by one",
+                                  len(batch))
+                    dropped = self.dropped
+                    inserted, retry = self._insert_each(batch)
+                    self._record(batch[:len(batch) - len(retry)], inserted, self.dropped - dropped)
+                    if retry:
+                        with self.cond:
+                            self._add(retry, front=True)
+                        self._retry_later(True)
+                        return
+                    continue
+                if self.attempts:
+                    for event in batch:
+                        self.attempts.pop((event["user_id"], event["module_name"]), None)
+                self._record(batch, inserted)
+
+    def flush_user(self, user_id):
+        """Write one user's buffered events now, without waiting for a full flush.
+
+        If the write fails the events go back to the buffer, and the
+        background writer retries them as usual.
+        """
+        with self.cond:
+            batch = self._take_user(user_id)
+        if not batch:
+            return
+        try:
+            with self.app.app_context():
+                inserted = insert_progress(batch)
+        except Exception:
+            log.warning("Writing %d progress events for user %s failed; left for the writer",
+                        len(batch), user_id, exc_info=True)
+            with self.cond:
+                self._add(batch, front=True)
+            return
+        for event in batch:
+            self.attempts.pop((user_id, event["module_name"]), None)
+        self._record(batch, inserted)
+
+    def _insert_each(self, batch):
+        """Insert events one at a time; return (rows inserted, events to retry)."""
+        inserted = 0
+        for i, event in enumerate(batch):
+            key = (event["user_id"], event["module_name"])
+            try:
+                with self.app.app_context():
+                    inserted += insert_progress([event])
+            except TRANSIENT_ERRORS as exc:
+                self.attempts[key] += 1
+                if self.attempts[key] < self.max_retries:
+                    # The database itself is unavailable; the rest would fail the same way
+                    return inserted, batch[i:]
+                self._give_up(event, exc)
+            except Exception as exc:
+                self._give_up(event, exc)
+            else:
+                self.attempts.pop(key, None)
+        return inserted, []
+
+    def _give_up(self, event, exc):
+        self.attempts.pop((event["user_id"], event["module_name"]), None)
+        self.dropped += 1
+        self.dead_letters.append({**event, "error": str(exc)})
+        log.error("Dropping progress event %s after error: %s", event, exc)
+
+    def _record(self, batch, inserted, dropped=0):
+        # batch is every event that is settled; the dropped ones were not written
+        if not batch:
+            return
+        with self.cond:   # flush_user records from request threads
+            self.inserted += inserted
+            self.flushes += 1
+            self.flushed += len(batch) - dropped
+        for user_id in {event["user_id"] for event in batch}:
+            summary_cache.invalidate(user_id)
+
+    def _retry_later(self, failed):
+        if failed:
+            self.delay = min(self.delay * 2, self.max_delay)
+            self.retry_at = time.monotonic() + self.delay
+        else:
+            self.delay = self.interval
+            self.retry_at = 0.0
+
+    def close(self):
+        """Stop the writer thread and flush what is left (registered with atexit)."""
+        with self.cond:
+            self.stopping = True
+            self.cond.notify()
+            thread = self.thread
+        if thread is not None and thread.is_alive() and self.pid == os.getpid():
+            thread.join(timeout=10)
+        if self.app is not None:
+            self.flush(force=True)
+            with self.cond:
+                lost = len(self.pending)
+            if lost:
+                log.error("Exiting with %d progress events unwritten; they are lost", lost)
+
+    def stats(self):
+        with self.cond:
+            pending = len(self.pending)
+        return {
+            "mode": self.mode,
+            "pending": pending,
+            "flushes": self.flushes,
+            "events_flushed": self.flushed,
+            "rows_inserted": self.inserted,
+            "failed_flushes": self.failures,
+            "retrying": len(self.attempts),
+            "dropped_events": self.dropped,
+            "sync_writes": self.sync_writes,
+        }
+
+
+progress_writer = ProgressWriter()
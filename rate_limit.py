@@ -0,0 +1,285 @@
+"""
+Token-bucket rate limiting for the login and register forms.
+
+Every attempt at those forms costs a bcrypt hash, so unlimited attempts
+are an easy way to burn worker CPU. Each POST takes one token from a
+bucket per key (client IP, and the submitted username) before the user
+is looked up or any password is hashed. A bucket holds up to `count`
+tokens and refills at count/period per second, so short bursts pass and
+sustained floods get 429 with a Retry-After header.
+
+Limits are "<count>/<period>" strings, period being second, minute, hour
+or a number of seconds, set per route and key:
+
+    RATE_LIMIT_LOGIN_IP          20/minute
+    RATE_LIMIT_LOGIN_USERNAME    5/minute
+    RATE_LIMIT_REGISTER_IP       5/minute
+    RATE_LIMIT_REGISTER_USERNAME 5/minute
+
+An empty value turns that limit off; RATE_LIMIT_ENABLED=0 turns them
+all off. Like every config key, they can come from the environment
+(FLASK_RATE_LIMIT_LOGIN_IP=10/minute).
+
+Buckets live in an in-process LRU (RATE_LIMIT_MAX_KEYS entries), so with
+several worker processes each one enforces the limit separately. Setting
+RATE_LIMIT_URL shares them: redis://... (needs the redis package) or
+sqlite:///path/to/buckets.db (any process on the same host).
+
+The IP is request.remote_addr; behind a reverse proxy, wrap the app in
+werkzeug's ProxyFix so that is the client's address.
+"""
+import math
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+try:
+    import redis
+except ImportError:  # the shared backend is optional
+    redis = None
+
+Limit = namedtuple('Limit', 'count period')
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+LIMIT_RE = re.compile(r'^\s*(\d+)\s*/\s*(\d*\.?\d+|second|minute|hour|day)s?\s*$')
+
+DEFAULT_LIMITS = {
+    ('login', 'ip'): '20/minute',
+    ('login', 'username'): '5/minute',
+    ('register', 'ip'): '5/minute',
+    ('register', 'username'): '5/minute',
+}
+
+
+class RateLimited(Exception):
+    """Raised when an attempt has no token left; retry_after is in seconds."""
+
+    def __init__(self, route, key_type, retry_after):
+        super().__init__(f"Too many {route} attempts for this {key_type}.")
+        self.route = route
+        self.key_type = key_type
+        self.retry_after = retry_after
+
+
+def parse_limit(spec):
+    """'5/minute' -> Limit(5, 60.0); '' or None -> None."""
+    if not spec:
+        return None
+    m = LIMIT_RE.match(str(spec))
+    if not m or int(m.group(1)) < 1:
+        raise ValueError(f"Rate limit '{spec}' must look like '5/minute' or '10/30'.")
+    period = PERIODS.get(m.group(2)) or float(m.group(2))
+    if period <= 0:
+        raise ValueError(f"Rate limit '{spec}' needs a period above zero.")
+    return Limit(int(m.group(1)), float(period))
+
+
+def refill(tokens, updated, now, limit):
+    """Bucket level at now, given it held tokens at time updated."""
+    return min(limit.count, tokens + (now - updated) * limit.count / limit.period)
+
+
+def take_token(tokens, limit):
+    """Return (new level, retry_after); retry_after is 0 when the token was granted."""
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) * limit.period / limit.count
+
+
+class LocalBuckets:
+    """Thread-safe LRU of key -> (tokens, updated) for one process."""
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def take(self, key, limit):
+        now = time.monotonic()
+        with self.lock:
+            tokens, updated = self.buckets.get(key, (limit.count, now))
+            tokens, retry_after = take_token(refill(tokens, updated, now, limit), limit)
+            self.buckets[key] = (tokens, now)
+            self.buckets.move_to_end(key)
+            # Dropping the least recently seen bucket only forgets an idle client
+            while len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        return retry_after
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+
+    def __len__(self):
+        return len(self.buckets)
+
+
+# Refill and take in one round trip, atomically for every worker
+_REDIS_TAKE = """
+local count, period, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or count
+local updated = tonumber(state[2]) or now
+tokens = math.min(count, tokens + math.max(0, now - updated) * count / period)
+local granted = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  granted = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(period) + 1)
+return {granted, tostring(tokens)}
+"""
+
+
+class RedisBuckets:
+    """Buckets as hashes under ratelimit:<key>, shared by every worker."""
+
+    def __init__(self, url):
+        self.client = redis.Redis.from_url(url)
+        self.script = self.client.register_script(_REDIS_TAKE)
+
+    def take(self, key, limit):
+        granted, tokens = self.script(keys=[f"ratelimit:{key}"],
+                                      args=[limit.count, limit.period, time.time()])
+        if granted:
+            return 0.0
+        return take_token(float(tokens), limit)[1]
+
+    def clear(self):
+        for key in self.client.scan_iter("ratelimit:*"):
+            self.client.delete(key)
+
+
+class SQLiteBuckets:
+    """Buckets in a small SQLite file, shared by the processes on one host.
+
+    Kept out of the application database so limiter writes never queue
+    behind (or hold up) progress writes.
+    """
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        self.calls = 0
+        with self._conn() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS rate_bucket "
+                         "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)")
+
+    def _conn(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def take(self, key, limit):
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM rate_bucket WHERE key = ?",
+                               (key,)).fetchone()
+            tokens, updated = row if row else (limit.count, now)
+            tokens, retry_after = take_token(refill(tokens, min(updated, now), now, limit), limit)
+            conn.execute("INSERT INTO rate_bucket (key, tokens, updated) VALUES (?, ?, ?) "
+                         "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, "
+                         "updated = excluded.updated", (key, tokens, now))
+            self.calls += 1
+            if self.calls % self.PRUNE_EVERY == 0:
+                # Buckets idle for a day are full again; forget them
+                conn.execute("DELETE FROM rate_bucket WHERE updated < ?", (now - 86400,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return retry_after
+
+    def clear(self):
+        self._conn().execute("DELETE FROM rate_bucket")
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM rate_bucket").fetchone()[0]
+
+
+def backend_for(url, max_keys):
+    if not url:
+        return LocalBuckets(max_keys)
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        if redis is None:
+            raise RuntimeError("RATE_LIMIT_URL is a redis URL but the redis package is not installed.")
+        return RedisBuckets(url)
+    if url.startswith('sqlite:///'):
+        return SQLiteBuckets(url[len('sqlite:///'):])
+    raise ValueError("RATE_LIMIT_URL must be a redis:// or sqlite:/// URL.")
+
+
+class RateLimiter:
+    def __init__(self):
+        self.enabled = True
+        self.limits = {}
+        self.backend = LocalBuckets(100000)
+        self.allowed = 0
+        self.rejected = {}
+
+    def init_app(self, app):
+        self.enabled = str(app.config.get('RATE_LIMIT_ENABLED', '1')).lower() not in ('0', 'false', 'no', 'off')
+        self.limits = {
+            (route, key_type): parse_limit(app.config.get(f'RATE_LIMIT_{route}_{key_type}'.upper(), spec))
+            for (route, key_type), spec in DEFAULT_LIMITS.items()
+        }
+        self.backend = backend_for(app.config.get('RATE_LIMIT_URL'),
+                                   int(app.config.get('RATE_LIMIT_MAX_KEYS', 100000)))
+
+    def check(self, route, **keys):
+        """Take one token per key for route, or raise RateLimited.
+
+        Keys with no value (e.g. a blank username) and routes or key types
+        without a configured limit are skipped. Every bucket is charged
+        even after one is empty, so a flood from one IP still drains the
+        per-username bucket it targets.
+        """
+        if not self.enabled:
+            return
+        retry_after, blocked_by = 0.0, None
+        for key_type, value in keys.items():
+            limit = self.limits.get((route, key_type))
+            if limit is None or not value:
+                continue
+            wait = self.backend.take(f"{route}:{key_type}:{value}", limit)
+            if wait > retry_after:
+                retry_after, blocked_by = wait, key_type
+        if blocked_by is None:
+            self.allowed += 1
+            return
+        name = f"{route}:{blocked_by}"
+        self.rejected[name] = self.rejected.get(name, 0) + 1
+        raise RateLimited(route, blocked_by, retry_after)
+
+    def reset(self):
+        self.backend.clear()
+
+    def stats(self):
+        return {
+            "backend": type(self.backend).__name__,
+            "enabled": self.enabled,
+            # Shared backends would need a keyspace scan or table count; local only
+            "buckets": len(self.backend) if isinstance(self.backend, LocalBuckets) else None,
+            "allowed": self.allowed,
+            "rejected": dict(self.rejected),
+            "limits": {f"{route}:{key_type}": (f"{limit.count}/{limit.period:g}s" if limit else None)
+                       for (route, key_type), limit in self.limits.items()},
+        }
+
+
+def retry_after_header(seconds):
+    return str(max(1, math.ceil(seconds)))
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,60 @@
+"""
+Batched operation scripts shared by the stack, queue and list blueprints.
+
+A script is a JSON body of the form
+    {"ops": [{"op": "push", "value": 5}, {"op": "pop"}, "push 7", ...]}
+Each entry is either an object or a compact "op value" string. The whole
+script is validated before anything runs, then executed in order against
+the blueprint's global structure in a single request.
+"""
+
+MAX_SCRIPT_OPS = 1000
+
+
+def parse_script(payload, handlers):
+    """Validate a script body and return (steps, error).
+
+    handlers maps an op name to (callable, takes_value). Values are passed
+    on as strings, exactly as the single-op GET routes receive them.
+    """
+    if not isinstance(payload, dict) or not isinstance(payload.get('ops'), list):
+        return None, 'Body must be JSON of the form {"ops": [...]}.'
+    ops = payload['ops']
+    if len(ops) > MAX_SCRIPT_OPS:
+        return None, f"Scripts are limited to {MAX_SCRIPT_OPS} operations."
+
+    steps = []
+    for i, entry in enumerate(ops):
+        if isinstance(entry, str):
+            name, _, value = entry.strip().partition(' ')
+            value = value.strip() or None
+        elif isinstance(entry, dict):
+            name, value = entry.get('op'), entry.get('value')
+        else:
+            return None, f"Operation {i}: expected an object or string."
+
+        if not isinstance(name, str) or name not in handlers:
+            allowed = ', '.join(sorted(handlers))
+            return None, f"Operation {i}: unknown op '{name}' (allowed: {allowed})."
+        func, takes_value = handlers[name]
+        if takes_value:
+            if value is None or str(value) == '':
+                return None, f"Operation {i}: '{name}' needs a value."
+            steps.append((name, func, str(value)))
+        else:
+            steps.append((name, func, None))
+    return steps, None
+
+
+def run_script(payload, handlers):
+    """Validate and execute a script; return (trace, error)."""
+    steps, error = parse_script(payload, handlers)
+    if error:
+        return None, error
+    trace = []
+    for name, func, value in steps:
+        if value is None:
+            trace.append({"op": name, "message": func()})
+        else:
+            trace.append({"op": name, "value": value, "message": func(value)})
+    return trace, None
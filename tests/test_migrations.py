@@ -0,0 +1,120 @@
+"""
+Schema migrations and database URL handling.
+
+Run from the project root:
+    python -m pytest tests
+
+The SQLite cases use a temporary file. The PostgreSQL case runs only
+when DATABASE_URL points at a PostgreSQL database it may migrate.
+"""
+import os
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import IntegrityError
+
+import db_config
+import migrations
+
+LATEST = migrations.MIGRATIONS[-1][0]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'site.db'}")
+    yield engine
+    engine.dispose()
+
+
+def index_names(engine, table):
+    return {ix['name'] for ix in inspect(engine).get_indexes(table)}
+
+
+def create_legacy_schema(engine):
+    """The tables as db.create_all() built them before versioning, with duplicate progress rows."""
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE user (id INTEGER PRIMARY KEY, "
+                          "username VARCHAR(20) NOT NULL UNIQUE, password VARCHAR(60) NOT NULL)"))
+        conn.execute(text("CREATE TABLE user_progress (id INTEGER PRIMARY KEY, "
+                          "module_name VARCHAR(100) NOT NULL, timestamp DATETIME NOT NULL, "
+                          "user_id INTEGER NOT NULL REFERENCES user (id))"))
+        conn.execute(text("INSERT INTO user (id, username, password) VALUES (1, 'ada', 'x')"))
+        for module in ('stack', 'stack', 'queue'):
+            conn.execute(text("INSERT INTO user_progress (module_name, timestamp, user_id) "
+                              "VALUES (:m, :t, 1)"), {'m': module, 't': datetime(2024, 1, 1)})
+
+
+def test_fresh_database_is_upgraded_to_latest(engine):
+    assert migrations.current_version(engine) == 0
+    assert migrations.upgrade(engine) == [m[0] for m in migrations.MIGRATIONS]
+    assert migrations.current_version(engine) == LATEST
+    assert migrations.pending(engine) == []
+    assert {'user', 'user_progress', 'schema_version'} <= set(inspect(engine).get_table_names())
+    assert {'ix_user_progress_user_module', 'ix_user_progress_user_time'} <= index_names(engine, 'user_progress')
+
+
+def test_second_upgrade_is_a_no_op(engine):
+    migrations.upgrade(engine)
+    assert migrations.upgrade(engine) == []
+    with engine.connect() as conn:
+        versions = conn.execute(text("SELECT version FROM schema_version ORDER BY version")).scalars().all()
+    assert versions == [m[0] for m in migrations.MIGRATIONS]
+
+
+def test_legacy_schema_is_adopted(engine):
+    create_legacy_schema(engine)
+    assert migrations.current_version(engine) == 0
+    assert [m[0] for m in migrations.pending(engine)] == [m[0] for m in migrations.MIGRATIONS]
+
+    migrations.upgrade(engine)
+
+    assert migrations.current_version(engine) == LATEST
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT module_name FROM user_progress ORDER BY id")).scalars().all()
+        assert conn.execute(text("SELECT username FROM user")).scalar() == 'ada'
+    assert rows == ['stack', 'queue']   # the duplicate was dropped, the earliest row kept
+
+
+def test_unique_progress_index_is_enforced(engine):
+    migrations.upgrade(engine)
+    insert = text("INSERT INTO user_progress (module_name, timestamp, user_id) VALUES ('stack', :t, 1)")
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO user (id, username, password) VALUES (1, 'ada', 'x')"))
+        conn.execute(insert, {'t': datetime(2024, 1, 1)})
+    with pytest.raises(IntegrityError), engine.begin() as conn:
+        conn.execute(insert, {'t': datetime(2024, 1, 2)})
+
+
+@pytest.mark.parametrize('url, expected', [
+    ('postgres://u:p@db/dsa', 'postgresql://u:p@db/dsa'),
+    ('postgresql://u:p@db/dsa', 'postgresql://u:p@db/dsa'),
+    ('sqlite:////tmp/dsa.db', 'sqlite:////tmp/dsa.db'),
+    ('', db_config.DEFAULT_DATABASE_URL),
+])
+def test_database_uri(url, expected):
+    assert db_config.database_uri({'DATABASE_URL': url}) == expected
+
+
+def test_database_uri_default():
+    assert db_config.database_uri({}) == db_config.DEFAULT_DATABASE_URL
+
+
+def test_engine_options():
+    settings = db_config.settings_from_env({})
+    assert db_config.engine_options('sqlite://', settings) == {}
+    assert 'pool_pre_ping' not in db_config.engine_options('sqlite:///site.db', settings)
+    assert db_config.engine_options('postgresql://db/dsa', settings)['pool_pre_ping'] is True
+
+
+@pytest.mark.skipif(not os.environ.get('DATABASE_URL', '').startswith(('postgres://', 'postgresql')),
+                    reason="set DATABASE_URL to a disposable PostgreSQL database")
+def test_postgresql_upgrade():
+    engine = create_engine(db_config.database_uri())
+    try:
+        migrations.upgrade(engine)
+        assert migrations.current_version(engine) == LATEST
+        assert migrations.upgrade(engine) == []
+        assert 'ix_user_progress_user_module' in index_names(engine, 'user_progress')
+    finally:
+        engine.dispose()
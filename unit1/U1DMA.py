@@ -1,5 +1,8 @@
 # 1. Import Blueprint instead of Flask
-from flask import Blueprint, request, jsonify, render_template_string
+import json
+from flask import Blueprint, Response, request, jsonify, render_template_string
+from unit1.allocators import ALLOCATORS, MemoryManager, STRATEGIES
+from unit1.workload import DISTRIBUTIONS, parse_trace, simulate, synthetic_trace
 
 # 2. Create a Blueprint object
 dma_bp = Blueprint(
@@ -7,75 +10,17 @@ dma_bp = Blueprint(
 )
 
 # ------------------------------
-# Data Structure: Dynamic Memory Allocation (First Fit)
-# (Logic is unchanged)
+# Data Structure: Dynamic Memory Allocation
+# (Allocator engine lives in allocators.py)
 # ------------------------------
 
-class MemoryBlock:
-    def __init__(self, start, size, allocated=False, process_id=None):
-        self.start = start
-        self.size = size
-        self.allocated = allocated
-        self.process_id = process_id
-        self.end = start + size - 1
-
-    def to_dict(self):
-        return {
-            "start": self.start,
-            "end": self.end,
-            "size": self.size,
-            "allocated": self.allocated,
-            "process_id": self.process_id
-        }
-
-
-class MemoryManager:
-    def __init__(self, total_size):
-        self.total_size = total_size
-        self.blocks = [MemoryBlock(0, total_size)]  # initially one free block
-
-    def allocate(self, process_id, size):
-        """Allocate memory using First Fit strategy"""
-        for block in self.blocks:
-            if not block.allocated and block.size >= size:
-                new_block = MemoryBlock(block.start, size, True, process_id)
-                block.start += size
-                block.size -= size
-                if block.size == 0:
-                    self.blocks.remove(block)
-                self.blocks.append(new_block)
-                self.blocks.sort(key=lambda x: x.start)
-                return f"Process {process_id} allocated {size} units."
-        return "Insufficient memory to allocate."
-
-    def deallocate(self, process_id):
-        """Free memory of a process"""
-        for block in self.blocks:
-            if block.allocated and block.process_id == process_id:
-                block.allocated = False
-                block.process_id = None
-                self.merge_free_blocks()
-                return f"Process {process_id} deallocated successfully."
-        return f"No block found for Process {process_id}."
-
-    def merge_free_blocks(self):
-        """Merge adjacent free blocks"""
-        self.blocks.sort(key=lambda x: x.start)
-        merged = []
-        for block in self.blocks:
-            if merged and not block.allocated and not merged[-1].allocated and merged[-1].end + 1 == block.start:
-                merged[-1].end = block.end
-                merged[-1].size += block.size
-            else:
-                merged.append(block)
-        self.blocks = merged
-
-    def to_list(self):
-        return [b.to_dict() for b in sorted(self.blocks, key=lambda x: x.start)]
-
-
-# Create global memory manager
-memory = MemoryManager(total_size=500)
+# Create global memory manager (swapped by /reset)
+ARENA_SIZE = 500
+MAX_ARENA_SIZE = 1 << 20    # largest arena /reset accepts, for stress demos
+memory = MemoryManager(total_size=ARENA_SIZE)
+
+MAX_SIM_OPS = 1_000_000     # per /simulate request
+MAX_SIM_ARENA = 1 << 20     # units
 
 # ------------------------------
 # Flask Routes
@@ -107,16 +52,33 @@ def index():
         </style>
     </head>
     <body>
-        <h2>💾 Dynamic Memory Allocation (First Fit Simulation)</h2>
+        <h2>💾 Dynamic Memory Allocation (Allocator Simulation)</h2>
 
         <div>
             <input type="text" id="pid" placeholder="Process ID">
             <input type="number" id="size" placeholder="Memory Size">
+            <select id="strategy">
+                <option value="first">First Fit</option>
+                <option value="best">Best Fit</option>
+                <option value="worst">Worst Fit</option>
+                <option value="next">Next Fit</option>
+            </select>
             <button onclick="allocate()">Allocate</button>
             <button onclick="deallocate()">Deallocate</button>
+            <label><input type="checkbox" id="freeAll"> All blocks of process</label>
+        </div>
+        <div>
+            <input type="number" id="arena" placeholder="Arena size (500)" min="1">
+            <select id="allocator">
+                <option value="variable">Variable Partitions</option>
+                <option value="buddy">Buddy System</option>
+                <option value="slab">Slab Allocator</option>
+            </select>
+            <button onclick="resetMemory()">Reset Memory</button>
         </div>
 
         <p id="status"></p>
+        <p id="metrics"></p>
 
         <div class="legend">
             <div class="box" style="background:#8ef58e"></div> Free Block
@@ -131,10 +93,12 @@ def index():
             async function allocate() {
                 let pid = document.getElementById("pid").value;
                 let size = parseInt(document.getElementById("size").value);
+                let strategy = document.getElementById("strategy").value;
                 if(!pid || !size) return alert("Enter process ID and size.");
-                let res = await fetch(`allocate?pid=${pid}&size=${size}`);
+                let res = await fetch(`allocate?pid=${pid}&size=${size}&strategy=${strategy}`);
                 let data = await res.json();
                 document.getElementById("status").innerText = data.message;
+                showMetrics(data.metrics);
                 drawMemory(data.memory);
                 
                 // FIX: Clear inputs
@@ -145,9 +109,11 @@ def index():
             async function deallocate() {
                 let pid = document.getElementById("pid").value;
                 if(!pid) return alert("Enter process ID to deallocate.");
-                let res = await fetch(`deallocate?pid=${pid}`);
+                let all = document.getElementById("freeAll").checked ? 1 : 0;
+                let res = await fetch(`deallocate?pid=${pid}&all=${all}`);
                 let data = await res.json();
                 document.getElementById("status").innerText = data.message;
+                showMetrics(data.metrics);
                 drawMemory(data.memory);
                 
                 // FIX: Clear inputs
@@ -155,15 +121,35 @@ def index():
                 document.getElementById("size").value = "";
             }
 
+            async function resetMemory() {
+                let kind = document.getElementById("allocator").value;
+                let arena = document.getElementById("arena").value || 500;
+                let res = await fetch(`reset?allocator=${kind}&size=${arena}`);
+                let data = await res.json();
+                document.getElementById("status").innerText = data.message;
+                showMetrics(data.metrics);
+                drawMemory(data.memory);
+            }
+
+            function showMetrics(m) {
+                document.getElementById("metrics").innerText =
+                    `Free ${m.free}/${m.total} | Largest free block ${m.largest_free} | ` +
+                    `Internal fragmentation ${m.internal_fragmentation} units (${(m.internal_ratio * 100).toFixed(1)}%) | ` +
+                    `External fragmentation ${(m.external_fragmentation * 100).toFixed(1)}%`;
+                document.getElementById("strategy").disabled = m.allocator !== "variable";
+            }
+
             function drawMemory(blocks) {
                 let canvas = document.getElementById("canvas");
                 let ctx = canvas.getContext("2d");
                 
-                const scale = 2;  // pixels per memory unit
-                const blockSpacing = 10;
+                // 2px per unit for the default arena, shrinking so large arenas stay ~1000px wide
+                let arenaSize = blocks.reduce((sum, b) => sum + b.size, 0);
+                const scale = Math.min(2, 1000 / Math.max(1, arenaSize));  // pixels per memory unit
+                const blockSpacing = blocks.length > 100 ? 1 : 10;
                 let totalWidth = 50; // Start padding
                 for (let block of blocks) {
-                    totalWidth += (block.size * scale) + blockSpacing;
+                    totalWidth += Math.max(1, block.size * scale) + blockSpacing;
                 }
                 totalWidth += 50; // End padding
                 
@@ -188,12 +174,22 @@ def index():
                     ctx.fill();
                     ctx.stroke();
 
+                    // Labels would overlap into noise on stress-sized arenas
+                    if (blocks.length > 100) {
+                        x += displayWidth + blockSpacing;
+                        continue;
+                    }
+
                     ctx.fillStyle = "#000";
                     ctx.font = "12px Arial";
                     ctx.textAlign = "left";
 
+                    // Show requested/actual when the allocator rounded the request up
+                    let sizeText = block.requested !== block.size
+                            ? `${block.requested}/${block.size}`
+                            : `${block.size}`;
                     let label = block.allocated
-                            ? `P${block.process_id} (${block.size})`
+                            ? `P${block.process_id} (${sizeText})`
                             : `Free (${block.size})`;
                     
                     ctx.fillText(label, x, y - 10);
@@ -225,6 +221,8 @@ def index():
             window.onload = async function() {
                 let res = await fetch('status');
                 let data = await res.json();
+                document.getElementById("allocator").value = data.metrics.allocator;
+                showMetrics(data.metrics);
                 drawMemory(data.memory);
             };
         </script>
@@ -237,21 +235,81 @@ def index():
 def allocate():
     pid = request.args.get('pid')
     size = request.args.get('size', type=int)
+    strategy = request.args.get('strategy', 'first')
     if pid and size:
-        msg = memory.allocate(pid, size)
+        msg = memory.allocate(pid, size, strategy)
     else:
         msg = "Provide process ID and size."
-    return jsonify({"message": msg, "memory": memory.to_list()})
+    return jsonify({"message": msg, "memory": memory.to_list(), "metrics": memory.metrics()})
 
 @dma_bp.route('/deallocate')
 def deallocate():
     pid = request.args.get('pid')
+    all_blocks = request.args.get('all', '0').lower() in ('1', 'true', 'yes')
     if pid:
-        msg = memory.deallocate(pid)
+        msg = memory.deallocate(pid, all_blocks)
     else:
         msg = "Provide process ID to deallocate."
-    return jsonify({"message": msg, "memory": memory.to_list()})
+    return jsonify({"message": msg, "memory": memory.to_list(), "metrics": memory.metrics()})
+
+@dma_bp.route('/reset')
+def reset():
+    global memory
+    kind = request.args.get('allocator', 'variable')
+    size = request.args.get('size', ARENA_SIZE, type=int)
+    if kind not in ALLOCATORS:
+        msg = f"Unknown allocator '{kind}'. Use one of: {', '.join(ALLOCATORS)}."
+        return jsonify({"message": msg, "memory": memory.to_list(), "metrics": memory.metrics()})
+    if not 1 <= size <= MAX_ARENA_SIZE:
+        msg = f"Arena size must be between 1 and {MAX_ARENA_SIZE} units."
+        return jsonify({"message": msg, "memory": memory.to_list(), "metrics": memory.metrics()})
+    memory = ALLOCATORS[kind](size)
+    msg = f"Memory reset: {kind} allocator over {memory.total_size} units."
+    return jsonify({"message": msg, "memory": memory.to_list(), "metrics": memory.metrics()})
+
+@dma_bp.route('/simulate', methods=['GET', 'POST'])
+def simulate_workload():
+    """Stream workload stats as JSON lines.
+
+    GET generates a synthetic trace (ops, dist, max_size, free_ratio, seed);
+    POST replays the trace text in the request body. allocator may be one
+    kind or "all" to compare them on the same trace.
+    """
+    kind = request.args.get('allocator', 'all')
+    strategy = request.args.get('strategy', 'first')
+    arena = request.args.get('arena', 4096, type=int)
+    sample_every = request.args.get('sample_every', 10000, type=int)
+    if kind != 'all' and kind not in ALLOCATORS:
+        return jsonify({"message": f"Unknown allocator '{kind}'."}), 400
+    if strategy not in STRATEGIES:
+        return jsonify({"message": f"Unknown strategy '{strategy}'."}), 400
+    if not 1 <= arena <= MAX_SIM_ARENA or sample_every < 1:
+        return jsonify({"message": f"arena must be 1..{MAX_SIM_ARENA} and sample_every positive."}), 400
+
+    if request.method == 'POST':
+        try:
+            trace = parse_trace(request.get_data(as_text=True).splitlines())
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+    else:
+        ops = request.args.get('ops', 100000, type=int)
+        dist = request.args.get('dist', 'exponential')
+        max_size = request.args.get('max_size', 64, type=int)
+        free_ratio = request.args.get('free_ratio', 0.5, type=float)
+        seed = request.args.get('seed', 0, type=int)
+        if dist not in DISTRIBUTIONS or max_size < 1 or not 0 <= free_ratio < 1:
+            return jsonify({"message": f"dist must be one of {', '.join(DISTRIBUTIONS)}, "
+                                       "max_size positive and free_ratio in [0, 1)."}), 400
+        if not 1 <= ops <= MAX_SIM_OPS:
+            return jsonify({"message": f"ops must be between 1 and {MAX_SIM_OPS}."}), 400
+        trace = synthetic_trace(ops, dist, max_size, free_ratio=free_ratio, seed=seed)
+    if len(trace) > MAX_SIM_OPS:
+        return jsonify({"message": f"Traces are limited to {MAX_SIM_OPS} operations."}), 400
+
+    kinds = list(ALLOCATORS) if kind == 'all' else [kind]
+    samples = simulate(kinds, trace, arena, strategy, sample_every)
+    return Response((json.dumps(sample) + "\n" for sample in samples), mimetype='application/x-ndjson')
 
 @dma_bp.route('/status')
 def status():
-    return jsonify({"memory": memory.to_list()})
\ No newline at end of file
+    return jsonify({"memory": memory.to_list(), "metrics": memory.metrics()})
@@ -0,0 +1,474 @@
+# ------------------------------
+# Memory allocator engines used by U1DMA.py
+#   MemoryManager - variable partitions with first/best/worst/next fit
+#   BuddyManager  - power-of-two buddy system
+#   SlabManager   - fixed size classes carved from equal-sized pages
+# All three share the Allocator interface, so the routes (and the
+# workload runner) can drive any of them.
+# ------------------------------
+
+import heapq
+from array import array
+from bisect import bisect_left, insort
+
+STRATEGIES = ('first', 'best', 'worst', 'next')
+SLAB_PAGE = 64                     # units per slab page
+SIZE_CLASSES = (4, 8, 16, 32, 64)  # slab object sizes; the largest fills a page
+
+
+class MemoryBlock:
+    def __init__(self, start, size, allocated=False, process_id=None, requested=None):
+        self.start = start
+        self.size = size
+        self.allocated = allocated
+        self.process_id = process_id
+        self.requested = size if requested is None else requested  # units asked for
+        self.end = start + size - 1
+
+    def to_dict(self):
+        return {
+            "start": self.start,
+            "end": self.end,
+            "size": self.size,
+            "requested": self.requested,
+            "allocated": self.allocated,
+            "process_id": self.process_id
+        }
+
+
+class FreeSizeTree:
+    """Max segment tree over arena addresses.
+
+    Leaf i holds the size of the free block starting at address i (0 if
+    there is none), so every internal node knows the largest free block
+    in its address range.
+    """
+
+    def __init__(self, total_size):
+        self.n = 1
+        while self.n < total_size:
+            self.n *= 2
+        self.tree = array('q', bytes(8 * 2 * self.n))
+
+    def set(self, pos, size):
+        tree = self.tree
+        i = pos + self.n
+        tree[i] = size
+        i //= 2
+        while i:
+            best = max(tree[2 * i], tree[2 * i + 1])
+            if tree[i] == best:
+                break
+            tree[i] = best
+            i //= 2
+
+    def largest(self):
+        return self.tree[1]
+
+    def _descend(self, i, size):
+        while i < self.n:
+            i = 2 * i if self.tree[2 * i] >= size else 2 * i + 1
+        return i - self.n
+
+    def leftmost(self, size, lo=0):
+        """Lowest address >= lo whose free block holds at least size units, or None."""
+        tree = self.tree
+        i = lo + self.n
+        if tree[i] >= size:
+            return lo
+        # Right siblings met while climbing cover increasing addresses above lo
+        while i > 1:
+            if i % 2 == 0 and tree[i + 1] >= size:
+                return self._descend(i + 1, size)
+            i //= 2
+        return None
+
+
+class Allocator:
+    """Shared visualizer API and fragmentation metrics.
+
+    Subclasses provide _alloc, _free, blocks, largest_free and
+    max_request, and keep free_units / internal_waste up to date. The
+    base class indexes allocated blocks by process id.
+    """
+    kind = None
+
+    def __init__(self):
+        self.by_pid = {}   # process id -> {start: block}, in allocation order
+
+    def alloc_block(self, process_id, size, strategy='first'):
+        """Allocate size units for process_id; return the block or None."""
+        block = self._alloc(process_id, size, strategy)
+        if block is not None:
+            self.by_pid.setdefault(process_id, {})[block.start] = block
+        return block
+
+    def free_block(self, block):
+        """Release an allocated block; return the resulting free block."""
+        owned = self.by_pid[block.process_id]
+        del owned[block.start]
+        if not owned:
+            del self.by_pid[block.process_id]
+        return self._free(block)
+
+    def validate(self, size, strategy):
+        """Return an error message if this allocator cannot take the request."""
+        return None
+
+    def describe(self, block, strategy):
+        return ""
+
+    def allocate(self, process_id, size, strategy='first'):
+        if size <= 0:
+            return "Size must be a positive number of units."
+        error = self.validate(size, strategy)
+        if error:
+            return error
+        block = self.alloc_block(process_id, size, strategy)
+        if block is None:
+            return "Insufficient memory to allocate."
+        return (f"Process {process_id} allocated {size} units at "
+                f"{block.start}-{block.end}{self.describe(block, strategy)}.")
+
+    def deallocate(self, process_id, all_blocks=False):
+        """Free the oldest block of a process, or every block it holds"""
+        owned = self.by_pid.get(process_id)
+        if not owned:
+            return f"No block found for Process {process_id}."
+        if all_blocks:
+            count = len(owned)
+            for block in list(owned.values()):
+                self.free_block(block)
+            return f"Process {process_id} deallocated successfully ({count} block(s) freed)."
+        self.free_block(next(iter(owned.values())))
+        remaining = len(self.by_pid.get(process_id, ()))
+        suffix = f" ({remaining} block(s) still held)" if remaining else ""
+        return f"Process {process_id} deallocated successfully{suffix}."
+
+    def metrics(self):
+        """Fragmentation snapshot for the current arena."""
+        largest = self.largest_free()
+        free = self.free_units
+        allocated = self.total_size - free
+        # Free memory could at best serve one request of this size
+        servable = min(free, self.max_request())
+        return {
+            "allocator": self.kind,
+            "total": self.total_size,
+            "allocated": allocated,
+            "free": free,
+            "largest_free": largest,
+            # Units handed out beyond what was requested (rounding to a block/class size)
+            "internal_fragmentation": self.internal_waste,
+            "internal_ratio": round(self.internal_waste / allocated, 4) if allocated else 0.0,
+            # How far the largest free block falls short of what free memory could serve
+            "external_fragmentation": round(1 - largest / servable, 4) if servable else 0.0
+        }
+
+    def to_list(self):
+        return [b.to_dict() for b in sorted(self.blocks(), key=lambda b: b.start)]
+
+
+class MemoryManager(Allocator):
+    """Variable-size partition allocator with first/best/worst/next fit."""
+    kind = 'variable'
+
+    def __init__(self, total_size):
+        super().__init__()
+        self.total_size = total_size
+        self.by_start = {}     # start address -> block (free or allocated)
+        self.by_end = {}       # end address -> block, for left-neighbour lookup
+        self.free_sizes = []   # sorted (size, start) of free blocks
+        self.tree = FreeSizeTree(total_size)
+        self.rover = 0         # next-fit resumes searching here
+        self.free_units = 0
+        self.internal_waste = 0  # partitions are exactly the requested size
+        self._add_block(MemoryBlock(0, total_size))  # initially one free block
+
+    # --- index maintenance ---
+
+    def _add_block(self, block):
+        self.by_start[block.start] = block
+        self.by_end[block.end] = block
+        if not block.allocated:
+            insort(self.free_sizes, (block.size, block.start))
+            self.tree.set(block.start, block.size)
+            self.free_units += block.size
+
+    def _remove_block(self, block):
+        del self.by_start[block.start]
+        del self.by_end[block.end]
+        if not block.allocated:
+            self.free_sizes.pop(bisect_left(self.free_sizes, (block.size, block.start)))
+            self.tree.set(block.start, 0)
+            self.free_units -= block.size
+
+    def _find_free(self, size, strategy):
+        """Return the start of the free block chosen by strategy, or None."""
+        if strategy == 'best':
+            i = bisect_left(self.free_sizes, (size, -1))
+            return self.free_sizes[i][1] if i < len(self.free_sizes) else None
+        if strategy == 'worst':
+            if self.free_sizes and self.free_sizes[-1][0] >= size:
+                return self.free_sizes[-1][1]
+            return None
+        if strategy == 'next':
+            start = self.tree.leftmost(size, self.rover)
+            return start if start is not None else self.tree.leftmost(size, 0)
+        return self.tree.leftmost(size, 0)
+
+    # --- core operations ---
+
+    def _alloc(self, process_id, size, strategy='first'):
+        """Carve size units out of a free block; return the new block or None."""
+        start = self._find_free(size, strategy)
+        if start is None:
+            return None
+        free = self.by_start[start]
+        self._remove_block(free)
+        block = MemoryBlock(start, size, True, process_id)
+        self._add_block(block)
+        if free.size > size:
+            self._add_block(MemoryBlock(start + size, free.size - size))
+        self.rover = (block.end + 1) % self.total_size
+        return block
+
+    def _free(self, block):
+        """Release an allocated block and coalesce it with free neighbours."""
+        self._remove_block(block)
+        start, size = block.start, block.size
+        right = self.by_start.get(block.end + 1)
+        if right and not right.allocated:
+            self._remove_block(right)
+            size += right.size
+        left = self.by_end.get(block.start - 1)
+        if left and not left.allocated:
+            self._remove_block(left)
+            start, size = left.start, size + left.size
+        merged = MemoryBlock(start, size)
+        self._add_block(merged)
+        return merged
+
+    # --- Allocator hooks ---
+
+    def validate(self, size, strategy):
+        if strategy not in STRATEGIES:
+            return f"Unknown strategy '{strategy}'. Use one of: {', '.join(STRATEGIES)}."
+        return None
+
+    def describe(self, block, strategy):
+        return f" ({strategy} fit)"
+
+    def blocks(self):
+        return self.by_start.values()
+
+    def largest_free(self):
+        return self.tree.largest()
+
+    def max_request(self):
+        return self.total_size
+
+
+class BuddyManager(Allocator):
+    """Binary buddy system.
+
+    A non power-of-two arena is covered by aligned power-of-two blocks
+    (500 = 256 + 128 + 64 + 32 + 16 + 4); a block only merges with a buddy
+    that lies fully inside the arena. Per order, a set is the free list and
+    a bitmap answers "is my buddy free?" in O(1).
+    """
+    kind = 'buddy'
+
+    def __init__(self, total_size):
+        super().__init__()
+        self.total_size = total_size
+        self.max_order = total_size.bit_length() - 1
+        self.free_lists = [set() for _ in range(self.max_order + 1)]
+        self.bitmaps = [bytearray((total_size >> k) // 8 + 1) for k in range(self.max_order + 1)]
+        self.allocated = {}   # start -> allocated block
+        self.free_units = 0
+        self.internal_waste = 0
+        start = 0
+        for k in range(self.max_order, -1, -1):
+            if total_size - start >= 1 << k:
+                self._push_free(start, k)
+                start += 1 << k
+
+    def _set_bit(self, start, k, value):
+        idx = start >> k
+        if value:
+            self.bitmaps[k][idx // 8] |= 1 << (idx % 8)
+        else:
+            self.bitmaps[k][idx // 8] &= ~(1 << (idx % 8))
+
+    def _is_free(self, start, k):
+        idx = start >> k
+        return bool(self.bitmaps[k][idx // 8] & (1 << (idx % 8)))
+
+    def _push_free(self, start, k):
+        self.free_lists[k].add(start)
+        self._set_bit(start, k, True)
+        self.free_units += 1 << k
+
+    def _pop_free(self, start, k):
+        self.free_lists[k].remove(start)
+        self._set_bit(start, k, False)
+        self.free_units -= 1 << k
+
+    def _alloc(self, process_id, size, strategy=None):
+        order = (size - 1).bit_length()
+        j = order
+        while j <= self.max_order and not self.free_lists[j]:
+            j += 1
+        if j > self.max_order:
+            return None
+        start = min(self.free_lists[j])
+        self._pop_free(start, j)
+        # Split down to the requested order, freeing the upper half each time
+        while j > order:
+            j -= 1
+            self._push_free(start + (1 << j), j)
+        block = MemoryBlock(start, 1 << order, True, process_id, requested=size)
+        self.allocated[start] = block
+        self.internal_waste += block.size - size
+        return block
+
+    def _free(self, block):
+        del self.allocated[block.start]
+        self.internal_waste -= block.size - block.requested
+        start, k = block.start, block.size.bit_length() - 1
+        while k < self.max_order:
+            buddy = start ^ (1 << k)
+            if buddy + (1 << k) > self.total_size or not self._is_free(buddy, k):
+                break
+            self._pop_free(buddy, k)
+            start = min(start, buddy)
+            k += 1
+        self._push_free(start, k)
+        return MemoryBlock(start, 1 << k)
+
+    def describe(self, block, strategy):
+        return f" (buddy block of {block.size})"
+
+    def blocks(self):
+        free = [MemoryBlock(s, 1 << k) for k, starts in enumerate(self.free_lists) for s in starts]
+        return list(self.allocated.values()) + free
+
+    def largest_free(self):
+        for k in range(self.max_order, -1, -1):
+            if self.free_lists[k]:
+                return 1 << k
+        return 0
+
+    def max_request(self):
+        return 1 << self.max_order
+
+
+class Slab:
+    """One page dedicated to objects of a single size class."""
+
+    def __init__(self, page, obj_size):
+        self.page = page
+        self.obj_size = obj_size
+        self.capacity = SLAB_PAGE // obj_size
+        self.free_slots = list(range(self.capacity))  # min-heap: lowest slot first
+
+
+class SlabManager(Allocator):
+    """Slab allocator: requests round up to a size class, served from per-class pages.
+
+    Only whole pages are managed, so a 500-unit arena holds 7 pages (448 units).
+    """
+    kind = 'slab'
+
+    def __init__(self, total_size):
+        super().__init__()
+        pages = total_size // SLAB_PAGE
+        self.total_size = pages * SLAB_PAGE
+        self.free_pages = list(range(pages))               # min-heap of unassigned pages
+        self.slabs = {}                                    # page -> Slab
+        self.partial = {c: set() for c in SIZE_CLASSES}   # pages of class c with a free slot
+        self.allocated = {}                                # start -> allocated block
+        self.free_units = self.total_size
+        self.internal_waste = 0
+
+    def validate(self, size, strategy):
+        if size > SIZE_CLASSES[-1]:
+            return f"Requests above {SIZE_CLASSES[-1]} units exceed the largest slab size class."
+        return None
+
+    def _alloc(self, process_id, size, strategy=None):
+        if size > SIZE_CLASSES[-1]:
+            return None
+        obj_size = SIZE_CLASSES[bisect_left(SIZE_CLASSES, size)]
+        if self.partial[obj_size]:
+            slab = self.slabs[min(self.partial[obj_size])]
+        elif self.free_pages:
+            slab = Slab(heapq.heappop(self.free_pages), obj_size)
+            self.slabs[slab.page] = slab
+            self.partial[obj_size].add(slab.page)
+        else:
+            return None
+        slot = heapq.heappop(slab.free_slots)
+        if not slab.free_slots:
+            self.partial[obj_size].discard(slab.page)
+        start = slab.page * SLAB_PAGE + slot * obj_size
+        block = MemoryBlock(start, obj_size, True, process_id, requested=size)
+        self.allocated[start] = block
+        self.free_units -= obj_size
+        self.internal_waste += obj_size - size
+        return block
+
+    def _free(self, block):
+        del self.allocated[block.start]
+        self.free_units += block.size
+        self.internal_waste -= block.size - block.requested
+        slab = self.slabs[block.start // SLAB_PAGE]
+        heapq.heappush(slab.free_slots, (block.start % SLAB_PAGE) // slab.obj_size)
+        if len(slab.free_slots) == slab.capacity:
+            # Empty slab: hand the page back so any size class can reuse it
+            del self.slabs[slab.page]
+            self.partial[slab.obj_size].discard(slab.page)
+            heapq.heappush(self.free_pages, slab.page)
+        else:
+            self.partial[slab.obj_size].add(slab.page)
+        return MemoryBlock(block.start, block.size)
+
+    def describe(self, block, strategy):
+        return f" ({block.size}-unit size class)"
+
+    def blocks(self):
+        result = list(self.allocated.values())
+        for page in self.free_pages:
+            result.append(MemoryBlock(page * SLAB_PAGE, SLAB_PAGE))
+        for slab in self.slabs.values():
+            # Show runs of free slots inside a slab as one span
+            base = slab.page * SLAB_PAGE
+            run_start = None
+            for slot in range(slab.capacity + 1):
+                start = base + slot * slab.obj_size
+                if slot < slab.capacity and start not in self.allocated:
+                    if run_start is None:
+                        run_start = start
+                elif run_start is not None:
+                    result.append(MemoryBlock(run_start, start - run_start))
+                    run_start = None
+        return result
+
+    def largest_free(self):
+        if self.free_pages:
+            return SLAB_PAGE
+        for obj_size in reversed(SIZE_CLASSES):
+            if self.partial[obj_size]:
+                return obj_size
+        return 0
+
+    def max_request(self):
+        return SIZE_CLASSES[-1]
+
+
+ALLOCATORS = {
+    'variable': MemoryManager,
+    'buddy': BuddyManager,
+    'slab': SlabManager,
+}
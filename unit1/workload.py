@@ -0,0 +1,155 @@
+# ------------------------------
+# Allocation workload runner for the DMA allocators
+# Drives any Allocator from allocators.py with a synthetic or imported
+# trace and samples throughput, failure rate and fragmentation as it goes.
+#
+# Trace format (one op per line, '#' starts a comment):
+#     alloc <id> <size>
+#     free <id>
+#
+# CLI, from the project root:
+#     python -m unit1.workload --allocator all --ops 100000 --dist exponential
+#     python -m unit1.workload --allocator buddy --trace my_trace.txt
+# ------------------------------
+
+import argparse
+import json
+import random
+import time
+
+from unit1.allocators import ALLOCATORS, STRATEGIES
+
+DISTRIBUTIONS = ('uniform', 'exponential', 'bimodal')
+
+
+def synthetic_trace(ops, dist='exponential', max_size=64, mean_size=12, free_ratio=0.5, seed=0):
+    """Return a list of ("alloc", id, size) / ("free", id) ops.
+
+    Frees pick a random live id; the trace is fixed up front so every
+    allocator replays exactly the same sequence.
+    """
+    rng = random.Random(seed)
+    trace = []
+    live = []
+    next_id = 0
+    for _ in range(ops):
+        if live and rng.random() < free_ratio:
+            # Swap-remove keeps picking a random live id O(1)
+            i = rng.randrange(len(live))
+            live[i], live[-1] = live[-1], live[i]
+            trace.append(("free", live.pop()))
+            continue
+        if dist == 'uniform':
+            size = rng.randint(1, max_size)
+        elif dist == 'bimodal':
+            # Mostly small objects with occasional large buffers
+            size = rng.randint(1, 16) if rng.random() < 0.9 else rng.randint(max(1, max_size // 2), max_size)
+        else:
+            size = min(max_size, 1 + int(rng.expovariate(1 / mean_size)))
+        trace.append(("alloc", next_id, size))
+        live.append(next_id)
+        next_id += 1
+    return trace
+
+
+def parse_trace(lines):
+    """Parse trace text lines; raise ValueError with the line number on bad input."""
+    trace = []
+    for lineno, line in enumerate(lines, 1):
+        parts = line.split('#', 1)[0].split()
+        if not parts:
+            continue
+        try:
+            if parts[0] == 'alloc' and len(parts) == 3:
+                size = int(parts[2])
+                if size <= 0:
+                    raise ValueError
+                trace.append(("alloc", parts[1], size))
+            elif parts[0] == 'free' and len(parts) == 2:
+                trace.append(("free", parts[1]))
+            else:
+                raise ValueError
+        except ValueError:
+            raise ValueError(f"Line {lineno}: expected 'alloc <id> <size>' or 'free <id>'.") from None
+    return trace
+
+
+def replay(allocator, trace, strategy='first', sample_every=10000):
+    """Run trace against allocator, yielding a stats dict every sample_every ops and at the end."""
+    live = {}       # trace id -> block
+    allocs = failures = 0
+    start = time.perf_counter()
+    total = len(trace)
+    for i, op in enumerate(trace, 1):
+        if op[0] == "alloc":
+            allocs += 1
+            block = allocator.alloc_block(op[1], op[2], strategy)
+            if block is None:
+                failures += 1
+            else:
+                live[op[1]] = block
+        else:
+            # Frees of ids whose allocation failed are no-ops
+            block = live.pop(op[1], None)
+            if block is not None:
+                allocator.free_block(block)
+        if i % sample_every == 0 or i == total:
+            elapsed = time.perf_counter() - start
+            yield {
+                "ops": i,
+                "elapsed_s": round(elapsed, 4),
+                "ops_per_sec": round(i / elapsed) if elapsed else None,
+                "allocations": allocs,
+                "failures": failures,
+                "failure_rate": round(failures / allocs, 4) if allocs else 0.0,
+                "live_blocks": len(live),
+                **allocator.metrics()
+            }
+
+
+def simulate(kinds, trace, arena, strategy='first', sample_every=10000):
+    """Replay the same trace on each allocator kind, yielding tagged samples."""
+    for kind in kinds:
+        allocator = ALLOCATORS[kind](arena)
+        for sample in replay(allocator, trace, strategy, sample_every):
+            sample["final"] = sample["ops"] == len(trace)
+            yield sample
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay allocation workloads against the DMA allocators.")
+    parser.add_argument('--allocator', default='all', choices=['all', *ALLOCATORS])
+    parser.add_argument('--strategy', default='first', choices=STRATEGIES, help='fit strategy for the variable allocator')
+    parser.add_argument('--arena', type=int, default=4096, help='arena size in units')
+    parser.add_argument('--trace', help='trace file to replay instead of a synthetic workload')
+    parser.add_argument('--ops', type=int, default=100000)
+    parser.add_argument('--dist', default='exponential', choices=DISTRIBUTIONS)
+    parser.add_argument('--max-size', type=int, default=64)
+    parser.add_argument('--mean-size', type=float, default=12)
+    parser.add_argument('--free-ratio', type=float, default=0.5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--sample-every', type=int, default=10000)
+    parser.add_argument('--json', action='store_true', help='print every sample as a JSON line')
+    args = parser.parse_args()
+
+    if args.trace:
+        with open(args.trace) as f:
+            trace = parse_trace(f)
+    else:
+        trace = synthetic_trace(args.ops, args.dist, args.max_size, args.mean_size, args.free_ratio, args.seed)
+    kinds = list(ALLOCATORS) if args.allocator == 'all' else [args.allocator]
+
+    if not args.json:
+        print(f"{len(trace):,} ops, arena {args.arena} units\n")
+        print(f"{'allocator':<10}{'ops/s':>10}{'fail %':>8}{'int frag %':>12}{'ext frag %':>12}{'largest':>9}")
+    for sample in simulate(kinds, trace, args.arena, args.strategy, args.sample_every):
+        if args.json:
+            print(json.dumps(sample))
+        elif sample["final"]:
+            print(f"{sample['allocator']:<10}{sample['ops_per_sec']:>10,}{sample['failure_rate'] * 100:>8.2f}"
+                  f"{sample['internal_ratio'] * 100:>12.2f}{sample['external_fragmentation'] * 100:>12.2f}"
+                  f"{sample['largest_free']:>9}")
+
+
+if __name__ == '__main__':
+    main()
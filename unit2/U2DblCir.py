@@ -1,5 +1,6 @@
 # 1. Import Blueprint instead of Flask
 from flask import Blueprint, request, jsonify, render_template_string
+from scripting import run_script
 
 # 2. Create a Blueprint object
 dblcir_bp = Blueprint(
@@ -318,6 +319,16 @@ def delete_node():
         msg = "No value provided for deletion."
     return jsonify({"message": msg, "list": dll.to_list()})
 
+@dblcir_bp.route('/script', methods=['POST'])
+def run_list_script():
+    trace, error = run_script(request.get_json(silent=True), {
+        "insert": (dll.insert, True),
+        "delete": (dll.delete, True),
+    })
+    if error:
+        return jsonify({"message": error, "list": dll.to_list()}), 400
+    return jsonify({"trace": trace, "list": dll.to_list()})
+
 # FIX: Added status route
 @dblcir_bp.route('/status')
 def status():
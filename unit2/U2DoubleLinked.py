@@ -1,5 +1,6 @@
 # 1. Import Blueprint instead of Flask
 from flask import Blueprint, request, jsonify, render_template_string
+from scripting import run_script
 
 # 2. Create a Blueprint object
 doublelinked_bp = Blueprint(
@@ -282,6 +283,16 @@ def delete_node():
         msg = "No value provided for deletion."
     return jsonify({"message": msg, "list": dll.to_list()})
 
+@doublelinked_bp.route('/script', methods=['POST'])
+def run_list_script():
+    trace, error = run_script(request.get_json(silent=True), {
+        "insert": (dll.insert, True),
+        "delete": (dll.delete, True),
+    })
+    if error:
+        return jsonify({"message": error, "list": dll.to_list()}), 400
+    return jsonify({"trace": trace, "list": dll.to_list()})
+
 @doublelinked_bp.route('/status')
 def status():
     """A new route just to get the current state of the list."""
@@ -1,5 +1,6 @@
 # 1. Import Blueprint instead of Flask
 from flask import Blueprint, request, jsonify, render_template_string
+from scripting import run_script
 
 # 2. Create a Blueprint object
 cirsingle_bp = Blueprint(
@@ -282,6 +283,16 @@ def delete_node():
         msg = "No value provided for deletion."
     return jsonify({"message": msg, "list": circular_list.to_list()})
 
+@cirsingle_bp.route('/script', methods=['POST'])
+def run_list_script():
+    trace, error = run_script(request.get_json(silent=True), {
+        "insert": (circular_list.insert, True),
+        "delete": (circular_list.delete, True),
+    })
+    if error:
+        return jsonify({"message": error, "list": circular_list.to_list()}), 400
+    return jsonify({"trace": trace, "list": circular_list.to_list()})
+
 @cirsingle_bp.route('/status')
 def status():
     """A new route just to get the current state of the list."""
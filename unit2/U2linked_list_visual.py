@@ -1,5 +1,6 @@
 # 1. Import Blueprint instead of Flask
 from flask import Blueprint, request, jsonify, render_template_string
+from scripting import run_script
 
 # 2. Create a Blueprint object
 linkedlist_bp = Blueprint(
@@ -247,6 +248,16 @@ def delete_node():
         msg = "No value provided for deletion."
     return jsonify({"message": msg, "list": linked_list.to_list()})
 
+@linkedlist_bp.route('/script', methods=['POST'])
+def run_list_script():
+    trace, error = run_script(request.get_json(silent=True), {
+        "insert": (linked_list.insert, True),
+        "delete": (linked_list.delete, True),
+    })
+    if error:
+        return jsonify({"message": error, "list": linked_list.to_list()}), 400
+    return jsonify({"trace": trace, "list": linked_list.to_list()})
+
 # FIX: Added status route
 @linkedlist_bp.route('/status')
 def status():
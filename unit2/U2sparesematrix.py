@@ -1,14 +1,24 @@
 # 1. Import Blueprint
+from bisect import bisect_left, insort
 from flask import Blueprint, request, jsonify, render_template_string
+from unit2 import sparse_engine
+from unit2.sparse_engine import COOMatrix
 
 # 2. Create Blueprint
 sparesematrix_bp = Blueprint('sparesematrix_bp', __name__)
 
 # ------------------------------
 # Sparse Matrix (Triplet Linked Representation)
-# (Logic is unchanged)
+# The row-major linked list is the visualized view; a (row, col) dict and
+# per-row sorted column arrays locate nodes and their predecessors without
+# walking the list.
 # ------------------------------
 
+MAX_DIMENSION = 1_000_000   # upper bound for rows/cols accepted by /reset
+MAX_VIEW_ELEMENTS = 500     # triplets returned to the page per response
+TRACE_LIMIT = 64            # operand nnz above which /compute skips the step trace
+MAX_PRODUCT_TERMS = 5_000_000   # scalar multiplications (and so result entries) per /compute multiply
+
 class Node:
     def __init__(self, row, col, val):
         self.row = row
@@ -21,55 +31,90 @@ class SparseMatrix:
         self.rows = rows
         self.cols = cols
         self.head = None
+        self.index = {}        # (row, col) -> Node
+        self.row_cols = {}     # row -> sorted list of occupied columns
+        self.active_rows = []  # sorted list of rows with at least one element
+
+    def in_bounds(self, row, col):
+        return 0 <= row < self.rows and 0 <= col < self.cols
+
+    def _predecessor(self, row, col):
+        """Return the node that precedes (row, col) in row-major order, or None."""
+        cols = self.row_cols.get(row)
+        if cols:
+            i = bisect_left(cols, col)
+            if i > 0:
+                return self.index[(row, cols[i - 1])]
+        r = bisect_left(self.active_rows, row)
+        if r > 0:
+            prev_row = self.active_rows[r - 1]
+            return self.index[(prev_row, self.row_cols[prev_row][-1])]
+        return None
+
+    def get(self, row, col):
+        """Return the stored value at (row, col); zero if not stored."""
+        node = self.index.get((row, col))
+        return node.val if node else 0
 
     def insert(self, row, col, val):
         """Insert a non-zero element in sorted order (row-major)."""
+        if not self.in_bounds(row, col):
+            return f"Position ({row}, {col}) is outside the {self.rows}x{self.cols} matrix."
         if val == 0:
             return "Zero value not stored in sparse matrix."
 
-        new_node = Node(row, col, val)
-        if self.head is None or (row < self.head.row or (row == self.head.row and col < self.head.col)):
-            new_node.next = self.head
-            self.head = new_node
-            return f"Inserted value {val} at ({row}, {col})."
-
-        prev = None
-        curr = self.head
-        while curr and (curr.row < row or (curr.row == row and curr.col < col)):
-            prev = curr
-            curr = curr.next
-
         # If the element already exists, update
-        if curr and curr.row == row and curr.col == col:
-            curr.val = val
+        existing = self.index.get((row, col))
+        if existing:
+            existing.val = val
             return f"Updated value at ({row}, {col}) to {val}."
 
-        new_node.next = curr
-        prev.next = new_node
+        new_node = Node(row, col, val)
+        prev = self._predecessor(row, col)
+        if prev is None:
+            new_node.next = self.head
+            self.head = new_node
+        else:
+            new_node.next = prev.next
+            prev.next = new_node
+
+        self.index[(row, col)] = new_node
+        if row not in self.row_cols:
+            self.row_cols[row] = []
+            insort(self.active_rows, row)
+        insort(self.row_cols[row], col)
         return f"Inserted value {val} at ({row}, {col})."
 
     def delete(self, row, col):
         """Delete an element from the sparse matrix."""
         if self.head is None:
             return "Matrix is empty."
-        curr = self.head
-        prev = None
-        while curr:
-            if curr.row == row and curr.col == col:
-                if prev:
-                    prev.next = curr.next
-                else:
-                    self.head = curr.next
-                return f"Deleted element at ({row}, {col})."
-            prev = curr
-            curr = curr.next
-        return f"No element found at ({row}, {col})."
-
-    def to_list(self):
-        """Return all non-zero elements as list of dicts."""
+        node = self.index.get((row, col))
+        if node is None:
+            return f"No element found at ({row}, {col})."
+
+        prev = self._predecessor(row, col)
+        if prev:
+            prev.next = node.next
+        else:
+            self.head = node.next
+
+        del self.index[(row, col)]
+        cols = self.row_cols[row]
+        cols.pop(bisect_left(cols, col))
+        if not cols:
+            del self.row_cols[row]
+            self.active_rows.pop(bisect_left(self.active_rows, row))
+        return f"Deleted element at ({row}, {col})."
+
+    def nnz(self):
+        return len(self.index)
+
+    def to_list(self, limit=None):
+        """Return non-zero elements (up to limit) as list of dicts."""
         result = []
         curr = self.head
-        while curr:
+        while curr and (limit is None or len(result) < limit):
             result.append({
                 "row": curr.row,
                 "col": curr.col,
@@ -78,6 +123,15 @@ class SparseMatrix:
             curr = curr.next
         return result
 
+    def view(self):
+        """Response payload: dimensions, element count and the visible triplets."""
+        return {
+            "rows": self.rows,
+            "cols": self.cols,
+            "nnz": self.nnz(),
+            "elements": self.to_list(limit=MAX_VIEW_ELEMENTS)
+        }
+
 
 # ------------------------------
 # Flask App Setup
@@ -118,6 +172,11 @@ def index():
             <button onclick="insert()">Insert</button>
             <button onclick="deleteElement()">Delete</button>
         </div>
+        <div>
+            <input type="number" id="rows" placeholder="Rows" min="1">
+            <input type="number" id="cols" placeholder="Cols" min="1">
+            <button onclick="resetMatrix()">New Matrix</button>
+        </div>
 
         <p id="status"></p>
 
@@ -138,7 +197,7 @@ def index():
                 let res = await fetch(`insert?row=${row}&col=${col}&val=${val}`);
                 let data = await res.json();
                 document.getElementById("status").innerText = data.message;
-                drawMatrix(data.elements);
+                drawMatrix(data);
                 
                 // FIX: Clear inputs
                 document.getElementById("row").value = "";
@@ -146,6 +205,15 @@ def index():
                 document.getElementById("val").value = "";
             }
 
+            async function resetMatrix() {
+                let rows = parseInt(document.getElementById("rows").value) || 5;
+                let cols = parseInt(document.getElementById("cols").value) || 5;
+                let res = await fetch(`reset?rows=${rows}&cols=${cols}`);
+                let data = await res.json();
+                document.getElementById("status").innerText = data.message;
+                drawMatrix(data);
+            }
+
             async function deleteElement() {
                 let row = parseInt(document.getElementById("row").value);
                 let col = parseInt(document.getElementById("col").value);
@@ -157,7 +225,7 @@ def index():
                 let res = await fetch(`delete?row=${row}&col=${col}`);
                 let data = await res.json();
                 document.getElementById("status").innerText = data.message;
-                drawMatrix(data.elements);
+                drawMatrix(data);
                 
                 // FIX: Clear inputs
                 document.getElementById("row").value = "";
@@ -165,7 +233,8 @@ def index():
                 document.getElementById("val").value = "";
             }
 
-            function drawMatrix(elements) {
+            function drawMatrix(data) {
+                let elements = data.elements;
                 let canvas = document.getElementById("canvas");
                 let ctx = canvas.getContext("2d");
 
@@ -176,18 +245,28 @@ def index():
 
                 ctx.clearRect(0, 0, canvas.width, canvas.height);
 
-                const rows = 5, cols = 5;
-                const cellSize = 80;
+                const rows = data.rows, cols = data.cols;
+                // Fit the grid into 400px; large matrices show only the triplet list
+                const cellSize = Math.min(80, Math.floor(400 / Math.max(rows, cols)));
+                const showGrid = cellSize >= 20;
                 const startX = 100, startY = 100;
 
-                // Draw grid
                 ctx.strokeStyle = "#000";
                 ctx.font = "16px Arial";
-                for (let i = 0; i < rows; i++) {
-                    for (let j = 0; j < cols; j++) {
-                        ctx.strokeRect(startX + j * cellSize, startY + i * cellSize, cellSize, cellSize);
-                        ctx.fillStyle = "#555";
-                        ctx.fillText(`${i},${j}`, startX + j * cellSize + 20, startY + i * cellSize + 45);
+                ctx.fillStyle = "#555";
+                let shown = elements.length < data.nnz ? ` (showing first ${elements.length})` : "";
+                ctx.fillText(`${rows} x ${cols} matrix, ${data.nnz} non-zero${shown}`, startX, 60);
+
+                // Draw grid
+                if (showGrid) {
+                    for (let i = 0; i < rows; i++) {
+                        for (let j = 0; j < cols; j++) {
+                            ctx.strokeRect(startX + j * cellSize, startY + i * cellSize, cellSize, cellSize);
+                            if (cellSize >= 60) {
+                                ctx.fillStyle = "#555";
+                                ctx.fillText(`${i},${j}`, startX + j * cellSize + 20, startY + i * cellSize + 45);
+                            }
+                        }
                     }
                 }
 
@@ -225,11 +304,13 @@ def index():
                 }
 
                 // Highlight non-zero elements in matrix grid
+                if (!showGrid) return;
+                const pad = cellSize / 8;
                 ctx.fillStyle = "red";
                 elements.forEach(e => {
-                    ctx.fillRect(startX + e.col * cellSize + 10, startY + e.row * cellSize + 10, 60, 60);
+                    ctx.fillRect(startX + e.col * cellSize + pad, startY + e.row * cellSize + pad, cellSize - 2 * pad, cellSize - 2 * pad);
                     ctx.fillStyle = "white";
-                    ctx.fillText(e.val, startX + e.col * cellSize + 35, startY + e.row * cellSize + 50);
+                    ctx.fillText(e.val, startX + e.col * cellSize + cellSize * 0.4, startY + e.row * cellSize + cellSize * 0.6);
                     ctx.fillStyle = "red";
                 });
             }
@@ -239,7 +320,7 @@ def index():
                 // FIX: Relative fetch path
                 let res = await fetch('status');
                 let data = await res.json();
-                drawMatrix(data.elements);
+                drawMatrix(data);
             };
         </script>
     </body>
@@ -252,22 +333,126 @@ def insert():
     row = request.args.get('row', type=int)
     col = request.args.get('col', type=int)
     val = request.args.get('val', type=int)
+    if row is None or col is None or val is None:
+        return jsonify({"message": "Row, column and value must be integers.", **matrix.view()})
     msg = matrix.insert(row, col, val)
-    return jsonify({"message": msg, "elements": matrix.to_list()})
+    return jsonify({"message": msg, **matrix.view()})
 
 
 @sparesematrix_bp.route('/delete')
 def delete():
     row = request.args.get('row', type=int)
     col = request.args.get('col', type=int)
+    if row is None or col is None:
+        return jsonify({"message": "Row and column must be integers.", **matrix.view()})
     msg = matrix.delete(row, col)
-    return jsonify({"message": msg, "elements": matrix.to_list()})
+    return jsonify({"message": msg, **matrix.view()})
+
+
+@sparesematrix_bp.route('/get')
+def get():
+    row = request.args.get('row', type=int)
+    col = request.args.get('col', type=int)
+    if row is None or col is None or not matrix.in_bounds(row, col):
+        return jsonify({"message": "Row and column must be inside the matrix."}), 400
+    return jsonify({"row": row, "col": col, "val": matrix.get(row, col)})
+
+
+@sparesematrix_bp.route('/reset')
+def reset():
+    global matrix
+    rows = request.args.get('rows', 5, type=int)
+    cols = request.args.get('cols', 5, type=int)
+    if not (1 <= rows <= MAX_DIMENSION and 1 <= cols <= MAX_DIMENSION):
+        msg = f"Rows and columns must be between 1 and {MAX_DIMENSION}."
+        return jsonify({"message": msg, **matrix.view()})
+    matrix = SparseMatrix(rows=rows, cols=cols)
+    return jsonify({"message": f"Created an empty {rows}x{cols} matrix.", **matrix.view()})
+
+
+def parse_operand(spec, fmt):
+    """Build a COO/CSR operand from {"rows", "cols", "entries": [[r, c, v], ...]} or "current"."""
+    if spec == "current":
+        rows, cols = matrix.rows, matrix.cols
+        triplets = [(e["row"], e["col"], e["val"]) for e in matrix.to_list()]
+    elif isinstance(spec, dict):
+        rows, cols = spec.get("rows"), spec.get("cols")
+        if not (isinstance(rows, int) and isinstance(cols, int) and
+                1 <= rows <= MAX_DIMENSION and 1 <= cols <= MAX_DIMENSION):
+            raise ValueError(f"Operand rows and cols must be integers between 1 and {MAX_DIMENSION}.")
+        triplets = []
+        for entry in spec.get("entries", []):
+            if not (isinstance(entry, (list, tuple)) and len(entry) == 3):
+                raise ValueError("Each entry must be a [row, col, value] triplet.")
+            r, c, v = entry
+            if not (isinstance(r, int) and isinstance(c, int) and 0 <= r < rows and 0 <= c < cols):
+                raise ValueError(f"Entry ({r}, {c}) is outside the {rows}x{cols} operand.")
+            if not isinstance(v, (int, float)):
+                raise ValueError(f"Entry ({r}, {c}) has a non-numeric value.")
+            triplets.append((r, c, v))
+    else:
+        raise ValueError('Operands must be "current" or an object with rows, cols and entries.')
+    operand = COOMatrix.from_triplets(rows, cols, triplets)
+    return operand.to_csr() if fmt == "csr" else operand
+
+
+@sparesematrix_bp.route('/compute', methods=['POST'])
+def compute():
+    """Run add / transpose / multiply / matvec on COO or CSR operands.
+
+    Body: {"op", "a", "b" (add, multiply), "x" (matvec), "format": "coo"|"csr", "trace": bool}
+    Traces are only built when requested and every operand is small.
+    """
+    body = request.get_json(silent=True) or {}
+    op = body.get("op")
+    fmt = body.get("format", "csr")
+    if op not in ("add", "transpose", "multiply", "matvec"):
+        return jsonify({"message": "op must be one of add, transpose, multiply, matvec."}), 400
+    if fmt not in ("coo", "csr"):
+        return jsonify({"message": "format must be coo or csr."}), 400
+
+    try:
+        a = parse_operand(body.get("a", "current"), fmt)
+        operands = [a]
+        if op in ("add", "multiply"):
+            b = parse_operand(body.get("b", "current"), fmt)
+            operands.append(b)
+        traced = bool(body.get("trace", True)) and all(m.nnz() <= TRACE_LIMIT for m in operands)
+        steps = [] if traced else None
+
+        if op == "matvec":
+            x = body.get("x")
+            if not isinstance(x, list) or not all(isinstance(v, (int, float)) for v in x):
+                raise ValueError("matvec needs a numeric vector x.")
+            vector = sparse_engine.matvec(a, x, steps)
+            return jsonify({"op": op, "format": fmt, "vector": vector, "steps": steps, "traced": traced})
+
+        if op == "transpose":
+            result = sparse_engine.transpose(a, steps)
+        elif op == "add":
+            result = sparse_engine.add(a, b, steps)
+        else:
+            result = sparse_engine.multiply(a, b, steps, max_terms=MAX_PRODUCT_TERMS)
+    except (ValueError, TypeError) as e:
+        return jsonify({"message": str(e)}), 400
+
+    entries = result.to_coo().entries
+    return jsonify({
+        "op": op,
+        "format": fmt,
+        "rows": result.rows,
+        "cols": result.cols,
+        "nnz": len(entries),
+        "entries": [list(e) for e in entries[:MAX_VIEW_ELEMENTS]],
+        "steps": steps,
+        "traced": traced
+    })
 
 
 # FIX: Changed from @app.route and added
 @sparesematrix_bp.route('/status')
 def status():
-    return jsonify({"elements": matrix.to_list()})
+    return jsonify(matrix.view())
 
 
 # 4. REMOVE the if __name__ == '__main__' block
\ No newline at end of file
@@ -0,0 +1,321 @@
+# ------------------------------
+# Sparse Matrix Arithmetic (COO and CSR backings)
+# Used by the /compute route in U2sparesematrix.py. Every operation takes
+# an optional `steps` list; when it is None no trace strings are built,
+# which is the fast path for large inputs.
+# NumPy is only used when it gives exactly the pure-Python answer: all
+# values are floats, or all are ints small enough that int64 / float64
+# arithmetic cannot overflow or round.
+# ------------------------------
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; pure-Python paths are always available
+    np = None
+
+INT64_SAFE = 2 ** 62       # |a| + |b| stays inside int64
+FLOAT64_EXACT = 2 ** 53    # integers float64 represents exactly
+TRACE_POINTERS = 32        # pointer arrays longer than this are summarized in traces
+
+
+class COOMatrix:
+    """Coordinate format: row-major sorted (row, col, val) triplets."""
+
+    def __init__(self, rows, cols, entries):
+        self.rows = rows
+        self.cols = cols
+        self.entries = entries
+
+    @classmethod
+    def from_triplets(cls, rows, cols, triplets):
+        """Build from unsorted triplets, summing duplicates and dropping zeros."""
+        acc = {}
+        for r, c, v in triplets:
+            acc[(r, c)] = acc.get((r, c), 0) + v
+        entries = [(r, c, v) for (r, c), v in sorted(acc.items()) if v != 0]
+        return cls(rows, cols, entries)
+
+    def nnz(self):
+        return len(self.entries)
+
+    def to_csr(self):
+        indptr = [0] * (self.rows + 1)
+        indices = []
+        data = []
+        for r, c, v in self.entries:
+            indptr[r + 1] += 1
+            indices.append(c)
+            data.append(v)
+        for r in range(self.rows):
+            indptr[r + 1] += indptr[r]
+        return CSRMatrix(self.rows, self.cols, indptr, indices, data)
+
+    def to_coo(self):
+        return self
+
+
+class CSRMatrix:
+    """Compressed sparse row: row r occupies indices/data[indptr[r]:indptr[r+1]]."""
+
+    def __init__(self, rows, cols, indptr, indices, data):
+        self.rows = rows
+        self.cols = cols
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+
+    def nnz(self):
+        return len(self.data)
+
+    def to_csr(self):
+        return self
+
+    def to_coo(self):
+        entries = []
+        for r in range(self.rows):
+            for k in range(self.indptr[r], self.indptr[r + 1]):
+                entries.append((r, self.indices[k], self.data[k]))
+        return COOMatrix(self.rows, self.cols, entries)
+
+
+def _check_shape(ok, message):
+    if not ok:
+        raise ValueError(message)
+
+
+def _value_kind(*value_lists):
+    """'float' or 'int' when every value has that exact type, else None."""
+    kinds = {type(v) for values in value_lists for v in values}
+    if kinds == {float}:
+        return 'float'
+    if kinds == {int}:
+        return 'int'
+    return None   # mixed, bools, or nothing at all
+
+
+def _max_abs(values):
+    return max((abs(v) for v in values), default=0)
+
+
+def _show_pointers(pointers):
+    if len(pointers) <= TRACE_POINTERS:
+        return str(pointers)
+    return f"{pointers[:TRACE_POINTERS]} ... ({len(pointers)} entries)"
+
+
+# ------------------------------
+# Transpose
+# ------------------------------
+
+def transpose(m, steps=None):
+    if isinstance(m, COOMatrix):
+        if steps is not None:
+            steps.append(f"COO transpose: swap row/col in {m.nnz()} triplets, then re-sort")
+        entries = sorted((c, r, v) for r, c, v in m.entries)
+        return COOMatrix(m.cols, m.rows, entries)
+
+    # CSR: counting sort by column gives the rows of the transpose in order
+    counts = [0] * (m.cols + 1)
+    for c in m.indices:
+        counts[c + 1] += 1
+    for c in range(m.cols):
+        counts[c + 1] += counts[c]
+    if steps is not None:
+        steps.append(f"CSR transpose: column counts give new row pointers {_show_pointers(counts)}")
+    indptr = counts[:]
+    nxt = counts[:-1]
+    indices = [0] * m.nnz()
+    data = [0] * m.nnz()
+    for r in range(m.rows):
+        for k in range(m.indptr[r], m.indptr[r + 1]):
+            c = m.indices[k]
+            dest = nxt[c]
+            indices[dest] = r
+            data[dest] = m.data[k]
+            nxt[c] += 1
+            if steps is not None:
+                steps.append(f"Move ({r}, {c}) = {m.data[k]} to ({c}, {r}) at slot {dest}")
+    return CSRMatrix(m.cols, m.rows, indptr, indices, data)
+
+
+# ------------------------------
+# Addition
+# ------------------------------
+
+def _merge_runs(a_cols, a_vals, b_cols, b_vals, describe, steps):
+    """Merge two sorted (key, val) runs, summing matching keys.
+
+    describe turns a key into the "(row, col)" label used in the trace.
+    """
+    out_cols, out_vals = [], []
+    i = j = 0
+    while i < len(a_cols) or j < len(b_cols):
+        if j >= len(b_cols) or (i < len(a_cols) and a_cols[i] < b_cols[j]):
+            c, v = a_cols[i], a_vals[i]
+            i += 1
+            note = "from A"
+        elif i >= len(a_cols) or b_cols[j] < a_cols[i]:
+            c, v = b_cols[j], b_vals[j]
+            j += 1
+            note = "from B"
+        else:
+            c, v = a_cols[i], a_vals[i] + b_vals[j]
+            note = f"{a_vals[i]} + {b_vals[j]}"
+            i += 1
+            j += 1
+        if steps is not None:
+            steps.append(f"{describe(c)}: {note} = {v}" + (" (dropped)" if v == 0 else ""))
+        if v != 0:
+            out_cols.append(c)
+            out_vals.append(v)
+    return out_cols, out_vals
+
+
+def add(a, b, steps=None):
+    _check_shape(a.rows == b.rows and a.cols == b.cols,
+                 f"Cannot add {a.rows}x{a.cols} and {b.rows}x{b.cols} matrices.")
+
+    if isinstance(a, COOMatrix):
+        b = b.to_coo()
+        if np is not None and steps is None:
+            a_vals, b_vals = [v for *_, v in a.entries], [v for *_, v in b.entries]
+            kind = _value_kind(a_vals, b_vals)
+            if kind == 'float' or (kind == 'int' and max(_max_abs(a_vals), _max_abs(b_vals)) < INT64_SAFE):
+                return _add_coo_numpy(a, b)
+        # Treat the whole matrix as one run keyed by row-major position
+        key = lambda r, c: r * a.cols + c
+        ka = [key(r, c) for r, c, _ in a.entries]
+        kb = [key(r, c) for r, c, _ in b.entries]
+        keys, vals = _merge_runs(ka, [v for *_, v in a.entries],
+                                 kb, [v for *_, v in b.entries],
+                                 lambda k: f"({k // a.cols}, {k % a.cols})", steps)
+        entries = [(k // a.cols, k % a.cols, v) for k, v in zip(keys, vals)]
+        return COOMatrix(a.rows, a.cols, entries)
+
+    b = b.to_csr()
+    indptr, indices, data = [0], [], []
+    for r in range(a.rows):
+        ra, rb = slice(a.indptr[r], a.indptr[r + 1]), slice(b.indptr[r], b.indptr[r + 1])
+        cols, vals = _merge_runs(a.indices[ra], a.data[ra], b.indices[rb], b.data[rb],
+                                 lambda c: f"({r}, {c})", steps)
+        indices.extend(cols)
+        data.extend(vals)
+        indptr.append(len(data))
+    return CSRMatrix(a.rows, a.cols, indptr, indices, data)
+
+
+def _add_coo_numpy(a, b):
+    rows = np.array([e[0] for e in a.entries] + [e[0] for e in b.entries], dtype=np.int64)
+    cols = np.array([e[1] for e in a.entries] + [e[1] for e in b.entries], dtype=np.int64)
+    vals = np.array([e[2] for e in a.entries] + [e[2] for e in b.entries])
+    keys = rows * a.cols + cols
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    sums = np.zeros(len(uniq), dtype=vals.dtype)
+    np.add.at(sums, inverse, vals)
+    keep = sums != 0
+    uniq, sums = uniq[keep], sums[keep]
+    entries = list(zip((uniq // a.cols).tolist(), (uniq % a.cols).tolist(), sums.tolist()))
+    return COOMatrix(a.rows, a.cols, entries)
+
+
+# ------------------------------
+# Sparse x Sparse (Gustavson's row-by-row algorithm)
+# ------------------------------
+
+def multiply(a, b, steps=None, max_terms=None):
+    """Sparse product. With max_terms, products needing more scalar
+    multiplications than that (which also bounds the result's nnz) are
+    refused with ValueError before any work is done.
+    """
+    _check_shape(a.cols == b.rows,
+                 f"Cannot multiply {a.rows}x{a.cols} by {b.rows}x{b.cols}: inner dimensions differ.")
+    if isinstance(a, COOMatrix) and steps is not None:
+        steps.append("COO operands are converted to CSR for row access")
+    result_coo = isinstance(a, COOMatrix)
+    a, b = a.to_csr(), b.to_csr()
+    if max_terms is not None:
+        terms = sum(b.indptr[inner + 1] - b.indptr[inner] for inner in a.indices)
+        _check_shape(terms <= max_terms,
+                     f"This product needs {terms:,} multiplications (limit {max_terms:,}).")
+
+    indptr, indices, data = [0], [], []
+    for r in range(a.rows):
+        acc = {}
+        for k in range(a.indptr[r], a.indptr[r + 1]):
+            inner, av = a.indices[k], a.data[k]
+            for kb in range(b.indptr[inner], b.indptr[inner + 1]):
+                c = b.indices[kb]
+                acc[c] = acc.get(c, 0) + av * b.data[kb]
+                if steps is not None:
+                    steps.append(f"C[{r}][{c}] += A[{r}][{inner}] * B[{inner}][{c}] = {av} * {b.data[kb]} -> {acc[c]}")
+        for c in sorted(acc):
+            if acc[c] != 0:
+                indices.append(c)
+                data.append(acc[c])
+        indptr.append(len(data))
+
+    result = CSRMatrix(a.rows, b.cols, indptr, indices, data)
+    return result.to_coo() if result_coo else result
+
+
+# ------------------------------
+# Sparse x Dense vector
+# ------------------------------
+
+def matvec(a, x, steps=None):
+    _check_shape(len(x) == a.cols,
+                 f"Vector has length {len(x)} but the matrix has {a.cols} columns.")
+
+    vals = a.data if isinstance(a, CSRMatrix) else [e[2] for e in a.entries]
+    kind = _value_kind(vals, x)
+    # bincount sums in float64; integer rows are exact while every partial sum stays below 2**53
+    exact = kind == 'float' or (kind == 'int' and
+                                _max_abs(vals) * _max_abs(x) * len(vals) < FLOAT64_EXACT)
+    if np is not None and steps is None and exact:
+        xv = np.asarray(x)
+        if isinstance(a, CSRMatrix):
+            rows = np.repeat(np.arange(a.rows), np.diff(np.asarray(a.indptr)))
+            cols, vals = np.asarray(a.indices, dtype=np.int64), np.asarray(a.data)
+        else:
+            rows = np.array([e[0] for e in a.entries], dtype=np.int64)
+            cols = np.array([e[1] for e in a.entries], dtype=np.int64)
+            vals = np.array([e[2] for e in a.entries])
+        if len(vals) == 0:
+            return [0] * a.rows
+        y = np.bincount(rows, weights=vals * xv[cols], minlength=a.rows)
+        if kind == 'int':
+            y = np.rint(y).astype(np.int64)
+        return y.tolist()
+
+    y = [0] * a.rows
+    if isinstance(a, CSRMatrix):
+        for r in range(a.rows):
+            for k in range(a.indptr[r], a.indptr[r + 1]):
+                c = a.indices[k]
+                y[r] += a.data[k] * x[c]
+                if steps is not None:
+                    steps.append(f"y[{r}] += {a.data[k]} * x[{c}] ({x[c]}) -> {y[r]}")
+    else:
+        for r, c, v in a.entries:
+            y[r] += v * x[c]
+            if steps is not None:
+                steps.append(f"y[{r}] += {v} * x[{c}] ({x[c]}) -> {y[r]}")
+    return y
+
+
+# ------------------------------
+# Dense reference (used by the benchmark)
+# ------------------------------
+
+def dense_multiply(a, b):
+    """Multiply two list-of-lists matrices the schoolbook way."""
+    n, m, p = len(a), len(b), len(b[0])
+    result = [[0] * p for _ in range(n)]
+    for i in range(n):
+        row_a, row_c = a[i], result[i]
+        for k in range(m):
+            av = row_a[k]
+            row_b = b[k]
+            for j in range(p):
+                row_c[j] += av * row_b[j]
+    return result
@@ -1,5 +1,6 @@
 # 1. Import Blueprint
 from flask import Blueprint, request, jsonify, render_template_string
+from scripting import run_script
 
 # 2. Create Blueprint (Keeping your uppercase 'Queue_bp')
 Queue_bp = Blueprint(
@@ -226,6 +227,17 @@ def dequeue_value():
     return jsonify({"message": msg, "queue": queue.to_list()})
 
 
+@Queue_bp.route('/script', methods=['POST'])
+def run_queue_script():
+    trace, error = run_script(request.get_json(silent=True), {
+        "enqueue": (queue.enqueue, True),
+        "dequeue": (queue.dequeue, False),
+    })
+    if error:
+        return jsonify({"message": error, "queue": queue.to_list()}), 400
+    return jsonify({"trace": trace, "queue": queue.to_list()})
+
+
 @Queue_bp.route('/status')
 def get_status():
     return jsonify({"queue": queue.to_list()})
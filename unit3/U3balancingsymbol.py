@@ -1,6 +1,10 @@
 # 1. Import Blueprint
+import re
+
 from flask import Blueprint, request, jsonify, render_template_string
 
+from unit3.symbol_scanner import LANGUAGES, language_for, scan_stream
+
 # 2. Create Blueprint
 balancingsymbol_bp = Blueprint(
     'balancingsymbol_bp', __name__
@@ -77,6 +81,58 @@ def is_balanced(expression):
     return True, steps
 
 
+# -----------------------------
+# Fast path (no trace)
+# -----------------------------
+SYMBOL_RE = re.compile(r"[()\[\]{}]")
+OPENERS = {')': '(', ']': '[', '}': '{'}
+MAX_BATCH_LINES = 100000
+MAX_BATCH_CHARS = 8 * 1024 * 1024
+STREAM_CHUNK = 64 * 1024
+
+
+def find_imbalance(text):
+    """Return None if text is balanced, else an error dict.
+
+    Only bracket characters are visited (the regex skips everything else
+    in C) and no per-character step or stack copy is built. The error
+    dict carries the 0-based index of the offending symbol, or of the
+    innermost unclosed opener when the text ends early.
+    """
+    stack = []
+    push, pop = stack.append, stack.pop
+    for m in SYMBOL_RE.finditer(text):
+        ch = m.group()
+        if ch in "([{":
+            push(m.start())
+            continue
+        if not stack:
+            return {"index": m.start(), "char": ch,
+                    "message": f"No matching opening for '{ch}'."}
+        top = text[stack[-1]]
+        if top != OPENERS[ch]:
+            return {"index": m.start(), "char": ch, "opened_at": stack[-1],
+                    "message": f"Top of stack '{top}' does not match '{ch}'."}
+        pop()
+    if stack:
+        return {"index": stack[-1], "char": text[stack[-1]],
+                "message": f"{len(stack)} unmatched opening symbol(s); innermost is '{text[stack[-1]]}'."}
+    return None
+
+
+def check_lines(lines):
+    """Check each line on its own; return one result dict per line (1-based)."""
+    results = []
+    for number, line in enumerate(lines, 1):
+        error = find_imbalance(line)
+        if error is None:
+            results.append({"line": number, "balanced": True})
+        else:
+            results.append({"line": number, "balanced": False, "column": error["index"] + 1,
+                            "char": error["char"], "message": error["message"]})
+    return results
+
+
 # -----------------------------
 # Routes
 # -----------------------------
@@ -113,6 +169,9 @@ def index():
     <h1>🧠 Step-by-Step Balancing Symbols Visualizer</h1>
     <input type="text" id="expr" placeholder="Enter expression e.g. (a+b)*[c-{d/e}]" size="45">
     <button onclick="checkBalance()">Check Balance</button>
+    <br>
+    <input type="file" id="file">
+    <button onclick="checkFile()">Check File</button>
     <p class="status" id="status"></p>
     <div id="desc" class="desc-box">Enter an expression to start the visualization.</div>
     <canvas id="canvas" width="950" height="400"></canvas>
@@ -153,6 +212,27 @@ def index():
             }, 900);
         }
 
+        async function checkFile() {
+            const file = document.getElementById('file').files[0];
+            if (!file) return alert("Please choose a file.");
+            const res = await fetch('check_stream?filename=' + encodeURIComponent(file.name),
+                                    { method: 'POST', body: file });
+            const data = await res.json();
+            steps = [];
+            const status = document.getElementById('status');
+            const desc = document.getElementById('desc');
+            if (data.error && !data.error.line) {
+                status.innerText = "";
+                desc.innerText = data.error;
+            } else if (data.result) {
+                status.innerText = "✅ File is BALANCED";
+                desc.innerText = `${data.last_line} lines scanned (${data.lang} mode).`;
+            } else {
+                status.innerText = "❌ File is NOT balanced";
+                desc.innerText = `Line ${data.error.line}, column ${data.error.column}: ${data.error.message}`;
+            }
+        }
+
         function drawStep() {
             const canvas = document.getElementById('canvas');
             const ctx = canvas.getContext('2d');
@@ -210,7 +290,66 @@ def index():
 @balancingsymbol_bp.route('/check')
 def check():
     expr = request.args.get("expr", "")
+    if request.args.get('trace', 'true').lower() in ('0', 'false', 'no'):
+        error = find_imbalance(expr)
+        return jsonify({"result": error is None, "error": error, "steps": []})
     balanced, steps = is_balanced(expr)
     return jsonify({"result": balanced, "steps": steps})
 
-# FIX: REMOVED the if __name__ == '__main__' block
\ No newline at end of file
+
+@balancingsymbol_bp.route('/check_batch', methods=['POST'])
+def check_batch():
+    """Check many strings at once: {"lines": [...]} or {"text": "..."} split on newlines."""
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return jsonify({"error": 'Body must be JSON: {"lines": [...]} or {"text": "..."}.'}), 400
+    if isinstance(body.get('text'), str):
+        lines = body['text'].splitlines()
+    elif isinstance(body.get('lines'), list) and all(isinstance(l, str) for l in body['lines']):
+        lines = body['lines']
+    else:
+        return jsonify({"error": '"lines" must be a list of strings or "text" a string.'}), 400
+    if len(lines) > MAX_BATCH_LINES:
+        return jsonify({"error": f"Batches are limited to {MAX_BATCH_LINES} lines."}), 400
+    if sum(map(len, lines)) > MAX_BATCH_CHARS:
+        return jsonify({"error": f"Batches are limited to {MAX_BATCH_CHARS} characters."}), 400
+
+    results = check_lines(lines)
+    unbalanced = [r for r in results if not r["balanced"]]
+    if body.get('errors_only'):
+        results = unbalanced
+    return jsonify({
+        "lines": len(lines),
+        "unbalanced": len(unbalanced),
+        "results": results
+    })
+
+# FIX: REMOVED the if __name__ == '__main__' block
+
+
+@balancingsymbol_bp.route('/check_stream', methods=['POST'])
+def check_stream():
+    """Check an uploaded file chunk by chunk.
+
+    Send the file as multipart field "file" or as the raw request body.
+    ?lang=none|c|python|auto chooses whether string literals and comments
+    are skipped; auto picks from the upload's file name (or ?filename=).
+    """
+    upload = request.files.get('file')
+    stream = upload.stream if upload else request.stream
+    filename = upload.filename if upload else request.args.get('filename', '')
+    lang = request.args.get('lang', 'auto').lower()
+    if lang == 'auto':
+        lang = language_for(filename)
+    if lang not in LANGUAGES:
+        return jsonify({"error": f"Unknown lang '{lang}' (choose from auto, {', '.join(LANGUAGES)})."}), 400
+
+    chunks = iter(lambda: stream.read(STREAM_CHUNK), b'')
+    scanner = scan_stream(chunks, lang)
+    return jsonify({
+        "result": scanner.error is None,
+        "error": scanner.error,
+        "lang": lang,
+        "chars_scanned": scanner.chars,
+        "last_line": scanner.line
+    })
@@ -1,5 +1,6 @@
 # 1. Import Blueprint
 from flask import Blueprint, request, jsonify, render_template_string
+from unit3.expression import infix_tokens_to_postfix, tokenize
 
 # 2. Create Blueprint
 infixtopost_bp = Blueprint(
@@ -8,80 +9,15 @@ infixtopost_bp = Blueprint(
 
 # ------------------------------
 # Infix to Postfix Conversion Logic
-# (Logic is unchanged)
+# (Tokenizer and precedence table live in expression.py)
 # ------------------------------
 
-precedence = {'+': 1, '-': 1, '*': 2, '/': 2, '^': 3}
-
 def infix_to_postfix(expression):
     """Convert infix expression to postfix and return each step"""
-    stack = []
-    output = []
     steps = []
-
-    for char in expression:
-        if char == ' ':
-            continue
-        if char.isalnum():  # Operand
-            output.append(char)
-            steps.append({
-                "symbol": char,
-                "action": "Added to output (operand)",
-                "stack": stack.copy(),
-                "output": output.copy()
-            })
-        elif char == '(':
-            stack.append(char)
-            steps.append({
-                "symbol": char,
-                "action": "Pushed '(' onto stack",
-                "stack": stack.copy(),
-                "output": output.copy()
-            })
-        elif char == ')':
-            while stack and stack[-1] != '(':
-                output.append(stack.pop())
-            if stack and stack[-1] == '(':
-                stack.pop()
-            steps.append({
-                "symbol": char,
-                "action": "Popped until '('",
-                "stack": stack.copy(),
-                "output": output.copy()
-            })
-        else:
-            # Operator
-            # FIX: Handle potential missing key for non-operators (though input is alphanumeric)
-            if char in precedence:
-                while stack and stack[-1] != '(' and stack[-1] in precedence and precedence[stack[-1]] >= precedence[char]:
-                    output.append(stack.pop())
-                stack.append(char)
-                steps.append({
-                    "symbol": char,
-                    "action": f"Pushed operator '{char}' onto stack",
-                    "stack": stack.copy(),
-                    "output": output.copy()
-                })
-            else:
-                # Handle non-alphanumeric, non-operator, non-parenthesis chars if any
-                steps.append({
-                    "symbol": char,
-                    "action": f"Ignored unknown symbol '{char}'",
-                    "stack": stack.copy(),
-                    "output": output.copy()
-                })
-
-
-    while stack:
-        output.append(stack.pop())
-        steps.append({
-            "symbol": "-",
-            "action": "Popped remaining operators",
-            "stack": stack.copy(),
-            "output": output.copy()
-        })
-
-    return "".join(output), steps
+    output = infix_tokens_to_postfix(tokenize(expression), steps)
+    # Space-separated so multi-digit numbers and names stay distinct
+    return " ".join(output), steps
 
 
 # ------------------------------
@@ -1,5 +1,12 @@
 # 1. Import Blueprint
 from flask import Blueprint, request, jsonify, render_template_string
+from unit3.expression import (BATCH_TIME_BUDGET, BINARY, EVAL_TIME_BUDGET, UNARY, ExpressionError,
+                              LimitExceeded, compile_infix, compile_postfix, evaluate_rows,
+                              infix_tokens_to_postfix, parse_number, time_budget, tokenize,
+                              tokenize_postfix)
+
+MAX_BATCH_ROWS = 100_000
+MAX_TRACE_ROWS = 10
 
 # 2. Create Blueprint
 postfixevaluation_bp = Blueprint(
@@ -8,62 +15,88 @@ postfixevaluation_bp = Blueprint(
 
 # ------------------------------
 # Postfix Evaluation Logic
+# (Tokenizer, operators and compiler live in expression.py)
 # ------------------------------
 
-def evaluate_postfix(expression):
+def evaluate_postfix(expression, variables=None):
     """Evaluate a postfix expression and record visualization steps"""
+    variables = variables or {}
     stack = []
     steps = []
 
-    for char in expression:
-        if char == ' ':
-            continue
-        if char.isdigit():
-            stack.append(int(char))
+    for tok in tokenize_postfix(expression):
+        symbol = tok.text
+        if tok.kind in ('num', 'name'):
+            if tok.kind == 'num':
+                try:
+                    value = parse_number(symbol)
+                except LimitExceeded as e:
+                    steps.append({
+                        "symbol": symbol[:20] + "...",
+                        "action": f"Error: {e}",
+                        "stack": stack.copy(),
+                        "limit": e.limit
+                    })
+                    return None, steps
+                action = f"Pushed {symbol} to stack (operand)"
+            elif symbol in variables:
+                value = variables[symbol]
+                action = f"Pushed {symbol} = {value} to stack (variable)"
+            else:
+                steps.append({
+                    "symbol": symbol,
+                    "action": f"Error: unbound variable '{symbol}'",
+                    "stack": stack.copy()
+                })
+                return None, steps
+            stack.append(value)
             steps.append({
-                "symbol": char,
-                "action": f"Pushed {char} to stack (operand)",
+                "symbol": symbol,
+                "action": action,
                 "stack": stack.copy()
             })
-        elif char in "+-*/^":
-            if len(stack) < 2:
+        elif tok.kind == 'op':
+            arity = 1 if symbol in UNARY else 2
+            if len(stack) < arity:
                 steps.append({
-                    "symbol": char,
+                    "symbol": symbol,
                     "action": "Error: insufficient operands",
                     "stack": stack.copy()
                 })
                 # Return None for result on error
-                return None, steps 
-            
-            b = stack.pop()
-            a = stack.pop()
-            result = 0 # Initialize result
-
-            if char == '+': result = a + b
-            elif char == '-': result = a - b
-            elif char == '*': result = a * b
-            # FIX: Use integer division for standard postfix evaluation
-            elif char == '/': 
-                if b == 0:
-                    steps.append({
-                        "symbol": char,
-                        "action": f"Error: Division by zero ({a} / {b})",
+                return None, steps
+
+            if arity == 1:
+                a = stack.pop()
+                result = UNARY[symbol](a)
+                action = f"Applied unary minus: -({a}) = {result}"
+            else:
+                b = stack.pop()
+                a = stack.pop()
+                try:
+                    result = BINARY[symbol](a, b)
+                except (ExpressionError, ArithmeticError) as e:
+                    step = {
+                        "symbol": symbol,
+                        "action": f"Error: {e}",
                         "stack": [a, b] # Show what was popped
-                    })
+                    }
+                    if isinstance(e, LimitExceeded):
+                        step["limit"] = e.limit
+                    steps.append(step)
                     return None, steps
-                result = a // b 
-            elif char == '^': result = a ** b
+                action = f"Applied operator {symbol}: {a} {symbol} {b} = {result}"
 
             stack.append(result)
             steps.append({
-                "symbol": char,
-                "action": f"Applied operator {char}: {a} {char} {b} = {result}",
+                "symbol": symbol,
+                "action": action,
                 "stack": stack.copy()
             })
         else:
             steps.append({
-                "symbol": char,
-                "action": f"Ignored invalid symbol '{char}'",
+                "symbol": symbol,
+                "action": f"Ignored invalid symbol '{symbol}'",
                 "stack": stack.copy()
             })
 
@@ -79,6 +112,25 @@ def evaluate_postfix(expression):
     return final_result, steps
 
 
+def parse_bindings(text):
+    """Parse "x=3, y=4.5" into {"x": 3, "y": 4.5}."""
+    bindings = {}
+    for part in text.split(','):
+        if not part.strip():
+            continue
+        name, sep, value = part.partition('=')
+        name, value = name.strip(), value.strip()
+        if not sep or not name.isidentifier():
+            raise ExpressionError(f"Bad binding '{part.strip()}'; use name=value")
+        try:
+            bindings[name] = parse_number(value)
+        except ExpressionError:
+            raise
+        except ValueError:
+            raise ExpressionError(f"Binding for '{name}' is not a number") from None
+    return bindings
+
+
 # ------------------------------
 # Flask Routes
 # ------------------------------
@@ -99,7 +151,8 @@ def index():
     </head>
     <body>
         <h2>🧮 Postfix Expression Evaluation Visualization</h2>
-        <input type="text" id="expression" placeholder="Enter postfix (e.g., 231*+9-)" size="40">
+        <input type="text" id="expression" placeholder="Enter postfix (e.g., 12 3 1 * + x -)" size="40">
+        <input type="text" id="vars" placeholder="Variables (e.g., x=4, y=2)" size="25">
         <button onclick="evaluate()">Evaluate</button>
         <p id="status"></p>
         <canvas id="canvas" width="1000" height="500"></canvas>
@@ -111,10 +164,11 @@ def index():
                 if (!expr) return alert("Enter a postfix expression");
                 
                 // FIX: Relative fetch path (already correct)
-                let res = await fetch('evaluate?expr=' + encodeURIComponent(expr));
+                let vars = document.getElementById("vars").value;
+                let res = await fetch('evaluate?expr=' + encodeURIComponent(expr) + '&vars=' + encodeURIComponent(vars));
                 let data = await res.json();
                 
-                document.getElementById("status").innerText = "Final Result: " + data.result;
+                document.getElementById("status").innerText = data.error ? "Error: " + data.error : "Final Result: " + data.result;
                 animateSteps(data.steps);
                 
                 // FIX: Clear input box
@@ -182,8 +236,84 @@ def index():
 @postfixevaluation_bp.route('/evaluate')
 def evaluate_expression():
     expr = request.args.get('expr', '')
-    result, steps = evaluate_postfix(expr)
-    return jsonify({"result": result, "steps": steps})
+    try:
+        variables = parse_bindings(request.args.get('vars', ''))
+    except ExpressionError as e:
+        return jsonify({"result": None, "error": str(e), "steps": []}), 400
+    with time_budget(EVAL_TIME_BUDGET):
+        if request.args.get('trace', 'true').lower() in ('0', 'false', 'no'):
+            # Compiled path: no step list, and repeated expressions reuse the cached program
+            try:
+                return jsonify({"result": compile_postfix(expr)(variables), "steps": []})
+            except (ExpressionError, ArithmeticError) as e:
+                limit = e.limit if isinstance(e, LimitExceeded) else None
+                return jsonify({"result": None, "error": str(e), "limit": limit, "steps": []})
+        result, steps = evaluate_postfix(expr, variables)
+    limit = steps[-1].get("limit") if steps else None
+    return jsonify({"result": result, "limit": limit, "steps": steps})
+
+
+@postfixevaluation_bp.route('/evaluate_batch', methods=['POST'])
+def evaluate_batch():
+    """Evaluate one expression over many variable bindings.
+
+    Body: {"expr", "notation": "postfix"|"infix",
+           "rows": [{"x": 1}, ...]  or  "columns": {"x": [1, 2, ...]},
+           "trace_rows": n}  -> step traces for the first n rows (max 10)
+    """
+    body = request.get_json(silent=True) or {}
+    expr = body.get('expr')
+    notation = body.get('notation', 'postfix')
+    if not isinstance(expr, str) or not expr.strip():
+        return jsonify({"error": "expr must be a non-empty string."}), 400
+    if notation not in ('postfix', 'infix'):
+        return jsonify({"error": "notation must be postfix or infix."}), 400
+
+    if 'columns' in body:
+        columns = body['columns']
+        if not isinstance(columns, dict) or not all(isinstance(v, list) for v in columns.values()):
+            return jsonify({"error": "columns must map variable names to lists."}), 400
+        lengths = {len(v) for v in columns.values()}
+        if len(lengths) > 1:
+            return jsonify({"error": "All columns must have the same length."}), 400
+        n_rows = lengths.pop() if lengths else 1
+    else:
+        rows = body.get('rows', [{}])
+        if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+            return jsonify({"error": "rows must be a list of objects."}), 400
+        n_rows = len(rows)
+        names = {name for row in rows for name in row}
+        # Missing names become None so that row reports an error instead of the whole batch
+        columns = {name: [row.get(name) for row in rows] for name in names}
+    if n_rows > MAX_BATCH_ROWS:
+        return jsonify({"error": f"Batches are limited to {MAX_BATCH_ROWS} rows."}), 400
+    for name, values in columns.items():
+        if not all(v is None or isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+            return jsonify({"error": f"Every value of '{name}' must be a number."}), 400
+
+    try:
+        func = compile_infix(expr) if notation == 'infix' else compile_postfix(expr)
+    except ExpressionError as e:
+        return jsonify({"error": str(e)}), 400
+    with time_budget(BATCH_TIME_BUDGET):
+        results, errors, vectorized, time_limited = evaluate_rows(func, columns, n_rows)
+
+        traces = []
+        trace_rows = body.get('trace_rows', 0)
+        trace_rows = min(trace_rows, MAX_TRACE_ROWS, n_rows) if isinstance(trace_rows, int) else 0
+        postfix = expr if notation == 'postfix' else " ".join(infix_tokens_to_postfix(tokenize(expr)))
+        for i in range(trace_rows):
+            env = {name: values[i] for name, values in columns.items() if values[i] is not None}
+            traces.append({"row": i, "steps": evaluate_postfix(postfix, env)[1]})
+
+    return jsonify({
+        "results": results,
+        "errors": {str(i): msg for i, msg in errors.items()},
+        "rows": n_rows,
+        "vectorized": vectorized,
+        "time_limit_hit": time_limited,
+        "traces": traces
+    })
 
 
 # ------------------------------
@@ -1,5 +1,6 @@
 # 1. Import Blueprint
 from flask import Blueprint, request, jsonify, render_template_string
+from scripting import run_script
 
 # 2. Create Blueprint
 queuearray_bp = Blueprint(
@@ -8,38 +9,79 @@ queuearray_bp = Blueprint(
 
 # ------------------------------
 # Data Structure: Queue using Array
-# (Logic is unchanged)
+# (Circular buffer over a preallocated array)
 # ------------------------------
 
+BASE_ADDR = 0x1000   # simulated base address of the backing array
+SLOT_WIDTH = 8       # simulated bytes per slot
+MAX_CAPACITY = 4096  # upper bound accepted by the /reset route
+
 class Queue:
     def __init__(self, size=7):
-        self.queue = []
         self.max_size = size
+        self.queue = [None] * size  # preallocated slots, never grown or shifted
+        self.head = 0   # slot holding the front element
+        self.tail = 0   # slot the next enqueue writes to
+        self.count = 0
+
+    def slot_addr(self, slot):
+        """Stable simulated address of a slot in the backing array"""
+        return hex(BASE_ADDR + slot * SLOT_WIDTH)
 
     def enqueue(self, value):
-        if len(self.queue) >= self.max_size:
+        if self.count >= self.max_size:
             return "Queue Overflow! Cannot enqueue more elements."
-        self.queue.append(value)
-        return f"Enqueued value {value} to the queue."
+        slot = self.tail
+        self.queue[slot] = value
+        self.tail = (self.tail + 1) % self.max_size
+        self.count += 1
+        return f"Enqueued value {value} to the queue at slot {slot}."
 
     def dequeue(self):
-        if not self.queue:
+        if self.count == 0:
             return "Queue Underflow! Queue is empty."
-        value = self.queue.pop(0)
-        return f"Dequeued value {value} from the queue."
+        slot = self.head
+        value = self.queue[slot]
+        self.queue[slot] = None
+        self.head = (self.head + 1) % self.max_size
+        self.count -= 1
+        return f"Dequeued value {value} from the queue (slot {slot})."
 
     def to_list(self):
-        """Return structured data with index and address"""
+        """Return elements front to rear with their physical slot and address"""
         result = []
-        for i, value in enumerate(self.queue):
+        for i in range(self.count):
+            slot = (self.head + i) % self.max_size
             result.append({
                 "index": i,
-                "value": value,
-                # Simulate a unique address for visualization
-                "addr": hex(id(value)) 
+                "slot": slot,
+                "value": self.queue[slot],
+                "addr": self.slot_addr(slot)
             })
         return result
 
+    def buffer(self):
+        """Return the raw ring buffer: every slot plus head/tail indices"""
+        slots = []
+        for slot, value in enumerate(self.queue):
+            # A slot is live if it lies within count steps of head (mod capacity)
+            occupied = (slot - self.head) % self.max_size < self.count
+            slots.append({
+                "slot": slot,
+                "value": value if occupied else None,
+                "occupied": occupied,
+                "addr": self.slot_addr(slot)
+            })
+        return {
+            "capacity": self.max_size,
+            "length": self.count,
+            "head": self.head,
+            "tail": self.tail,
+            # Live region runs past the last slot and continues at slot 0
+            "wrapped": self.head + self.count > self.max_size,
+            "slots": slots
+        }
+
 # Global queue instance
 queue = Queue(size=7)
 
@@ -77,6 +119,8 @@ def index():
             <input type="text" id="queueValue" placeholder="Enter value">
             <button onclick="enqueueValue()">Enqueue</button>
             <button onclick="dequeueValue()">Dequeue</button>
+            <input type="number" id="capacity" placeholder="Capacity" min="1" style="width: 100px;">
+            <button onclick="resetQueue()">Reset</button>
         </div>
 
         <p id="status"></p>
@@ -95,7 +139,7 @@ def index():
                 let res = await fetch('enqueue?value=' + val);
                 let data = await res.json();
                 document.getElementById("status").innerText = data.message;
-                drawQueue(data.queue);
+                drawQueue(data.queue, data.buffer);
                 
                 // FIX: Clear input box
                 valInput.value = "";
@@ -106,10 +150,53 @@ def index():
                 let res = await fetch('dequeue');
                 let data = await res.json();
                 document.getElementById("status").innerText = data.message;
-                drawQueue(data.queue);
+                drawQueue(data.queue, data.buffer);
+            }
+
+            async function resetQueue() {
+                let cap = document.getElementById("capacity").value || 7;
+                let res = await fetch('reset?capacity=' + cap);
+                let data = await res.json();
+                document.getElementById("status").innerText = data.message;
+                drawQueue(data.queue, data.buffer);
+            }
+
+            // Draw the physical ring: one cell per slot, with head/tail markers
+            function drawBuffer(ctx, buffer, canvasWidth) {
+                const cellWidth = 60, cellHeight = 40, startX = 80, y = 320;
+                ctx.textAlign = "center";
+                ctx.font = "12px Arial";
+                ctx.fillStyle = "#000";
+                let wrapNote = buffer.wrapped ? " (wrapped)" : "";
+                ctx.fillText("Backing array — capacity " + buffer.capacity + wrapNote, canvasWidth / 2, y - 30);
+
+                for (let i = 0; i < buffer.slots.length; i++) {
+                    let cell = buffer.slots[i];
+                    let x = startX + i * cellWidth;
+                    ctx.fillStyle = cell.occupied ? "#87CEEB" : "#f1f5f9";
+                    ctx.fillRect(x, y, cellWidth, cellHeight);
+                    ctx.strokeStyle = "#333";
+                    ctx.strokeRect(x, y, cellWidth, cellHeight);
+                    ctx.fillStyle = "#000";
+                    let text = cell.occupied ? String(cell.value) : "";
+                    if (text.length > 6) text = text.slice(0, 5) + "…";
+                    ctx.fillText(text, x + cellWidth / 2, y + 25);
+                    ctx.fillStyle = "#666";
+                    ctx.fillText("[" + cell.slot + "]", x + cellWidth / 2, y - 8);
+
+                    if (i === buffer.head && buffer.length > 0) {
+                        ctx.fillStyle = "red";
+                        ctx.fillText("H", x + cellWidth / 2 - 10, y + cellHeight + 15);
+                    }
+                    if (i === buffer.tail) {
+                        ctx.fillStyle = "blue";
+                        ctx.fillText("T", x + cellWidth / 2 + 10, y + cellHeight + 15);
+                    }
+                }
+                ctx.textAlign = "left";
             }
 
-            function drawQueue(queue) {
+            function drawQueue(queue, buffer) {
                 let canvas = document.getElementById("canvas");
                 let ctx = canvas.getContext("2d");
 
@@ -119,19 +206,22 @@ def index():
 
                 // FIX: Dynamically resize canvas
                 let requiredWidth = startX + (queue.length * (boxWidth + boxSpacing)) + 100;
-                canvas.width = Math.max(1000, requiredWidth);
+                let bufferWidth = buffer ? startX + buffer.capacity * 60 + 100 : 0;
+                canvas.width = Math.max(1000, requiredWidth, bufferWidth);
 
                 ctx.clearRect(0, 0, canvas.width, canvas.height);
                 ctx.textAlign = "left"; // Reset align
 
+                if (buffer) drawBuffer(ctx, buffer, canvas.width);
+
                 if (queue.length === 0) {
                     ctx.font = "20px Arial";
                     ctx.textAlign = "center";
-                    ctx.fillText("Queue is empty", canvas.width / 2, 200);
+                    ctx.fillText("Queue is empty", canvas.width / 2, 150);
                     return;
                 }
                 
-                let x = startX, y = 150;
+                let x = startX, y = 120;
 
                 for (let i = 0; i < queue.length; i++) {
                     let node = queue[i];
@@ -146,7 +236,7 @@ def index():
                     ctx.font = "14px Arial";
                     ctx.fillText("Value: " + node.value, x + 10, y + 30);
                     let shortAddr = node.addr ? "..." + node.addr.slice(-6) : "None";
-                    ctx.fillText("Addr: " + shortAddr, x + 10, y + 55);
+                    ctx.fillText("Addr: " + shortAddr + " [" + node.slot + "]", x + 10, y + 55);
                     // --- END FIX ---
 
                     // Draw arrows between boxes
@@ -187,7 +277,7 @@ def index():
                     let res = await fetch('status');
                     let data = await res.json();
                     document.getElementById("status").innerText = "Queue initialized.";
-                    drawQueue(data.queue);
+                    drawQueue(data.queue, data.buffer);
                 } catch (err) {
                     console.error("Error fetching initial status:", err);
                     document.getElementById("status").innerText = "Error loading queue.";
@@ -205,17 +295,41 @@ def enqueue_value_route(): # Renamed function to avoid conflict
         msg = queue.enqueue(value)
     else:
         msg = "No value provided for enqueue."
-    return jsonify({"message": msg, "queue": queue.to_list()})
+    return jsonify({"message": msg, "queue": queue.to_list(), "buffer": queue.buffer()})
 
 @queuearray_bp.route('/dequeue')
 def dequeue_value_route(): # Renamed function to avoid conflict
     msg = queue.dequeue()
-    return jsonify({"message": msg, "queue": queue.to_list()})
+    return jsonify({"message": msg, "queue": queue.to_list(), "buffer": queue.buffer()})
+
+@queuearray_bp.route('/reset')
+def reset_queue():
+    global queue
+    try:
+        capacity = int(request.args.get('capacity', 7))
+    except ValueError:
+        return jsonify({"message": "Capacity must be an integer.", "queue": queue.to_list(), "buffer": queue.buffer()})
+    if not 1 <= capacity <= MAX_CAPACITY:
+        msg = f"Capacity must be between 1 and {MAX_CAPACITY}."
+        return jsonify({"message": msg, "queue": queue.to_list(), "buffer": queue.buffer()})
+    queue = Queue(size=capacity)
+    msg = f"Queue reset with capacity {capacity}."
+    return jsonify({"message": msg, "queue": queue.to_list(), "buffer": queue.buffer()})
+
+@queuearray_bp.route('/script', methods=['POST'])
+def run_queue_script():
+    trace, error = run_script(request.get_json(silent=True), {
+        "enqueue": (queue.enqueue, True),
+        "dequeue": (queue.dequeue, False),
+    })
+    if error:
+        return jsonify({"message": error, "queue": queue.to_list(), "buffer": queue.buffer()}), 400
+    return jsonify({"trace": trace, "queue": queue.to_list(), "buffer": queue.buffer()})
 
 # FIX: Added status route
 @queuearray_bp.route('/status')
 def get_status():
-    return jsonify({"queue": queue.to_list()})
+    return jsonify({"queue": queue.to_list(), "buffer": queue.buffer()})
 
 
 # ------------------------------
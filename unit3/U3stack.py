@@ -1,5 +1,6 @@
 # 1. Import Blueprint
 from flask import Blueprint, request, jsonify, render_template_string
+from scripting import run_script
 
 # 2. Create Blueprint
 stack_bp = Blueprint(
@@ -195,6 +196,17 @@ def pop_value():
     return jsonify({"message": msg, "stack": stack.to_list()})
 
 
+@stack_bp.route('/script', methods=['POST'])
+def run_stack_script():
+    trace, error = run_script(request.get_json(silent=True), {
+        "push": (stack.push, True),
+        "pop": (stack.pop, False),
+    })
+    if error:
+        return jsonify({"message": error, "stack": stack.to_list()}), 400
+    return jsonify({"trace": trace, "stack": stack.to_list()})
+
+
 @stack_bp.route('/status')
 def get_status():
     return jsonify({"stack": stack.to_list()})
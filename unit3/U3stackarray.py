@@ -1,5 +1,6 @@
 # 1. Import Blueprint
 from flask import Blueprint, request, jsonify, render_template_string
+from scripting import run_script
 
 # 2. Create Blueprint
 stackarray_bp = Blueprint(
@@ -8,30 +9,66 @@ stackarray_bp = Blueprint(
 
 # ------------------------------
 # Data Structure: Stack using Array
-# (Logic is unchanged)
+# (Fixed capacity, or dynamic with capacity doubling/halving)
 # ------------------------------
 
+MAX_INITIAL_CAPACITY = 1024  # upper bound accepted by the /reset route
+
 class Stack:
-    def __init__(self, size=7): # Set max size to 7 as in original
-        self.stack = []
-        self.max_size = size
+    def __init__(self, size=7, dynamic=False): # Set max size to 7 as in original
+        self.max_size = size      # hard cap in fixed mode, minimum capacity in dynamic mode
+        self.dynamic = dynamic
+        self.capacity = size
+        self.stack = [None] * size  # preallocated buffer; only slots below length are live
+        self.length = 0
+        self.events = []   # reallocations not yet reported to the client
+        self.copies = 0    # total elements moved by reallocations
+
+    def _reallocate(self, new_capacity):
+        """Move live elements into a fresh buffer of new_capacity slots"""
+        new_buffer = [None] * new_capacity
+        for i in range(self.length):
+            new_buffer[i] = self.stack[i]
+        self.events.append({
+            "kind": "grow" if new_capacity > self.capacity else "shrink",
+            "from": self.capacity,
+            "to": new_capacity,
+            "copied": self.length
+        })
+        self.copies += self.length
+        self.stack = new_buffer
+        self.capacity = new_capacity
 
     def push(self, value):
-        if len(self.stack) >= self.max_size:
-            return "Stack Overflow! Cannot push more elements."
-        self.stack.append(value)
+        if self.length >= self.capacity:
+            if not self.dynamic:
+                return "Stack Overflow! Cannot push more elements."
+            self._reallocate(self.capacity * 2)
+        self.stack[self.length] = value
+        self.length += 1
         return f"Pushed value {value} onto the stack."
 
     def pop(self):
-        if not self.stack:
+        if self.length == 0:
             return "Stack Underflow! Stack is empty."
-        value = self.stack.pop()
+        self.length -= 1
+        value = self.stack[self.length]
+        self.stack[self.length] = None
+        # Halve at one-quarter full so a push/pop sequence at the boundary cannot thrash
+        if self.dynamic and self.capacity > self.max_size and self.length <= self.capacity // 4:
+            self._reallocate(max(self.max_size, self.capacity // 2))
         return f"Popped value {value} from the stack."
 
+    def take_events(self):
+        """Return and clear the reallocations since the last call"""
+        events, self.events = self.events, []
+        return events
+
     def to_list(self):
         """Return stack representation with index and address"""
         result = []
-        for i, value in enumerate(self.stack):
+        for i in range(self.length):
+            value = self.stack[i]
             result.append({
                 "index": i,
                 "value": value,
@@ -39,6 +76,19 @@ class Stack:
             })
         return result
 
+    def info(self, drain=False):
+        """Return buffer metadata for the response.
+
+        Only routes that push or pop pass drain=True; read-only routes
+        leave pending reallocations for the next mutating response.
+        """
+        return {
+            "dynamic": self.dynamic,
+            "capacity": self.capacity,
+            "length": self.length,
+            "reallocations": self.take_events() if drain else []
+        }
+
 
 # Global stack instance
 stack = Stack(size=7)
@@ -68,6 +118,11 @@ def index():
             <button onclick="pushValue()">Push</button>
             <button onclick="popValue()">Pop</button>
         </div>
+        <div>
+            <input type="number" id="capacity" placeholder="Capacity" min="1" style="width: 100px;">
+            <label><input type="checkbox" id="dynamic"> Dynamic (grow/shrink)</label>
+            <button onclick="resetStack()">Reset</button>
+        </div>
 
         <p id="status"></p>
         <canvas id="canvas" width="600" height="500"></canvas>
@@ -81,8 +136,8 @@ def index():
                 // Relative fetch path
                 let res = await fetch('push?value=' + val);
                 let data = await res.json();
-                document.getElementById("status").innerText = data.message;
-                drawStack(data.stack, data.message);
+                showStatus(data);
+                drawStack(data.stack, data.message, data.capacity);
                 
                 // FIX: Clear input box
                 valInput.value = "";
@@ -92,23 +147,43 @@ def index():
                 // Relative fetch path
                 let res = await fetch('pop');
                 let data = await res.json();
-                document.getElementById("status").innerText = data.message;
-                drawStack(data.stack, data.message);
+                showStatus(data);
+                drawStack(data.stack, data.message, data.capacity);
+            }
+
+            async function resetStack() {
+                let cap = document.getElementById("capacity").value || 7;
+                let dyn = document.getElementById("dynamic").checked;
+                let res = await fetch('reset?capacity=' + cap + '&dynamic=' + dyn);
+                let data = await res.json();
+                showStatus(data);
+                drawStack(data.stack, data.message, data.capacity);
+            }
+
+            // Append buffer size and any reallocation (with copy count) to the message
+            function showStatus(data) {
+                let text = data.message + " [length " + data.length + " / capacity " + data.capacity + "]";
+                for (let ev of data.reallocations) {
+                    text += " — " + (ev.kind === "grow" ? "Grew" : "Shrank") + " buffer " +
+                            ev.from + " → " + ev.to + ", copied " + ev.copied + " element(s)";
+                }
+                document.getElementById("status").innerText = text;
             }
 
             // =================================================================
             // === THIS FUNCTION HAS BEEN UPDATED FOR TEXT AND DRAWING LOGIC ===
             // =================================================================
-            function drawStack(stack, message) {
+            function drawStack(stack, message, capacity) {
                 let canvas = document.getElementById("canvas");
                 let ctx = canvas.getContext("2d");
                 ctx.clearRect(0, 0, canvas.width, canvas.height);
                 
-                let boxHeight = 60;
+                // Shrink the boxes once the buffer no longer fits at full size
+                let boxHeight = Math.min(60, 420 / capacity);
                 let boxWidth = 200;
                 let x = canvas.width / 2 - (boxWidth / 2); // Center the stack
                 let startY = 450; // Bottom of the canvas
-                let maxStackHeight = 7 * boxHeight; // Based on new Stack(size=7)
+                let maxStackHeight = capacity * boxHeight;
 
                 ctx.textAlign = "left";
 
@@ -134,19 +209,21 @@ def index():
                     ctx.strokeRect(x, y - boxHeight, boxWidth, boxHeight);
 
                     // --- FIX: Truncate text ---
-                    ctx.fillStyle = "#000";
-                    ctx.font = "14px Arial";
-                    ctx.fillText("Value: " + node.value, x + 10, y - 35);
-                    
-                    let shortAddr = node.addr ? "..." + node.addr.slice(-6) : "None";
-                    ctx.fillText("Addr: " + shortAddr, x + 10, y - 15);
+                    if (boxHeight >= 40) {
+                        ctx.fillStyle = "#000";
+                        ctx.font = "14px Arial";
+                        ctx.fillText("Value: " + node.value, x + 10, y - boxHeight + 25);
+                        
+                        let shortAddr = node.addr ? "..." + node.addr.slice(-6) : "None";
+                        ctx.fillText("Addr: " + shortAddr, x + 10, y - boxHeight + 45);
+                    }
                     // --- END FIX ---
 
                     // Label Top
                     if (i === stack.length - 1) {
                         ctx.fillStyle = "red";
                         ctx.font = "16px Arial";
-                        ctx.fillText("← Top", x + boxWidth + 10, y - 30);
+                        ctx.fillText("← Top", x + boxWidth + 10, y - boxHeight / 2);
                     }
                 }
             }
@@ -157,7 +234,8 @@ def index():
                     let res = await fetch('status'); 
                     let data = await res.json();
                     document.getElementById("status").innerText = "Stack initialized.";
-                    drawStack(data.stack, "Stack initialized.");
+                    document.getElementById("dynamic").checked = data.dynamic;
+                    drawStack(data.stack, "Stack initialized.", data.capacity);
                 } catch (err) {
                     console.error("Error fetching initial status:", err);
                     document.getElementById("status").innerText = "Error loading stack.";
@@ -175,17 +253,43 @@ def push_value():
         msg = stack.push(value)
     else:
         msg = "No value provided for push."
-    return jsonify({"message": msg, "stack": stack.to_list()})
+    return jsonify({"message": msg, "stack": stack.to_list(), **stack.info(drain=True)})
 
 @stackarray_bp.route('/pop')
 def pop_value():
     msg = stack.pop()
-    return jsonify({"message": msg, "stack": stack.to_list()})
+    return jsonify({"message": msg, "stack": stack.to_list(), **stack.info(drain=True)})
+
+@stackarray_bp.route('/reset')
+def reset_stack():
+    global stack
+    dynamic = request.args.get('dynamic', 'false').lower() in ('1', 'true', 'yes')
+    try:
+        capacity = int(request.args.get('capacity', 7))
+    except ValueError:
+        return jsonify({"message": "Capacity must be an integer.", "stack": stack.to_list(), **stack.info()})
+    if not 1 <= capacity <= MAX_INITIAL_CAPACITY:
+        msg = f"Capacity must be between 1 and {MAX_INITIAL_CAPACITY}."
+        return jsonify({"message": msg, "stack": stack.to_list(), **stack.info()})
+    stack = Stack(size=capacity, dynamic=dynamic)
+    mode = "dynamic" if dynamic else "fixed"
+    msg = f"Stack reset in {mode} mode with capacity {capacity}."
+    return jsonify({"message": msg, "stack": stack.to_list(), **stack.info()})
+
+@stackarray_bp.route('/script', methods=['POST'])
+def run_stack_script():
+    trace, error = run_script(request.get_json(silent=True), {
+        "push": (stack.push, True),
+        "pop": (stack.pop, False),
+    })
+    if error:
+        return jsonify({"message": error, "stack": stack.to_list(), **stack.info()}), 400
+    return jsonify({"trace": trace, "stack": stack.to_list(), **stack.info(drain=True)})
 
 # FIX: Added status route
 @stackarray_bp.route('/status')
 def get_status():
-    return jsonify({"stack": stack.to_list()})
+    return jsonify({"stack": stack.to_list(), **stack.info()})
 
 # ------------------------------
 # Run Flask App
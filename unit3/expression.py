@@ -0,0 +1,440 @@
+# ------------------------------
+# Shared expression engine for the unit3 infix/postfix visualizers
+#   - one compiled regex tokenizer (multi-digit numbers, identifiers, operators)
+#   - a precedence/associativity table used by the shunting-yard converter
+#   - a postfix compiler that turns an expression into a reusable flat
+#     program, so evaluating it again with new variable bindings skips
+#     re-parsing
+#   - cost guards: integer results are capped at MAX_RESULT_BITS before
+#     they are computed, and a per-request time budget is checked between
+#     operations
+# Unary minus is written '~' in postfix so it cannot be confused with '-'.
+# ------------------------------
+
+import contextvars
+import math
+import operator
+import re
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; batch evaluation falls back to a row loop
+    np = None
+
+TOKEN_RE = re.compile(r"""
+    (?P<num>\d+(?:\.\d+)?)      # integer or decimal literal
+  | (?P<name>[A-Za-z_]\w*)      # variable
+  | (?P<op>[-+*/^~])            # operator
+  | (?P<lparen>\()
+  | (?P<rparen>\))
+  | (?P<space>\s+)
+  | (?P<unknown>.)              # anything else, reported to the caller
+""", re.VERBOSE)
+
+# operator -> (precedence, associativity, arity)
+OPERATORS = {
+    '+': (1, 'left', 2),
+    '-': (1, 'left', 2),
+    '*': (2, 'left', 2),
+    '/': (2, 'left', 2),
+    '~': (3, 'right', 1),   # unary minus: binds looser than ^, so -2^2 == -(2^2)
+    '^': (4, 'right', 2),
+}
+
+MAX_RESULT_BITS = 12_000     # ~3,600 digits; under Python's 4,300-digit int-to-str limit
+MAX_LITERAL_DIGITS = 3_600   # no literal may start out past MAX_RESULT_BITS
+EVAL_TIME_BUDGET = 0.5       # seconds per single evaluation request
+BATCH_TIME_BUDGET = 2.0      # seconds per batch request
+
+Token = namedtuple('Token', 'kind text pos')
+
+
+class ExpressionError(ValueError):
+    """Raised for malformed expressions and failed evaluations."""
+
+
+class LimitExceeded(ExpressionError):
+    """Raised when an evaluation would exceed a size or time limit."""
+
+    def __init__(self, limit, message):
+        super().__init__(message)
+        self.limit = limit   # "bits" or "time"
+
+
+_deadline = contextvars.ContextVar('expression_deadline', default=None)
+
+
+@contextmanager
+def time_budget(seconds):
+    """Bound every evaluation inside the block to seconds of wall time."""
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def check_budget():
+    deadline = _deadline.get()
+    if deadline is not None and time.monotonic() > deadline:
+        raise LimitExceeded("time", "Evaluation time budget exceeded")
+
+
+def tokenize(text):
+    """Split text into Tokens, dropping whitespace."""
+    return [Token(m.lastgroup, m.group(), m.start())
+            for m in TOKEN_RE.finditer(text) if m.lastgroup != 'space']
+
+
+def tokenize_postfix(text):
+    """Tokenize postfix input.
+
+    Operands must be separated by spaces ("12 3 +"). Input with no spaces
+    that is only digits and operators keeps the original compact meaning
+    of one digit per operand ("231*+9-").
+    """
+    if not any(c.isspace() for c in text) and re.fullmatch(r'[\d+\-*/^~]*', text):
+        return [Token('num' if c.isdigit() else 'op', c, i) for i, c in enumerate(text)]
+    return tokenize(text)
+
+
+def parse_number(text):
+    digits = len(text.partition('.')[0])
+    if digits > MAX_LITERAL_DIGITS:
+        raise LimitExceeded("bits", f"Number literal has {digits:,} digits (limit {MAX_LITERAL_DIGITS:,})")
+    return float(text) if '.' in text else int(text)
+
+
+def is_unary_position(prev):
+    """A '-' is unary at the start, after an operator, or after '('."""
+    return prev is None or prev.kind in ('op', 'lparen')
+
+
+# ------------------------------
+# Arithmetic
+# ------------------------------
+
+def divide(a, b):
+    if np is not None and (isinstance(a, np.ndarray) or isinstance(b, np.ndarray)):
+        return _divide_arrays(a, b)
+    if b == 0:
+        raise ExpressionError(f"Division by zero ({a} / {b})")
+    # Integer operands keep the visualizer's floor-division behaviour
+    if isinstance(a, int) and isinstance(b, int):
+        return a // b
+    return a / b
+
+
+def _divide_arrays(a, b):
+    if np.any(np.asarray(b) == 0):
+        raise ExpressionError("Division by zero in at least one row")
+    if _is_integral(a) and _is_integral(b):
+        return a // b
+    return a / b
+
+
+def _is_integral(x):
+    return np.issubdtype(np.asarray(x).dtype, np.integer)
+
+
+def _is_int(x):
+    return isinstance(x, int) and not isinstance(x, bool)
+
+
+def _is_number(x):
+    return isinstance(x, (int, float)) and not isinstance(x, bool)
+
+
+def multiply(a, b):
+    check_budget()
+    if _is_int(a) and _is_int(b) and a.bit_length() + b.bit_length() > MAX_RESULT_BITS:
+        raise LimitExceeded("bits", f"Product would exceed {MAX_RESULT_BITS} bits")
+    return a * b
+
+
+def power(a, b):
+    check_budget()
+    # Estimate the result size from log2 before doing any big-integer work
+    if _is_int(a) and _is_int(b) and b > 0 and abs(a) > 1:
+        estimated = b * math.log2(abs(a))
+        if estimated > MAX_RESULT_BITS:
+            raise LimitExceeded("bits", f"{a} ^ {b} would need about {int(estimated):,} bits "
+                                        f"(limit {MAX_RESULT_BITS:,})")
+    if _is_number(a) and _is_number(b) and a == 0 and b < 0:
+        raise ExpressionError(f"0 cannot be raised to a negative power ({a} ^ {b})")
+    try:
+        result = a ** b
+    except OverflowError:
+        raise LimitExceeded("bits", f"{a} ^ {b} overflows a float") from None
+    if isinstance(result, complex):
+        raise ExpressionError(f"{a} ^ {b} is not a real number")
+    return result
+
+
+def _guarded(symbol, func):
+    """Report Python's arithmetic errors as expression errors.
+
+    Mixing a huge int with a float converts the int, which raises
+    OverflowError in any operator, not just '^'.
+    """
+    def apply(a, b):
+        try:
+            return func(a, b)
+        except OverflowError:
+            raise LimitExceeded("bits", f"Operator '{symbol}': result does not fit in a float") from None
+        except ZeroDivisionError:
+            raise ExpressionError(f"Operator '{symbol}': division by zero") from None
+    return apply
+
+
+BINARY = {symbol: _guarded(symbol, func) for symbol, func in {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': multiply,
+    '/': divide,
+    '^': power,
+}.items()}
+UNARY = {
+    '~': operator.neg,
+}
+
+
+# ------------------------------
+# Shunting-yard (infix -> postfix)
+# ------------------------------
+
+def infix_tokens_to_postfix(tokens, steps=None):
+    """Convert infix tokens to a list of postfix token strings.
+
+    When steps is a list, one dict per token is appended with the
+    operator stack and output after that token.
+    """
+    stack = []
+    output = []
+
+    def record(symbol, action):
+        if steps is not None:
+            steps.append({
+                "symbol": symbol,
+                "action": action,
+                "stack": stack.copy(),
+                "output": output.copy()
+            })
+
+    prev = None
+    for tok in tokens:
+        if tok.kind in ('num', 'name'):
+            output.append(tok.text)
+            record(tok.text, "Added to output (operand)")
+        elif tok.kind == 'lparen':
+            stack.append('(')
+            record('(', "Pushed '(' onto stack")
+        elif tok.kind == 'rparen':
+            while stack and stack[-1] != '(':
+                output.append(stack.pop())
+            if stack:
+                stack.pop()
+            record(')', "Popped until '('")
+        elif tok.kind == 'op':
+            op = tok.text
+            if op in '+-' and is_unary_position(prev):
+                if op == '+':
+                    record(op, "Ignored unary '+'")
+                    prev = tok
+                    continue
+                op = '~'
+            prec, assoc, arity = OPERATORS[op]
+            if arity == 2:
+                # Pop operators that bind tighter (or equally, for left-associative ones)
+                while stack and stack[-1] != '(':
+                    top_prec = OPERATORS[stack[-1]][0]
+                    if top_prec > prec or (top_prec == prec and assoc == 'left'):
+                        output.append(stack.pop())
+                    else:
+                        break
+            stack.append(op)
+            label = "unary minus '~'" if op == '~' else f"operator '{op}'"
+            record(tok.text, f"Pushed {label} onto stack")
+        else:
+            record(tok.text, f"Ignored unknown symbol '{tok.text}'")
+            continue
+        prev = tok
+
+    while stack:
+        op = stack.pop()
+        if op != '(':
+            output.append(op)
+        record("-", "Popped remaining operators")
+    return output
+
+
+# ------------------------------
+# Postfix compiler
+# ------------------------------
+
+# Instruction kinds of a compiled program
+PUSH, LOAD, APPLY1, APPLY2 = range(4)
+
+
+class Program:
+    """A compiled postfix expression: a flat instruction list run on an
+    explicit stack, so deeply nested expressions cannot hit Python's
+    recursion limit. Calling it with an env (name -> value) evaluates it.
+    """
+
+    __slots__ = ('code',)
+
+    def __init__(self, code):
+        self.code = code
+
+    def __call__(self, env):
+        stack = []
+        push, pop = stack.append, stack.pop
+        for kind, arg in self.code:
+            if kind == PUSH:
+                push(arg)
+            elif kind == LOAD:
+                try:
+                    push(env[arg])
+                except KeyError:
+                    raise ExpressionError(f"Unbound variable '{arg}'") from None
+            elif kind == APPLY2:
+                right = pop()
+                stack[-1] = arg(stack[-1], right)
+            else:
+                stack[-1] = arg(stack[-1])
+        return stack[0]
+
+
+@lru_cache(maxsize=256)
+def compile_postfix(expression):
+    """Compile postfix text into a Program (callable env -> value).
+
+    Programs are cached by expression text, so repeated evaluations skip
+    tokenizing and validation.
+    """
+    code = []
+    depth = 0   # stack height the program will reach at this point
+    for tok in tokenize_postfix(expression):
+        if tok.kind == 'num':
+            code.append((PUSH, parse_number(tok.text)))
+            depth += 1
+        elif tok.kind == 'name':
+            code.append((LOAD, tok.text))
+            depth += 1
+        elif tok.kind == 'op' and tok.text in UNARY:
+            if depth < 1:
+                raise ExpressionError(f"Operator '{tok.text}' at {tok.pos} has no operand")
+            code.append((APPLY1, UNARY[tok.text]))
+        elif tok.kind == 'op':
+            if depth < 2:
+                raise ExpressionError(f"Operator '{tok.text}' at {tok.pos} needs two operands")
+            code.append((APPLY2, BINARY[tok.text]))
+            depth -= 1
+        else:
+            raise ExpressionError(f"Unexpected symbol '{tok.text}' at {tok.pos}")
+    if depth != 1:
+        raise ExpressionError("Invalid expression: operands and operators do not balance")
+    return Program(tuple(code))
+
+
+def compile_infix(expression):
+    """Compile infix text by converting it to postfix first."""
+    return compile_postfix(" ".join(infix_tokens_to_postfix(tokenize(expression))))
+
+
+# ------------------------------
+# Batch evaluation
+# ------------------------------
+
+def evaluate_rows(program, columns, n_rows):
+    """Evaluate a compiled Program for every row of columns (name -> list).
+
+    A None value means the row does not bind that name.
+
+    Returns (results, errors, vectorized, timed_out) where errors maps
+    row index to a message and timed_out says the time budget ran out
+    part way. With NumPy, the program runs once over whole columns; any
+    failure (division by zero in some row, negative integer powers, an
+    integer intermediate that could overflow int64) falls back to the
+    exact per-row loop, as do columns that mix ints and floats.
+    """
+    if np is not None and n_rows:
+        try:
+            results = _evaluate_vectorized(program, columns, n_rows)
+            if results is not None:
+                return results, {}, True, False
+        except (ExpressionError, ArithmeticError, ValueError, TypeError):
+            pass
+
+    results, errors = [], {}
+    for i in range(n_rows):
+        env = {name: values[i] for name, values in columns.items() if values[i] is not None}
+        try:
+            check_budget()
+            results.append(program(env))
+        except LimitExceeded as e:
+            if e.limit != "time":
+                results.append(None)
+                errors[i] = str(e)
+                continue
+            # Out of time: report the rest of the batch as skipped
+            for j in range(i, n_rows):
+                results.append(None)
+                errors[j] = str(e)
+            return results, errors, False, True
+        except ExpressionError as e:
+            results.append(None)
+            errors[i] = str(e)
+        except (ArithmeticError, ValueError, TypeError) as e:
+            results.append(None)
+            errors[i] = f"Evaluation failed: {e}"
+    return results, errors, False, False
+
+
+def _evaluate_vectorized(program, columns, n_rows):
+    # NumPy would turn a column of ints and floats into float64, changing
+    # the ints' floor division into true division; such batches go row by row
+    if any(len({type(v) for v in values}) > 1 for values in columns.values()):
+        return None
+    arrays = {name: np.asarray(values) for name, values in columns.items()}
+    if any(a.dtype.kind not in 'if' for a in arrays.values()):
+        return None
+
+    # int64 wraps silently at any step, not just the last. When integer
+    # columns are involved, a float64 copy of every intermediate runs
+    # alongside and the batch goes row by row as soon as an integer
+    # intermediate gets near the int64 limit.
+    checked = any(_is_integral(a) for a in arrays.values())
+    shadows = {name: a.astype(np.float64) for name, a in arrays.items()} if checked else {}
+    stack, shadow = [], []
+    with np.errstate(all='raise'):
+        for kind, arg in program.code:
+            if kind == PUSH:
+                stack.append(arg)
+                if checked:
+                    shadow.append(float(arg))
+            elif kind == LOAD:
+                if arg not in arrays:
+                    raise ExpressionError(f"Unbound variable '{arg}'")
+                stack.append(arrays[arg])
+                if checked:
+                    shadow.append(shadows[arg])
+            elif kind == APPLY2:
+                right = stack.pop()
+                stack[-1] = arg(stack[-1], right)
+                if checked:
+                    right = shadow.pop()
+                    shadow[-1] = arg(shadow[-1], right)
+            else:
+                stack[-1] = arg(stack[-1])
+                if checked:
+                    shadow[-1] = arg(shadow[-1])
+            if checked and _is_integral(stack[-1]) and not np.all(np.abs(shadow[-1]) < 2.0 ** 62):
+                return None
+        out = np.broadcast_to(stack[0], (n_rows,))
+    return out.tolist()
@@ -0,0 +1,155 @@
+# ------------------------------
+# Incremental balanced-symbol scanner for large files
+#   - text is fed in chunks; memory is the open-symbol stack plus at
+#     most two characters carried between chunks
+#   - positions are reported as 1-based line/column
+#   - optional lexing of string literals and comments, so brackets
+#     inside "(" or // ) do not count
+# Used by the /check_stream route in U3balancingsymbol.py.
+# ------------------------------
+
+import codecs
+import os
+import re
+
+OPENERS = {')': '(', ']': '[', '}': '{'}
+
+# Every token the scanner reacts to, per language. Tokens are at most
+# three characters long, which is why two characters are held back at
+# the end of each chunk.
+TOKEN_RES = {
+    'none': re.compile(r"[()\[\]{}\n]"),
+    # C, C++, Java, JavaScript, Go, C#: //, /* */, '...', "...", `...`
+    'c': re.compile(r"//|/\*|\*/|\\.|[()\[\]{}\n'\"`]", re.DOTALL),
+    # Python: # comments, '...', "...", '''...''', """..."""
+    'python': re.compile(r"'''|\"\"\"|\\.|[()\[\]{}\n#'\"]", re.DOTALL),
+}
+LANGUAGES = tuple(TOKEN_RES)
+
+EXTENSIONS = {
+    '.py': 'python', '.pyw': 'python',
+    '.c': 'c', '.h': 'c', '.cc': 'c', '.cpp': 'c', '.hpp': 'c', '.java': 'c',
+    '.js': 'c', '.jsx': 'c', '.ts': 'c', '.tsx': 'c', '.go': 'c', '.cs': 'c',
+}
+
+LINE_COMMENT = {'c': '//', 'python': '#'}
+BLOCK_COMMENT = {'c': ('/*', '*/')}
+MULTILINE_QUOTES = {'`', "'''", '"""'}
+
+
+def language_for(filename, default='none'):
+    """Pick a language from a file extension."""
+    return EXTENSIONS.get(os.path.splitext(filename or '')[1].lower(), default)
+
+
+class SymbolScanner:
+    """Feed text with feed(), then call finish().
+
+    Both return None while everything is balanced so far, or an error
+    dict with line, column, char and message. After the first error the
+    scanner stops and keeps returning it.
+    """
+
+    def __init__(self, language='none'):
+        if language not in TOKEN_RES:
+            raise ValueError(f"Unknown language '{language}' (choose from {', '.join(LANGUAGES)}).")
+        self.language = language
+        self.token_re = TOKEN_RES[language]
+        self.line_comment = LINE_COMMENT.get(language)
+        self.block_open, self.block_close = BLOCK_COMMENT.get(language, (None, None))
+        self.stack = []          # (symbol, line, column) of open brackets
+        self.line = 1
+        self.line_start = 0      # absolute offset of the current line's first character
+        self.offset = 0          # absolute offset of carry[0]
+        self.carry = ''
+        self.mode = None         # None, 'line', 'block' or the open quote
+        self.error = None
+        self.chars = 0
+
+    def feed(self, text):
+        if self.error is None:
+            self.chars += len(text)
+            self._scan(self.carry + text, final=False)
+        return self.error
+
+    def finish(self):
+        if self.error is None:
+            self._scan(self.carry, final=True)
+        if self.error is None and self.stack:
+            symbol, line, column = self.stack[-1]
+            self.error = {"line": line, "column": column, "char": symbol,
+                          "message": f"{len(self.stack)} unmatched opening symbol(s); "
+                                     f"innermost is '{symbol}'."}
+        return self.error
+
+    def _fail(self, pos, char, message, **extra):
+        self.error = {"line": self.line, "column": pos - self.line_start + 1,
+                      "char": char, "message": message, **extra}
+
+    def _scan(self, buf, final):
+        # Without the full file, only tokens that start at least three
+        # characters before the end are certain not to be cut short
+        limit = len(buf) if final else len(buf) - 2
+        base = self.offset
+        resume = 0
+        for m in self.token_re.finditer(buf):
+            start = m.start()
+            if start >= limit:
+                break
+            resume = m.end()
+            tok = m.group()
+            pos = base + start
+            mode = self.mode
+
+            if tok == '\n' or tok == '\\\n':
+                self.line += 1
+                self.line_start = pos + len(tok)
+                if tok == '\n' and mode is not None and mode != 'block' and mode not in MULTILINE_QUOTES:
+                    # Line comments end here; so do unterminated single-line strings
+                    self.mode = None
+                continue
+
+            if mode is None:
+                if tok in '([{':
+                    self.stack.append((tok, self.line, pos - self.line_start + 1))
+                elif tok in ')]}':
+                    if not self.stack:
+                        self._fail(pos, tok, f"No matching opening for '{tok}'.")
+                        return
+                    top, line, column = self.stack[-1]
+                    if top != OPENERS[tok]:
+                        self._fail(pos, tok, f"Top of stack '{top}' does not match '{tok}'.",
+                                   opened_at={"line": line, "column": column})
+                        return
+                    self.stack.pop()
+                elif tok == self.line_comment:
+                    self.mode = 'line'
+                elif tok == self.block_open:
+                    self.mode = 'block'
+                elif tok[0] in '\'"`':
+                    self.mode = tok
+            elif mode == 'block':
+                if tok == self.block_close:
+                    self.mode = None
+            elif mode != 'line':
+                # Inside a string: escapes were consumed as single tokens.
+                # A triple quote closes a one-quote string and opens an
+                # empty one, which nets out to the same thing.
+                if tok == mode or (len(mode) == 1 and tok[0] == mode):
+                    self.mode = None
+
+        resume = max(resume, limit) if not final else len(buf)
+        self.carry = buf[resume:]
+        self.offset = base + resume
+
+
+def scan_stream(chunks, language='none', encoding='utf-8'):
+    """Scan an iterable of byte chunks and return the finished scanner."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    scanner = SymbolScanner(language)
+    for chunk in chunks:
+        if scanner.feed(decoder.decode(chunk)):
+            return scanner
+    scanner.feed(decoder.decode(b'', final=True))
+    scanner.finish()
+    return scanner
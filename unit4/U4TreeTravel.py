@@ -1,6 +1,9 @@
 # 1. Import Blueprint
 from flask import Blueprint, request, jsonify, render_template_string
+import random
+import threading
 from collections import deque
+from itertools import islice
 
 # 2. Create Blueprint
 TreeTravel_bp = Blueprint(
@@ -20,181 +23,311 @@ class Node:
 class BST:
     def __init__(self):
         self.root = None
+        self.size = 0
 
     # ---------- INSERT ----------
+    # Insert and delete walk the tree in a loop rather than recursing, so
+    # a long chain of single inserts cannot hit Python's recursion limit.
     def insert(self, key):
         explanation = []
         if self.root is None:
             self.root = Node(key)
+            self.size = 1
             explanation.append(f"Tree is empty. Inserting {key} as root node.")
             return True, explanation
-        result, explanation = self._insert(self.root, key, explanation)
-        return result, explanation
-
-    def _insert(self, node, key, explanation):
-        explanation.append(f"At node {node.key}.")
-        if key == node.key:
-            explanation.append(f"{key} already exists — skipping insertion.")
-            return False, explanation
-        elif key < node.key:
-            explanation.append(f"{key} < {node.key}: moving LEFT.")
-            if node.left:
-                return self._insert(node.left, key, explanation)
-            else:
-                node.left = Node(key)
-                explanation.append(f"Inserted {key} as LEFT child of {node.key}.")
-                return True, explanation
-        else:
-            explanation.append(f"{key} > {node.key}: moving RIGHT.")
-            if node.right:
-                return self._insert(node.right, key, explanation)
+        node = self.root
+        while True:
+            explanation.append(f"At node {node.key}.")
+            if key == node.key:
+                explanation.append(f"{key} already exists — skipping insertion.")
+                return False, explanation
+            if key < node.key:
+                explanation.append(f"{key} < {node.key}: moving LEFT.")
+                if node.left is None:
+                    node.left = Node(key)
+                    explanation.append(f"Inserted {key} as LEFT child of {node.key}.")
+                    break
+                node = node.left
             else:
-                node.right = Node(key)
-                explanation.append(f"Inserted {key} as RIGHT child of {node.key}.")
-                return True, explanation
+                explanation.append(f"{key} > {node.key}: moving RIGHT.")
+                if node.right is None:
+                    node.right = Node(key)
+                    explanation.append(f"Inserted {key} as RIGHT child of {node.key}.")
+                    break
+                node = node.right
+        self.size += 1
+        return True, explanation
+
+    def insert_many(self, keys):
+        """Add keys and rebuild the tree balanced; return how many were new.
+
+        Inserting sorted keys one by one would build a chain in O(n²), so
+        the existing keys (already sorted inorder) and the new ones are
+        merged and the tree is rebuilt middle-out in O(n log n).
+        """
+        merged = sorted(set(self.iter_inorder()).union(keys))
+        added = len(merged) - self.size
+        self.root = self._build_balanced(merged)
+        self.size = len(merged)
+        return added
+
+    @staticmethod
+    def _build_balanced(keys):
+        """Root of a height-balanced tree over sorted unique keys."""
+        if not keys:
+            return None
+        mid = (len(keys) - 1) // 2
+        root = Node(keys[mid])
+        # (lo, hi, parent, side): keys[lo:hi] become parent's side subtree
+        pending = [(0, mid, root, 'left'), (mid + 1, len(keys), root, 'right')]
+        while pending:
+            lo, hi, parent, side = pending.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi - 1) // 2
+            node = Node(keys[mid])
+            setattr(parent, side, node)
+            pending.append((lo, mid, node, 'left'))
+            pending.append((mid + 1, hi, node, 'right'))
+        return root
 
     # ---------- DELETE ----------
     def delete(self, key):
         explanation = []
-        self.root, deleted, explanation = self._delete(self.root, key, explanation)
-        return deleted, explanation
-
-    def _delete(self, node, key, explanation):
+        parent, side, node = None, None, self.root
+        while node and key != node.key:
+            if key < node.key:
+                explanation.append(f"{key} < {node.key}: moving LEFT subtree.")
+                parent, side, node = node, 'left', node.left
+            else:
+                explanation.append(f"{key} > {node.key}: moving RIGHT subtree.")
+                parent, side, node = node, 'right', node.right
         if not node:
             explanation.append(f"Traversal ended: {key} not found.")
-            return node, False, explanation
-
-        if key < node.key:
-            explanation.append(f"{key} < {node.key}: moving LEFT subtree.")
-            node.left, deleted, explanation = self._delete(node.left, key, explanation)
-        elif key > node.key:
-            explanation.append(f"{key} > {node.key}: moving RIGHT subtree.")
-            node.right, deleted, explanation = self._delete(node.right, key, explanation)
+            return False, explanation
+
+        explanation.append(f"Node {key} found — starting deletion process.")
+        if not node.left:
+            explanation.append(f"{key} has no LEFT child — replacing with RIGHT child.")
+            self._replace(parent, side, node.right)
+        elif not node.right:
+            explanation.append(f"{key} has no RIGHT child — replacing with LEFT child.")
+            self._replace(parent, side, node.left)
         else:
-            explanation.append(f"Node {key} found — starting deletion process.")
-            deleted = True
-            if not node.left:
-                explanation.append(f"{key} has no LEFT child — replacing with RIGHT child.")
-                return node.right, deleted, explanation
-            elif not node.right:
-                explanation.append(f"{key} has no RIGHT child — replacing with LEFT child.")
-                return node.left, deleted, explanation
-            else:
-                explanation.append(f"{key} has TWO children — finding inorder successor.")
-                succ = node.right
-                while succ.left:
-                    succ = succ.left
-                explanation.append(f"Inorder successor of {key} is {succ.key}. Replacing {key} with {succ.key}.")
-                node.key = succ.key
-                node.right, _, explanation = self._delete(node.right, succ.key, explanation)
-        return node, deleted, explanation
+            explanation.append(f"{key} has TWO children — finding inorder successor.")
+            succ_parent, succ = node, node.right
+            while succ.left:
+                succ_parent, succ = succ, succ.left
+            explanation.append(f"Inorder successor of {key} is {succ.key}. Replacing {key} with {succ.key}.")
+            node.key = succ.key
+            # The successor has no left child, so its right child takes its place
+            explanation.append(f"{succ.key} has no LEFT child — replacing with RIGHT child.")
+            self._replace(succ_parent, 'right' if succ_parent is node else 'left', succ.right)
+        self.size -= 1
+        return True, explanation
+
+    def _replace(self, parent, side, child):
+        if parent is None:
+            self.root = child
+        else:
+            setattr(parent, side, child)
 
     # ---------- TRAVERSALS ----------
-    def inorder(self):
-        res, steps = [], []
-        steps.append("Starting Inorder Traversal (Left → Root → Right).")
-        self._inorder(self.root, res, steps)
-        steps.append(f"Inorder result: {', '.join(map(str, res))}")
-        return res, steps
-
-    def _inorder(self, node, res, steps):
-        if node:
-            self._inorder(node.left, res, steps)
-            res.append(node.key)
-            steps.append(f"Visited node {node.key}.")
-            self._inorder(node.right, res, steps)
-
-    def preorder(self):
-        res, steps = [], []
-        steps.append("Starting Preorder Traversal (Root → Left → Right).")
-        self._preorder(self.root, res, steps)
-        steps.append(f"Preorder result: {', '.join(map(str, res))}")
-        return res, steps
-
-    def _preorder(self, node, res, steps):
-        if node:
-            res.append(node.key)
-            steps.append(f"Visited node {node.key}.")
-            self._preorder(node.left, res, steps)
-            self._preorder(node.right, res, steps)
-
-    def postorder(self):
-        res, steps = [], []
-        steps.append("Starting Postorder Traversal (Left → Right → Root).")
-        self._postorder(self.root, res, steps)
-        steps.append(f"Postorder result: {', '.join(map(str, res))}")
-        return res, steps
+    # Each iter_* method is an iterative generator that yields keys
+    # lazily. When steps is a list, the explanation strings are appended
+    # to it as nodes are visited; when it is None no strings are built.
+
+    def iter_inorder(self, steps=None):
+        stack, node = [], self.root
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            if steps is not None:
+                steps.append(f"Visited node {node.key}.")
+            yield node.key
+            node = node.right
 
-    def _postorder(self, node, res, steps):
-        if node:
-            self._postorder(node.left, res, steps)
-            self._postorder(node.right, res, steps)
-            res.append(node.key)
-            steps.append(f"Visited node {node.key}.")
+    def iter_preorder(self, steps=None):
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            if steps is not None:
+                steps.append(f"Visited node {node.key}.")
+            yield node.key
+            if node.right:
+                stack.append(node.right)
+            if node.left:
+                stack.append(node.left)
 
-    def bfs(self):
-        res, steps = [], []
-        if not self.root:
-            steps.append("Tree is empty.")
-            return res, steps
-        steps.append("Starting Breadth-First Search (Level Order).")
-        q = deque([self.root])
+    def iter_postorder(self, steps=None):
+        stack, node, last = [], self.root, None
+        while stack or node:
+            if node:
+                stack.append(node)
+                node = node.left
+                continue
+            top = stack[-1]
+            if top.right and last is not top.right:
+                node = top.right
+            else:
+                last = stack.pop()
+                if steps is not None:
+                    steps.append(f"Visited node {last.key}.")
+                yield last.key
+
+    def iter_morris(self, steps=None):
+        """Inorder in O(1) extra space by temporarily threading right pointers.
+
+        If the consumer stops early, the rest of the walk runs without
+        yielding so every thread is removed before the generator closes.
+        """
+        node = self.root
+        emitting = True
+        try:
+            while node:
+                if node.left is None:
+                    # Advance before yielding so the cleanup below resumes correctly
+                    key, node = node.key, node.right
+                    if emitting:
+                        if steps is not None:
+                            steps.append(f"Visited node {key}.")
+                        yield key
+                    continue
+                pred = node.left
+                while pred.right and pred.right is not node:
+                    pred = pred.right
+                if pred.right is None:
+                    if steps is not None and emitting:
+                        steps.append(f"Threaded {pred.key} -> {node.key}, moving LEFT.")
+                    pred.right = node
+                    node = node.left
+                else:
+                    pred.right = None
+                    key, node = node.key, node.right
+                    if emitting:
+                        if steps is not None:
+                            steps.append(f"Removed thread {pred.key} -> {key}. Visited node {key}.")
+                        yield key
+        finally:
+            emitting = False
+            while node:
+                if node.left is None:
+                    node = node.right
+                    continue
+                pred = node.left
+                while pred.right and pred.right is not node:
+                    pred = pred.right
+                if pred.right is None:
+                    pred.right = node
+                    node = node.left
+                else:
+                    pred.right = None
+                    node = node.right
+
+    def iter_bfs(self, steps=None):
+        q = deque([self.root] if self.root else [])
         while q:
             node = q.popleft()
-            res.append(node.key)
-            steps.append(f"Visited node {node.key}.")
+            if steps is not None:
+                steps.append(f"Visited node {node.key}.")
+            yield node.key
             if node.left:
-                steps.append(f"Enqueue LEFT child {node.left.key}.")
+                if steps is not None:
+                    steps.append(f"Enqueue LEFT child {node.left.key}.")
                 q.append(node.left)
             if node.right:
-                steps.append(f"Enqueue RIGHT child {node.right.key}.")
+                if steps is not None:
+                    steps.append(f"Enqueue RIGHT child {node.right.key}.")
                 q.append(node.right)
-        steps.append(f"BFS result: {', '.join(map(str, res))}")
-        return res, steps
 
-    def dfs(self):
-        res, steps = [], []
-        if not self.root:
-            steps.append("Tree is empty.")
-            return res, steps
-        steps.append("Starting Depth-First Search (using Stack, similar to Preorder).")
-        stack = [self.root]
+    def iter_dfs(self, steps=None):
+        stack = [self.root] if self.root else []
         while stack:
             node = stack.pop()
-            res.append(node.key)
-            steps.append(f"Visited node {node.key}.")
+            if steps is not None:
+                steps.append(f"Visited node {node.key}.")
+            yield node.key
             if node.right:
-                steps.append(f"Pushed RIGHT child {node.right.key}.")
+                if steps is not None:
+                    steps.append(f"Pushed RIGHT child {node.right.key}.")
                 stack.append(node.right)
             if node.left:
-                steps.append(f"Pushed LEFT child {node.left.key}.")
+                if steps is not None:
+                    steps.append(f"Pushed LEFT child {node.left.key}.")
                 stack.append(node.left)
-        steps.append(f"DFS result: {', '.join(map(str, res))}")
+
+    def traverse(self, mode, steps=None):
+        """Return the generator for a traversal mode (see TRAVERSALS)."""
+        intro, _ = TRAVERSALS[mode]
+        if steps is not None:
+            steps.append(intro if self.root or mode not in ('bfs', 'dfs') else "Tree is empty.")
+        return getattr(self, 'iter_' + mode)(steps)
+
+    def _run(self, mode):
+        steps = []
+        res = list(self.traverse(mode, steps))
+        if self.root or mode not in ('bfs', 'dfs'):
+            steps.append(f"{TRAVERSALS[mode][1]} result: {', '.join(map(str, res))}")
         return res, steps
 
+    def inorder(self):
+        return self._run('inorder')
+
+    def preorder(self):
+        return self._run('preorder')
+
+    def postorder(self):
+        return self._run('postorder')
+
+    def bfs(self):
+        return self._run('bfs')
+
+    def dfs(self):
+        return self._run('dfs')
+
     # ---------- CONVERT TREE ----------
     def to_dict(self):
-        def node_to_dict(n):
-            if not n:
-                return None
-            d = {"name": str(n.key)}
-            children = []
-            if n.left:
-                children.append(node_to_dict(n.left))
-            if n.right:
-                children.append(node_to_dict(n.right))
-            if children:
-                d["children"] = children
-            return d
-        
+        # Iterative: each node's dict is created when its parent is
+        # visited, so the nesting needs no recursion
+        def node_to_dict(root):
+            out = {"name": str(root.key)}
+            stack = [(root, out)]
+            while stack:
+                n, d = stack.pop()
+                children = [(c, {"name": str(c.key)}) for c in (n.left, n.right) if c]
+                if children:
+                    d["children"] = [child for _, child in children]
+                    stack.extend(children)
+            return out
+
         # FIX: Return None for an empty tree
         if not self.root:
             return None
         return node_to_dict(self.root)
 
 
+# mode -> (opening explanation, label for the result line)
+TRAVERSALS = {
+    'inorder': ("Starting Inorder Traversal (Left → Root → Right).", "Inorder"),
+    'preorder': ("Starting Preorder Traversal (Root → Left → Right).", "Preorder"),
+    'postorder': ("Starting Postorder Traversal (Left → Right → Root).", "Postorder"),
+    'morris': ("Starting Morris Inorder Traversal (threaded links instead of a stack).", "Morris inorder"),
+    'bfs': ("Starting Breadth-First Search (Level Order).", "BFS"),
+    'dfs': ("Starting Depth-First Search (using Stack, similar to Preorder).", "DFS"),
+}
+
+MAX_PAGE = 10000          # keys returned per /traverse request
+MAX_TRACE_NODES = 2000    # explanations are only built for the first nodes of a traversal
+MAX_RENDER_NODES = 500    # larger trees are not sent to the D3 view
+MAX_BULK_KEYS = 200000
+
 # Create global, EMPTY BST
 bst = BST()
+# Every route holds this while it reads or changes bst: requests run on
+# several threads, and a Morris walk rewires pointers while it runs
+tree_lock = threading.Lock()
 # FIX: Removed pre-population loop
 
 # ----------------------------
@@ -225,6 +358,7 @@ HTML_PAGE = """
     <button onclick="traverse('inorder')">Inorder</button>
     <button onclick="traverse('preorder')">Preorder</button>
     <button onclick="traverse('postorder')">Postorder</button>
+    <button onclick="traverse('morris')">Morris Inorder</button>
     <button onclick="traverse('bfs')">BFS</button>
     <button onclick="traverse('dfs')">DFS</button>
   </div>
@@ -270,6 +404,11 @@ HTML_PAGE = """
     async function traverse(type){
       const resp = await fetch(`traverse/${type}`);
       const res = await resp.json();
+      if (!res.traced && res.result) {
+        const more = res.next_offset !== null ? ` … (${res.total} nodes, first ${res.result.length} shown)` : '';
+        showExplanation([`${type.toUpperCase()}: ${res.result.join(', ')}${more}`]);
+        return;
+      }
       showExplanation(res.steps);
       // We show the result in the explanation box now, so an alert is not needed
       // alert(`${type.toUpperCase()} Traversal: ${res.result.join(', ')}`);
@@ -297,6 +436,10 @@ HTML_PAGE = """
         container.innerHTML = '<p style="padding:20px; text-align:center; color:#666">Tree is empty</p>';
         return;
       }
+      if(data.too_large){
+        container.innerHTML = `<p style="padding:20px; text-align:center; color:#666">Tree has ${data.size} nodes — too large to draw. Traversals are paginated.</p>`;
+        return;
+      }
 
       const width = container.clientWidth;
       const height = container.clientHeight || 600;
@@ -336,14 +479,19 @@ def index():
 # FIX: Renamed route to /status
 @TreeTravel_bp.route('/status')
 def get_status():
-    return jsonify(bst.to_dict())
+    with tree_lock:
+        if bst.size > MAX_RENDER_NODES:
+            return jsonify({"too_large": True, "size": bst.size})
+        tree = bst.to_dict()
+    return jsonify(tree)
 
 # FIX: Added try/except
 @TreeTravel_bp.route('/insert', methods=['POST'])
 def insert():
     try:
         key = int(request.json['key'])
-        ok, explanation = bst.insert(key)
+        with tree_lock:
+            ok, explanation = bst.insert(key)
     except ValueError:
         explanation = ["Error: Input must be an integer."]
     except Exception as e:
@@ -355,27 +503,75 @@ def insert():
 def delete():
     try:
         key = int(request.json['key'])
-        deleted, explanation = bst.delete(key)
+        with tree_lock:
+            deleted, explanation = bst.delete(key)
     except ValueError:
         explanation = ["Error: Input must be an integer."]
     except Exception as e:
         explanation = [f"An error occurred: {e}"]
     return jsonify({'explanation': explanation})
 
+@TreeTravel_bp.route('/bulk_insert', methods=['POST'])
+def bulk_insert():
+    """Insert many keys at once: {"keys": [...]} or {"random": n, "seed": s}; "clear" empties the tree first."""
+    global bst
+    body = request.get_json(silent=True) or {}
+    if 'random' in body:
+        try:
+            count = int(body['random'])
+            rng = random.Random(body.get('seed'))
+        except (TypeError, ValueError):
+            return jsonify({'error': '"random" must be an integer.'}), 400
+        # Checked before generating, so a huge count costs nothing
+        if count > MAX_BULK_KEYS:
+            return jsonify({'error': f"At most {MAX_BULK_KEYS} keys per request."}), 400
+        keys = [rng.randrange(count * 10) for _ in range(max(count, 0))]
+    else:
+        keys = body.get('keys')
+        if not isinstance(keys, list) or not all(isinstance(k, int) and not isinstance(k, bool) for k in keys):
+            return jsonify({'error': '"keys" must be a list of integers.'}), 400
+    if len(keys) > MAX_BULK_KEYS:
+        return jsonify({'error': f"At most {MAX_BULK_KEYS} keys per request."}), 400
+    with tree_lock:
+        if body.get('clear'):
+            bst = BST()
+        added = bst.insert_many(keys)
+        size = bst.size
+    return jsonify({'added': added, 'size': size,
+                    'explanation': [f"Inserted {added} new keys ({len(keys) - added} duplicates skipped). "
+                                    f"Tree rebuilt balanced with {size} nodes."]})
+
 @TreeTravel_bp.route('/traverse/<mode>')
 def traverse(mode):
-    if mode == 'inorder':
-        res, steps = bst.inorder()
-    elif mode == 'preorder':
-        res, steps = bst.preorder()
-    elif mode == 'postorder':
-        res, steps = bst.postorder()
-    elif mode == 'bfs':
-        res, steps = bst.bfs()
-    elif mode == 'dfs':
-        res, steps = bst.dfs()
-    else:
+    """Traverse lazily; ?offset=&limit= page through the keys and ?trace=false skips explanations."""
+    if mode not in TRAVERSALS:
         return jsonify({'error': 'Invalid mode', 'steps': ['Invalid traversal type selected.']})
-    return jsonify({'result': res, 'steps': steps})
+    try:
+        offset = max(int(request.args.get('offset', 0)), 0)
+        limit = min(max(int(request.args.get('limit', MAX_PAGE)), 0), MAX_PAGE)
+    except ValueError:
+        return jsonify({'error': 'offset and limit must be integers', 'steps': []}), 400
+    trace = request.args.get('trace', 'true').lower() not in ('0', 'false', 'no')
+    with tree_lock:
+        size, empty = bst.size, bst.root is None
+        if trace and min(offset + limit, size) > MAX_TRACE_NODES:
+            # Explanations cover every node up to the end of the page, so cap them
+            trace = False
+        steps = [] if trace else None
+
+        gen = bst.traverse(mode, steps)
+        page = list(islice(gen, offset, offset + limit))
+        gen.close()   # lets Morris remove its threads if the page ended early
+    end = offset + len(page)
+    if steps is not None and offset == 0 and end >= size and (not empty or mode not in ('bfs', 'dfs')):
+        steps.append(f"{TRAVERSALS[mode][1]} result: {', '.join(map(str, page))}")
+    return jsonify({
+        'result': page,
+        'steps': steps if steps is not None else [],
+        'traced': steps is not None,
+        'offset': offset,
+        'next_offset': end if end < size else None,
+        'total': size
+    })
 
 # FIX: REMOVED the if __name__ == '__main__' block
\ No newline at end of file